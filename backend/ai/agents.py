@@ -4,17 +4,26 @@ Enhanced AI
  Agents with Reasoning Models and Multi-language Support
 """
 
-from typing import List, Dict, Optional, Any, TypedDict, Annotated, Literal
+from typing import List, Dict, Optional, Any, TypedDict, Annotated, Literal, AsyncIterator
 from operator import add
+from functools import lru_cache
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, ToolMessage
 from langgraph.graph import StateGraph, END
+from langgraph.errors import GraphRecursionError
 from langgraph.prebuilt import ToolNode
 from langchain_core.tools import tool
-from sqlalchemy.ext.asyncio import AsyncSession
-import json
+from langchain_core.runnables import RunnableConfig
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+import asyncio
+import re
+import orjson
+import json5
+import json_repair
 
 from core.config import settings
+from .schemas import BreakdownSchema, ProblemAnalysisSchema
+from .semantic_cache import SemanticCache, semantic_cache as default_semantic_cache
 from .tools import (
     get_room_members as db_get_room_members,
     find_employees_by_skills as db_find_employees_by_skills,
@@ -38,7 +47,12 @@ Extract the following from the problem description:
 
 Return ONLY a valid JSON object.""",
         
-        "task_orchestrator": """You are a task assignment AI agent for project management in room {room_id}.
+        "description_compressor": """Condense the problem description below for a task planning assistant.
+Keep every concrete fact: symptoms, affected components, technologies, error messages, constraints and deadlines.
+Drop repetition, logs beyond the first relevant lines and pasted boilerplate.
+Reply with the condensed description only.""",
+        
+        "task_orchestrator": """You are a task assignment AI agent for project management in a team room.
 
 Your goal: Analyze the problem and create a DETAILED BREAKDOWN into subtasks, assigning each to the most suitable person.
 
@@ -55,13 +69,33 @@ WORKFLOW:
 4. FINALLY: Create breakdown with assignments based on the data you collected
 
 RULES:
-1. ONLY assign to room members (room_id: {room_id})
+1. ONLY assign to members of the current room (given at the end of these instructions)
 2. Break down complex problems into clear subtasks (2-5 subtasks)
 3. For EACH subtask, assign the best person based on skills and workload
 4. Consider past experience with similar tasks
 5. Provide clear reasoning for each assignment
 
-You MUST call tools to gather data before making assignments. DO NOT guess or assume."""
+You MUST call tools to gather data before making assignments. DO NOT guess or assume.
+
+FINAL ANSWER:
+When you have collected enough data, stop calling tools and answer with the breakdown in the required structured format.
+
+IMPORTANT for complexity scoring (complexity_score):
+- 1-2: Simple changes, no deep knowledge needed (e.g., text change, small fix)
+- 3-4: Simple task, requires basic knowledge (e.g., adding button, simple component)
+- 5-6: Moderate complexity, requires good system understanding (e.g., new feature with integration)
+- 7-8: Complex task, requires deep knowledge (e.g., architecture refactoring, complex logic)
+- 9-10: Very complex, critical task (e.g., full module rebuild, non-standard problem)
+
+Deadline (due_date_days) should be based on:
+- Task complexity
+- Assignee's experience level
+- Task priority
+- Dependencies on other tasks""",
+        
+        "task_orchestrator_room": """
+
+CURRENT ROOM: room_id={room_id}"""
     },
     
     "ru": {
@@ -76,7 +110,12 @@ You MUST call tools to gather data before making assignments. DO NOT guess or as
 
 Верни ТОЛЬКО валидный JSON объект.""",
         
-        "task_orchestrator": """Ты AI-агент для назначения задач в комнате {room_id}.
+        "description_compressor": """Сожми описание проблемы ниже для ассистента по планированию задач.
+Сохрани все конкретные факты: симптомы, затронутые компоненты, технологии, сообщения об ошибках, ограничения и сроки.
+Убери повторы, логи дальше первых значимых строк и вставленный шаблонный текст.
+Ответь только сжатым описанием.""",
+        
+        "task_orchestrator": """Ты AI-агент для назначения задач в командной комнате.
 
 Цель: Проанализировать проблему и создать ДЕТАЛЬНУЮ РАЗБИВКУ на подзадачи, назначив каждую наиболее подходящему человеку.
 
@@ -93,17 +132,52 @@ WORKFLOW:
 4. В КОНЦЕ: Создай разбивку с назначениями на основе собранных данных
 
 ПРАВИЛА:
-1. Назначай ТОЛЬКО участникам комнаты (room_id: {room_id})
+1. Назначай ТОЛЬКО участникам текущей комнаты (указана в конце инструкций)
 2. Разбивай сложные проблемы на чёткие подзадачи (2-5 подзадач)
 3. Для КАЖДОЙ подзадачи назначай лучшего человека на основе навыков и загрузки
 4. Учитывай прошлый опыт с похожими задачами
 5. Предоставляй четкое обоснование каждого назначения
 
-Ты ДОЛЖЕН вызывать инструменты для сбора данных перед назначениями. НЕ угадывай и не предполагай."""
+Ты ДОЛЖЕН вызывать инструменты для сбора данных перед назначениями. НЕ угадывай и не предполагай.
+
+ФИНАЛЬНЫЙ ОТВЕТ:
+Когда данных достаточно, перестань вызывать инструменты и верни разбивку в требуемом структурированном формате.
+Все текстовые поля должны быть на русском языке.
+
+ВАЖНО при оценке сложности (complexity_score):
+- 1-2: Простые изменения, не требует глубоких знаний (например, изменение текста, small fix)
+- 3-4: Простая задача, требует базовых знаний (например, добавление кнопки, простой компонент)
+- 5-6: Средняя сложность, требует хорошего понимания системы (например, новая фича с интеграцией)
+- 7-8: Сложная задача, требует глубоких знаний (например, рефакторинг архитектуры, сложная логика)
+- 9-10: Очень сложная, критическая задача (например, полная переработка модуля, нестандартная проблема)
+
+Дедлайн (due_date_days) определяй на основе:
+- Сложности задачи
+- Опыта назначенного человека
+- Приоритета задачи
+- Зависимостей от других задач""",
+        
+        "task_orchestrator_room": """
+
+ТЕКУЩАЯ КОМНАТА: room_id={room_id}"""
     }
 }
 
 
+@lru_cache(maxsize=1024)
+def get_orchestrator_system_prompt(language: str, room_id: int) -> str:
+    """
+    Formatted orchestrator system prompt
+    
+    Cached so every turn of every breakdown in a room sends a byte-identical
+    system message at index 0, which is what OpenAI prompt caching keys on.
+    The room id only appears in the short suffix, so the long static prefix
+    is shared (and cached) across all rooms of the same language.
+    """
+    prompts = SYSTEM_PROMPTS[language]
+    return prompts["task_orchestrator"] + prompts["task_orchestrator_room"].format(room_id=room_id)
+
+
 def get_model_for_complexity(complexity: str, use_reasoning: bool = False) -> ChatOpenAI:
     """
     Select appropriate model based on task complexity
@@ -132,36 +206,118 @@ def get_model_for_complexity(complexity: str, use_reasoning: bool = False) -> Ch
         )
 
 
+_CYRILLIC_RE = re.compile("[\u0400-\u04FF]")
+
+
+def detect_language(text: str) -> str:
+    """Cheap Cyrillic vs Latin check, used to correct the client's language"""
+    if not text:
+        return "en"
+    cyrillic = len(_CYRILLIC_RE.findall(text))
+    return "ru" if cyrillic > len(text) * 0.15 else "en"
+
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+
+
+def _strip_fences(content: str) -> str:
+    """Remove markdown ```json ... ``` wrapper around model output"""
+    return _FENCE_RE.sub("", content)
+
+
+def parse_llm_json(content: str) -> Dict:
+    """
+    Parse a JSON object returned by the model
+    
+    Strict orjson first; malformed output (trailing commas, unquoted keys,
+    markdown fences) goes through json_repair and then json5. The tolerant
+    parsers are much slower, so they only run when strict parsing fails.
+    
+    Raises:
+        ValueError: If no parser produced a JSON object
+    """
+    try:
+        result = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        result = None
+    
+    if isinstance(result, dict):
+        return result
+    
+    print(f"Malformed JSON from model, trying tolerant parsing: {content[:100]!r}")
+    
+    try:
+        result = json_repair.loads(content)
+        if isinstance(result, dict) and result:
+            return result
+    except Exception:
+        pass
+    
+    try:
+        result = json5.loads(_strip_fences(content))
+        if isinstance(result, dict):
+            return result
+    except ValueError:
+        pass
+    
+    raise ValueError("Model response is not a JSON object")
+
+
+# Problem descriptions are capped before any model sees them;
+# long ones are condensed by a cheap model first
+MAX_DESCRIPTION_CHARS = 32000
+SUMMARIZE_DESCRIPTION_ABOVE = 8000
+MAX_PROMPT_SKILLS = 20
+
+
 class ProblemAnalyzer:
     """Analyzes problem with multi-language support"""
     
-    def __init__(self, language: str = "en"):
+    def __init__(self, language: str = "en", semantic_cache: Optional[SemanticCache] = None):
         self.language = language if language in SYSTEM_PROMPTS else "en"
         self.llm = ChatOpenAI(
-            model="gpt-4.1-nano",
+            model=settings.AI_ANALYZER_MODEL,
             temperature=0.3,
-            api_key=settings.openai_api_key
+            api_key=settings.openai_api_key,
+            base_url=settings.AI_ANALYZER_BASE_URL
         )
+        self.semantic_cache = semantic_cache or default_semantic_cache
     
     async def analyze_problem(self, problem_description: str) -> Dict:
         """Analyze problem and extract structured information"""
+        # Prompt in the language the problem is actually written in,
+        # otherwise the model spends tokens translating
+        self.language = detect_language(problem_description)
+        problem_description = problem_description[:MAX_DESCRIPTION_CHARS]
+        
+        # Near-duplicate problems reuse the previous analysis
+        cached, embedding = await self.semantic_cache.lookup(problem_description, self.language)
+        if cached is not None:
+            return cached
+        
         system_prompt = SYSTEM_PROMPTS[self.language]["problem_analyzer"]
+        llm_description = await self._compress_description(problem_description)
         
         messages = [
             SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Analyze this problem:\n\n{problem_description}")
+            HumanMessage(content=f"Analyze this problem:\n\n{llm_description}")
         ]
         
+        # Pydantic response_format is sent as a strict JSON schema, so the
+        # model can't omit fields or invent values
         response = await self.llm.ainvoke(
             messages,
-            response_format={"type": "json_object"}
+            response_format=ProblemAnalysisSchema
         )
         
         try:
-            analysis = json.loads(response.content)
+            parsed = getattr(response, "additional_kwargs", {}).get("parsed")
+            if isinstance(parsed, ProblemAnalysisSchema):
+                analysis = parsed.model_dump()
+            else:
+                analysis = parse_llm_json(response.content)
             analysis["language"] = self.language
-            return analysis
-        except json.JSONDecodeError:
+        except (ValueError, TypeError):
             return {
                 "problem_summary": problem_description[:200],
                 "problem_type": "general",
@@ -172,6 +328,50 @@ class ProblemAnalyzer:
                 "language": self.language
             }
 
+        await self.semantic_cache.store(problem_description, self.language, analysis, embedding)
+        return analysis
+    
+    async def _compress_description(self, problem_description: str) -> str:
+        """Condense an oversized description so prompt size stays bounded"""
+        if len(problem_description) <= SUMMARIZE_DESCRIPTION_ABOVE:
+            return problem_description
+        
+        summarizer = ChatOpenAI(
+            model=settings.AI_ANALYZER_MODEL,
+            temperature=0,
+            max_tokens=1500,
+            api_key=settings.openai_api_key,
+            base_url=settings.AI_ANALYZER_BASE_URL
+        )
+        try:
+            response = await summarizer.ainvoke([
+                SystemMessage(content=SYSTEM_PROMPTS[self.language]["description_compressor"]),
+                HumanMessage(content=problem_description)
+            ])
+            if response.content:
+                return response.content
+        except Exception as e:
+            print(f"Description compression error: {e}")
+        
+        return problem_description[:SUMMARIZE_DESCRIPTION_ABOVE]
+
+
+# Fast path hit rate = hits / (hits + misses), misses = eligible problems without a match
+fast_path_stats = {"hits": 0, "misses": 0}
+
+FAST_PATH_TEXTS = {
+    "en": {
+        "strategy": "Simple single-skill problem: assigned directly to the best matching room member.",
+        "estimated_time": "1 day",
+        "reasoning": "Best match by skills ({skills}), {years} years of experience."
+    },
+    "ru": {
+        "strategy": "Простая задача на один навык: назначена напрямую наиболее подходящему участнику комнаты.",
+        "estimated_time": "1 день",
+        "reasoning": "Лучшее совпадение по навыкам ({skills}), опыт {years} лет."
+    }
+}
+
 
 # Enhanced state for subtask breakdown
 class EnhancedAgentState(TypedDict):
@@ -185,6 +385,66 @@ class EnhancedAgentState(TypedDict):
     overall_strategy: str
     model_used: str
     reasoning_steps: List[str]
+    tool_call_count: int
+    seen_tool_calls: List[str]  # name + sorted args of every executed call
+    repeated_tool_turns: int  # turns that repeated an earlier call (served from the memo)
+
+
+# Hard bounds on the model <-> tools loop (tool rounds and total tool calls).
+# _should_continue enforces them so the loop ends through the final answer;
+# the graph recursion limit is only a backstop above the longest allowed run
+MAX_TOOL_ROUNDS = 5
+MAX_TOOL_CALLS = 15
+MAX_AGENT_STEPS = 2 * MAX_TOOL_ROUNDS + 2
+# A turn repeating an earlier call is answered from the memo once;
+# repeating again means the model is looping
+MAX_REPEATED_TOOL_TURNS = 1
+
+AGENT_STOPPED_WARNING = "Agent stopped before finishing: too many or repeated tool calls"
+FINAL_ANSWER_PROMPT = (
+    "No more tool calls are available. Give the final breakdown now, "
+    "using only the information gathered so far."
+)
+
+
+def _tool_call_key(tool_call: Dict) -> str:
+    return orjson.dumps([tool_call["name"], tool_call["args"]], option=orjson.OPT_SORT_KEYS).decode()
+
+
+async def _agent_node(state: EnhancedAgentState, config: RunnableConfig) -> EnhancedAgentState:
+    configurable = config["configurable"]
+    return await configurable["orchestrator"]._call_model(state, configurable["llm"])
+
+
+async def _tools_node(state: EnhancedAgentState, config: RunnableConfig) -> EnhancedAgentState:
+    return await config["configurable"]["orchestrator"]._call_tools(state)
+
+
+@lru_cache(maxsize=1)
+def get_breakdown_graph():
+    """
+    Compiled breakdown workflow, built once per process
+    
+    The graph holds no per-request state: the orchestrator and the bound
+    model are passed in `config["configurable"]` on every invocation.
+    """
+    workflow = StateGraph(EnhancedAgentState)
+    
+    workflow.add_node("agent", _agent_node)
+    workflow.add_node("tools", _tools_node)
+    
+    workflow.set_entry_point("agent")
+    workflow.add_conditional_edges(
+        "agent",
+        TaskBreakdownOrchestrator._should_continue,
+        {
+            "tools": "tools",
+            "end": END
+        }
+    )
+    workflow.add_edge("tools", "agent")
+    
+    return workflow.compile()
 
 
 class TaskBreakdownOrchestrator:
@@ -193,14 +453,25 @@ class TaskBreakdownOrchestrator:
     with intelligent assignment using proper StateGraph workflow
     """
     
-    def __init__(self, room_id: int, db: AsyncSession, language: str = "en"):
+    def __init__(
+        self,
+        room_id: int,
+        session_factory: async_sessionmaker[AsyncSession],
+        language: str = "en"
+    ):
         self.room_id = room_id
-        self.db = db
+        # Tool calls run concurrently, and an AsyncSession must not be shared
+        # between coroutines, so every tool call takes its own pooled session
+        self.session_factory = session_factory
         self.language = language if language in SYSTEM_PROMPTS else "en"
+        self.system_content = get_orchestrator_system_prompt(self.language, self.room_id)
+        # Routes requests sharing the static system prompt prefix to the same OpenAI cache
+        self.prompt_cache_key = f"orchestrator-{self.language}"
         
         # Create tools
         self.tools = self._create_tools()
-        self.graph = None  # Will be created in create_breakdown
+        # Per-breakdown memo of tool results: tool call key -> task
+        self._tool_cache: Dict[str, asyncio.Future] = {}
     
     def _create_tools(self):
         """Create LangChain tools"""
@@ -208,7 +479,8 @@ class TaskBreakdownOrchestrator:
         @tool
         async def get_room_members_tool() -> List[Dict]:
             """Get all members of the current room with their roles and basic information"""
-            return await db_get_room_members(self.room_id, self.db)
+            async with self.session_factory() as db:
+                return await db_get_room_members(self.room_id, db)
         
         @tool
         async def find_employees_by_skills_tool(
@@ -217,13 +489,14 @@ class TaskBreakdownOrchestrator:
             min_experience_years: Optional[int] = None
         ) -> List[Dict]:
             """Find room members who have specific skills. Returns members sorted by match score."""
-            return await db_find_employees_by_skills(
-                room_id=self.room_id,
-                required_skills=required_skills,
-                db=self.db,
-                role=role,
-                min_experience_years=min_experience_years
-            )
+            async with self.session_factory() as db:
+                return await db_find_employees_by_skills(
+                    room_id=self.room_id,
+                    required_skills=required_skills,
+                    db=db,
+                    role=role,
+                    min_experience_years=min_experience_years
+                )
         
         @tool
         async def get_recent_tasks_tool(
@@ -231,17 +504,19 @@ class TaskBreakdownOrchestrator:
             limit: int = 20
         ) -> List[Dict]:
             """Get recent tasks from the room to understand what has been done before"""
-            return await db_get_recent_tasks(
-                room_id=self.room_id,
-                db=self.db,
-                topic=topic,
-                limit=limit
-            )
+            async with self.session_factory() as db:
+                return await db_get_recent_tasks(
+                    room_id=self.room_id,
+                    db=db,
+                    topic=topic,
+                    limit=limit
+                )
         
         @tool
         async def get_user_resume_tool(user_id: int) -> Optional[Dict]:
             """Get detailed resume and experience for a specific user"""
-            return await db_get_user_resume(user_id=user_id, db=self.db)
+            async with self.session_factory() as db:
+                return await db_get_user_resume(user_id=user_id, db=db)
         
         return [
             get_room_members_tool,
@@ -250,13 +525,25 @@ class TaskBreakdownOrchestrator:
             get_user_resume_tool
         ]
     
-    def _should_continue(self, state: EnhancedAgentState) -> Literal["tools", "end"]:
+    @staticmethod
+    def _should_continue(state: EnhancedAgentState) -> Literal["tools", "end"]:
         """Determine if agent should continue or finish"""
         messages = state["messages"]
         last_message = messages[-1]
         
         # If last message has tool calls, continue to tools
         if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+            # Stop a looping model: repeated calls again or tool/round budget exhausted
+            seen = set(state.get("seen_tool_calls", []))
+            if (
+                any(_tool_call_key(tool_call) in seen for tool_call in last_message.tool_calls)
+                and state.get("repeated_tool_turns", 0) >= MAX_REPEATED_TOOL_TURNS
+            ):
+                return "end"
+            if state.get("tool_call_count", 0) + len(last_message.tool_calls) > MAX_TOOL_CALLS:
+                return "end"
+            if sum(1 for message in messages if getattr(message, "tool_calls", None)) > MAX_TOOL_ROUNDS:
+                return "end"
             return "tools"
         
         # Otherwise end
@@ -265,7 +552,10 @@ class TaskBreakdownOrchestrator:
     async def _call_model(self, state: EnhancedAgentState, llm_with_tools: ChatOpenAI) -> EnhancedAgentState:
         """Call the LLM with current state"""
         messages = state["messages"]
-        response = await llm_with_tools.ainvoke(messages)
+        response = await llm_with_tools.ainvoke(
+            messages,
+            extra_body={"prompt_cache_key": self.prompt_cache_key}
+        )
         
         # Add to reasoning steps if available
         reasoning_steps = state.get("reasoning_steps", [])
@@ -279,32 +569,37 @@ class TaskBreakdownOrchestrator:
         }
     
     async def _call_tools(self, state: EnhancedAgentState) -> EnhancedAgentState:
-        """Execute tool calls from the last message"""
+        """Execute tool calls from the last message concurrently"""
         messages = state["messages"]
         last_message = messages[-1]
+        tool_calls = getattr(last_message, "tool_calls", None) or []
+        
+        results = await asyncio.gather(
+            *(self._execute_tool(tool_call["name"], tool_call["args"]) for tool_call in tool_calls),
+            return_exceptions=True
+        )
         
         tool_messages = []
+        for tool_call, result in zip(tool_calls, results):
+            # One failed tool must not drop the results of the others
+            if isinstance(result, Exception):
+                result = {"error": str(result)}
+            
+            tool_messages.append(ToolMessage(
+                content=orjson.dumps(result, option=orjson.OPT_NAIVE_UTC).decode(),
+                tool_call_id=tool_call["id"],
+                name=tool_call["name"]
+            ))
         
-        if hasattr(last_message, "tool_calls") and last_message.tool_calls:
-            for tool_call in last_message.tool_calls:
-                # Execute the tool
-                function_name = tool_call["name"]
-                function_args = tool_call["args"]
-                
-                result = await self._execute_tool(function_name, function_args)
-                
-                # Create tool message
-                from langchain_core.messages import ToolMessage
-                tool_message = ToolMessage(
-                    content=json.dumps(result),
-                    tool_call_id=tool_call["id"],
-                    name=function_name
-                )
-                tool_messages.append(tool_message)
+        seen = set(state.get("seen_tool_calls", []))
+        repeated = any(_tool_call_key(tool_call) in seen for tool_call in tool_calls)
         
         return {
             **state,
-            "messages": tool_messages
+            "messages": tool_messages,
+            "tool_call_count": state.get("tool_call_count", 0) + len(tool_calls),
+            "repeated_tool_turns": state.get("repeated_tool_turns", 0) + int(repeated),
+            "seen_tool_calls": state.get("seen_tool_calls", []) + [_tool_call_key(tool_call) for tool_call in tool_calls]
         }
     
     async def create_breakdown(
@@ -324,51 +619,50 @@ class TaskBreakdownOrchestrator:
         Returns:
             Complete breakdown with subtasks and assignments
         """
+        breakdown = {}
+        async for event in self.stream_breakdown(problem_analysis, problem_description, use_reasoning):
+            if event["type"] == "final":
+                breakdown = event["breakdown"]
+        return breakdown
+    
+    async def stream_breakdown(
+        self,
+        problem_analysis: Dict,
+        problem_description: str,
+        use_reasoning: bool = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Create task breakdown, yielding progress events as the agent works
+        
+        Yields:
+            {"type": "reasoning", "content": str} - model output tokens
+            {"type": "tool_result", "tool": str, "output": Any} - finished tool calls
+            {"type": "final", "breakdown": Dict} - always the last event
+        """
+        if not use_reasoning:
+            fast_breakdown = await self._try_fast_path(problem_analysis, problem_description)
+            if fast_breakdown is not None:
+                yield {"type": "final", "breakdown": fast_breakdown}
+                return
+        
+        self._tool_cache.clear()
+        
         # Determine model to use
         complexity = problem_analysis.get("estimated_complexity", "moderate")
         if use_reasoning is None:
             use_reasoning = complexity == "complex"
         
         llm = get_model_for_complexity(complexity, use_reasoning)
-        llm_with_tools = llm.bind_tools(self.tools)
-        
-        # Build system prompt
-        system_content = SYSTEM_PROMPTS[self.language]["task_orchestrator"].format(
-            room_id=self.room_id
+        # When the model stops calling tools it answers directly in BreakdownSchema
+        llm_with_tools = llm.bind_tools(
+            self.tools,
+            response_format=BreakdownSchema,
+            strict=True
         )
         
         # Build user message
         user_content = self._build_user_prompt(problem_description, problem_analysis)
         
-        # Create the graph
-        workflow = StateGraph(EnhancedAgentState)
-        
-        # Define nodes
-        async def call_model_node(state: EnhancedAgentState) -> EnhancedAgentState:
-            return await self._call_model(state, llm_with_tools)
-        
-        async def call_tools_node(state: EnhancedAgentState) -> EnhancedAgentState:
-            return await self._call_tools(state)
-        
-        # Add nodes
-        workflow.add_node("agent", call_model_node)
-        workflow.add_node("tools", call_tools_node)
-        
-        # Add edges
-        workflow.set_entry_point("agent")
-        workflow.add_conditional_edges(
-            "agent",
-            self._should_continue,
-            {
-                "tools": "tools",
-                "end": END
-            }
-        )
-        workflow.add_edge("tools", "agent")
-        
-        # Compile the graph
-        app = workflow.compile()
-        
         # Initialize state
         initial_state: EnhancedAgentState = {
             "room_id": self.room_id,
@@ -376,27 +670,140 @@ class TaskBreakdownOrchestrator:
             "problem_analysis": problem_analysis,
             "language": self.language,
             "messages": [
-                SystemMessage(content=system_content),
+                SystemMessage(content=self.system_content),
                 HumanMessage(content=user_content)
             ],
             "subtasks": [],
             "overall_strategy": "",
             "model_used": llm.model_name,
-            "reasoning_steps": []
+            "reasoning_steps": [],
+            "tool_call_count": 0,
+            "seen_tool_calls": [],
+            "repeated_tool_turns": 0
         }
         
         # Run the graph
-        final_state = await app.ainvoke(initial_state)
+        final_state = None
+        try:
+            async for event in get_breakdown_graph().astream_events(
+                initial_state,
+                config={
+                    "configurable": {"orchestrator": self, "llm": llm_with_tools},
+                    "recursion_limit": MAX_AGENT_STEPS
+                },
+                version="v2"
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if content:
+                        yield {"type": "reasoning", "content": content}
+                elif kind == "on_tool_end":
+                    yield {"type": "tool_result", "tool": event["name"], "output": event["data"].get("output")}
+                elif kind == "on_chain_end" and not event["parent_ids"]:
+                    final_state = event["data"]["output"]
+        except GraphRecursionError:
+            final_state = None
         
         # Parse final response
-        breakdown = await self._parse_breakdown(final_state["messages"], llm)
+        if final_state is None:
+            # Recursion limit: no state to answer from
+            breakdown = {
+                "overall_strategy": "",
+                "subtasks": [],
+                "warnings": [AGENT_STOPPED_WARNING]
+            }
+        elif getattr(final_state["messages"][-1], "tool_calls", None):
+            # Loop was cut (repeated call or tool budget) before the final answer:
+            # ask once more with tools disabled, so the gathered results aren't lost
+            try:
+                breakdown = await self._final_answer(llm, final_state["messages"])
+            except Exception as e:
+                print(f"Final breakdown answer error: {e}")
+                breakdown = {"overall_strategy": "", "subtasks": [], "warnings": []}
+            breakdown["warnings"] = [AGENT_STOPPED_WARNING] + list(breakdown.get("warnings") or [])
+        else:
+            breakdown = self._parse_breakdown(final_state["messages"])
         breakdown["model_used"] = llm.model_name
-        breakdown["reasoning_steps"] = final_state.get("reasoning_steps", [])
+        breakdown["reasoning_steps"] = (final_state or {}).get("reasoning_steps", [])
         
-        return breakdown
+        yield {"type": "final", "breakdown": breakdown}
+    
+    async def _final_answer(self, llm: ChatOpenAI, messages: List) -> Dict:
+        """Final BreakdownSchema answer from the tool results gathered so far"""
+        llm_without_tools = llm.bind_tools(
+            self.tools,
+            response_format=BreakdownSchema,
+            strict=True,
+            tool_choice="none"
+        )
+        # The cut-off message asks for calls that never ran; a tool call
+        # without its result is rejected by the API, so it is dropped
+        response = await llm_without_tools.ainvoke(
+            messages[:-1] + [HumanMessage(content=FINAL_ANSWER_PROMPT)],
+            extra_body={"prompt_cache_key": self.prompt_cache_key}
+        )
+        return self._parse_breakdown([response])
+    
+    async def _try_fast_path(self, problem_analysis: Dict, problem_description: str) -> Optional[Dict]:
+        """
+        Build breakdown without the LLM for trivially simple problems
+        
+        Applies to simple problems with a single required skill: the best
+        matching room member gets one subtask covering the whole problem.
+        
+        Returns:
+            Breakdown dict, or None if the problem needs the full agent
+        """
+        required_skills = problem_analysis.get("required_skills") or []
+        if problem_analysis.get("estimated_complexity") != "simple" or len(required_skills) != 1:
+            return None
+        
+        async with self.session_factory() as db:
+            candidates = await db_find_employees_by_skills(
+                room_id=self.room_id,
+                required_skills=required_skills,
+                db=db
+            )
+        
+        if not candidates:
+            fast_path_stats["misses"] += 1
+            return None
+        
+        fast_path_stats["hits"] += 1
+        best = candidates[0]
+        texts = FAST_PATH_TEXTS[self.language]
+        priority = problem_analysis.get("priority")
+        
+        return {
+            "overall_strategy": texts["strategy"],
+            "subtasks": [{
+                "title": (problem_analysis.get("problem_summary") or problem_description)[:255],
+                "description": problem_description,
+                "assigned_to_user_id": best["user_id"],
+                "assigned_to_username": best["username"],
+                "priority": priority if priority in ("low", "medium", "high", "urgent") else "medium",
+                "estimated_time": texts["estimated_time"],
+                "estimated_hours": 8,
+                "due_date_days": 1 if priority == "urgent" else 3,
+                "complexity_score": 3,
+                "required_skills": required_skills,
+                "reasoning": texts["reasoning"].format(
+                    skills=", ".join(best["matching_skills"]),
+                    years=best.get("years_of_experience") or 0
+                )
+            }],
+            "warnings": [],
+            "model_used": "fast-path",
+            "reasoning_steps": []
+        }
     
     def _build_user_prompt(self, problem_description: str, analysis: Dict) -> str:
         """Build detailed user prompt"""
+        # The analysis summary carries the gist of long descriptions
+        problem_description = problem_description[:SUMMARIZE_DESCRIPTION_ABOVE]
+        required_skills = ', '.join((analysis.get('required_skills') or [])[:MAX_PROMPT_SKILLS])
+        
         if self.language == "ru":
             return f"""Задача для анализа и разбивки:
 
@@ -405,7 +812,7 @@ class TaskBreakdownOrchestrator:
 Анализ проблемы:
 - Тип: {analysis.get('problem_type')}
 - Приоритет: {analysis.get('priority')}
-- Необходимые навыки: {', '.join(analysis.get('required_skills', []))}
+- Необходимые навыки: {required_skills}
 - Сложность: {analysis.get('estimated_complexity')}
 - Резюме: {analysis.get('problem_summary')}
 
@@ -425,7 +832,7 @@ Description: {problem_description}
 Problem Analysis:
 - Type: {analysis.get('problem_type')}
 - Priority: {analysis.get('priority')}
-- Required Skills: {', '.join(analysis.get('required_skills', []))}
+- Required Skills: {required_skills}
 - Complexity: {analysis.get('estimated_complexity')}
 - Summary: {analysis.get('problem_summary')}
 
@@ -439,100 +846,33 @@ For EACH subtask:
 Use available tools to gather information about room members."""
     
     async def _execute_tool(self, function_name: str, arguments: Dict) -> Any:
-        """Execute a tool function"""
+        """Execute a tool function, reusing the result of an identical earlier call"""
+        key = _tool_call_key({"name": function_name, "args": arguments})
+        # Store the task, not the result, so identical calls in one parallel batch share it
+        task = self._tool_cache.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_tool(function_name, arguments))
+            self._tool_cache[key] = task
+        return await task
+    
+    async def _run_tool(self, function_name: str, arguments: Dict) -> Any:
         for tool in self.tools:
             if tool.name == function_name:
                 return await tool.ainvoke(arguments)
         return {"error": f"Unknown tool: {function_name}"}
     
-    async def _parse_breakdown(self, messages: List, llm: ChatOpenAI) -> Dict:
-        """Parse agent's response into structured breakdown"""
+    def _parse_breakdown(self, messages: List) -> Dict:
+        """Extract structured breakdown from the agent's final message"""
         last_message = messages[-1]
         
-        # Language-specific prompts
-        if self.language == "ru":
-            parse_prompt = """На основе твоего анализа, предоставь разбивку задач в этом JSON формате:
-{
-    "overall_strategy": "Краткое объяснение общего подхода",
-    "subtasks": [
-        {
-            "title": "Название подзадачи",
-            "description": "Детальное описание",
-            "assigned_to_user_id": <user_id или null>,
-            "assigned_to_username": "<username или null>",
-            "priority": "low|medium|high|urgent",
-            "estimated_time": "оценка времени (например '2-3 дня')",
-            "estimated_hours": <число часов, например 16>,
-            "due_date_days": <через сколько дней дедлайн, например 3>,
-            "complexity_score": <1-10: 1=тривиальная, 3=простая, 5=средняя, 7=сложная, 10=очень сложная>,
-            "required_skills": ["навык1", "навык2"],
-            "reasoning": "Почему выбран этот человек и такая оценка"
-        }
-    ],
-    "warnings": ["любые предупреждения или заметки"]
-}
-
-ВАЖНО при оценке сложности:
-- 1-2: Простые изменения, не требует глубоких знаний (например, изменение текста, small fix)
-- 3-4: Простая задача, требует базовых знаний (например, добавление кнопки, простой компонент)
-- 5-6: Средняя сложность, требует хорошего понимания системы (например, новая фича с интеграцией)
-- 7-8: Сложная задача, требует глубоких знаний (например, рефакторинг архитектуры, сложная логика)
-- 9-10: Очень сложная, критическая задача (например, полная переработка модуля, нестандартная проблема)
-
-Дедлайн определяй на основе:
-- Сложности задачи
-- Опыта назначенного человека
-- Приоритета задачи
-- Зависимостей от других задач
-
-Твой анализ:
-""" + last_message.content + "\n\nВерни ТОЛЬКО JSON, без дополнительного текста. Все текстовые поля должны быть на русском языке."
-        else:  # en
-            parse_prompt = """Based on your analysis, provide the task breakdown in this JSON format:
-{
-    "overall_strategy": "Brief explanation of the overall approach",
-    "subtasks": [
-        {
-            "title": "Subtask title",
-            "description": "Detailed description",
-            "assigned_to_user_id": <user_id or null>,
-            "assigned_to_username": "<username or null>",
-            "priority": "low|medium|high|urgent",
-            "estimated_time": "time estimate (e.g. '2-3 days')",
-            "estimated_hours": <number of hours, e.g. 16>,
-            "due_date_days": <days from now for deadline, e.g. 3>,
-            "complexity_score": <1-10: 1=trivial, 3=simple, 5=moderate, 7=complex, 10=very complex>,
-            "required_skills": ["skill1", "skill2"],
-            "reasoning": "Why this person was chosen and the estimation rationale"
-        }
-    ],
-    "warnings": ["any concerns or notes"]
-}
-
-IMPORTANT for complexity scoring:
-- 1-2: Simple changes, no deep knowledge needed (e.g., text change, small fix)
-- 3-4: Simple task, requires basic knowledge (e.g., adding button, simple component)
-- 5-6: Moderate complexity, requires good system understanding (e.g., new feature with integration)
-- 7-8: Complex task, requires deep knowledge (e.g., architecture refactoring, complex logic)
-- 9-10: Very complex, critical task (e.g., full module rebuild, non-standard problem)
-
-Deadline should be based on:
-- Task complexity
-- Assignee's experience level
-- Task priority
-- Dependencies on other tasks
-
-Your analysis:
-""" + last_message.content + "\n\nReturn ONLY the JSON, no additional text."
-        
-        response = await llm.ainvoke(
-            [HumanMessage(content=parse_prompt)],
-            response_format={"type": "json_object"}
-        )
+        parsed = getattr(last_message, "additional_kwargs", {}).get("parsed")
+        if isinstance(parsed, BreakdownSchema):
+            return parsed.model_dump()
         
+        # Structured output without the parsed object (e.g. streamed response)
         try:
-            return json.loads(response.content)
-        except json.JSONDecodeError:
+            return parse_llm_json(last_message.content)
+        except (ValueError, TypeError):
             return {
                 "overall_strategy": last_message.content,
                 "subtasks": [],
@@ -1,7 +1,8 @@
 from core.database import Base
 from datetime import datetime
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, Enum, JSON
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, Enum, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 import enum
 
 
@@ -19,6 +20,17 @@ class AIAnalysisHistory(Base):
     Stores what AI suggested and whether it was applied
     """
     __tablename__ = "ai_analysis_history"
+    __table_args__ = (
+        # History pagination: WHERE room_id = ? ORDER BY created_at DESC
+        Index("ix_ai_analysis_history_room_id_created_at", "room_id", "created_at"),
+        # Containment queries on the analysis (e.g. problem_type), PostgreSQL only
+        Index(
+            "ix_ai_analysis_history_analysis_data_gin",
+            "analysis_data",
+            postgresql_using="gin",
+            postgresql_ops={"analysis_data": "jsonb_path_ops"}
+        ),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     
@@ -30,8 +42,8 @@ class AIAnalysisHistory(Base):
     problem_description: Mapped[str] = mapped_column(Text, nullable=False)
     language: Mapped[str] = mapped_column(String(10), default="en", nullable=False)  # ru, en, kk
     
-    # AI Analysis result (stored as JSON)
-    analysis_data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # AI Analysis result (stored as JSONB on PostgreSQL)
+    analysis_data: Mapped[dict] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
     # Structure:
     # {
     #   "problem_analysis": {...},
@@ -3,11 +3,14 @@ Enhanced AI Agent API Routes with Owner-only Access
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from datetime import datetime
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, desc, insert
+from datetime import datetime, timedelta
+from typing import Dict
+import orjson
 
-from core.database import get_db
+from core.database import get_db, get_session_factory
 from auth.dep import get_current_user
 from auth.models import User
 from my_tasks.models import Task, TaskStatus, TaskPriority, TaskAssignment
@@ -23,13 +26,13 @@ from .schemas import (
     ApplyBreakdownResponse,
     AnalysisHistoryResponse,
     AnalysisHistoryItem,
-    SubtaskSuggestion
+    SubtaskSuggestionListAdapter
 )
 from .agents import ProblemAnalyzer, TaskBreakdownOrchestrator
 
 # Import WebSocket manager and notification service
 from notifications.websocket import manager as ws_manager
-from notifications.service import create_task_assigned_notification
+from notifications.service import build_task_assigned_notification
 
 
 router = APIRouter(prefix="/ai", tags=["AI Agent"])
@@ -63,6 +66,53 @@ async def verify_room_owner(
     return membership
 
 
+async def save_breakdown_history(
+    request: TaskBreakdownRequest,
+    user_id: int,
+    problem_analysis: Dict,
+    breakdown: Dict,
+    db: AsyncSession
+) -> AIAnalysisHistory:
+    """Save breakdown to history (status=pending)"""
+    analysis_data = {
+        "problem_analysis": problem_analysis,
+        "suggested_subtasks": breakdown.get("subtasks", []),
+        "overall_strategy": breakdown.get("overall_strategy", ""),
+        "model_used": breakdown.get("model_used", "gpt-4o")
+    }
+    
+    ai_analysis = AIAnalysisHistory(
+        room_id=request.room_id,
+        created_by_id=user_id,
+        problem_description=request.problem_description,
+        language=request.language,
+        analysis_data=analysis_data,
+        status=AnalysisStatus.PENDING
+    )
+    
+    db.add(ai_analysis)
+    await db.commit()
+    
+    return ai_analysis
+
+
+def build_breakdown_response(
+    ai_analysis: AIAnalysisHistory,
+    problem_analysis: Dict,
+    breakdown: Dict
+) -> TaskBreakdownResponse:
+    return TaskBreakdownResponse(
+        analysis_id=ai_analysis.id,
+        overall_strategy=breakdown.get("overall_strategy", ""),
+        subtasks=SubtaskSuggestionListAdapter.validate_python(breakdown.get("subtasks", [])),
+        problem_analysis=problem_analysis,
+        model_used=breakdown.get("model_used", "gpt-4o"),
+        warnings=breakdown.get("warnings", []),
+        status="pending",
+        created_at=ai_analysis.created_at.isoformat()
+    )
+
+
 @router.post("/analyze-problem", response_model=ProblemAnalysisResponse)
 async def analyze_problem(
     request: ProblemAnalysisRequest,
@@ -82,7 +132,8 @@ async def analyze_problem(
 async def create_task_breakdown(
     request: TaskBreakdownRequest,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory)
 ):
     """
     Create AI-powered task breakdown with subtask suggestions
@@ -122,8 +173,8 @@ async def create_task_breakdown(
     # Create breakdown
     orchestrator = TaskBreakdownOrchestrator(
         room_id=request.room_id,
-        db=db,
-        language=request.language
+        session_factory=session_factory,
+        language=problem_analysis.get("language", request.language)
     )
     
     breakdown = await orchestrator.create_breakdown(
@@ -133,26 +184,10 @@ async def create_task_breakdown(
     )
     
     # Save to history
-    analysis_data = {
-        "problem_analysis": problem_analysis,
-        "suggested_subtasks": breakdown.get("subtasks", []),
-        "overall_strategy": breakdown.get("overall_strategy", ""),
-        "model_used": breakdown.get("model_used", "gpt-4o")
-    }
-    
-    ai_analysis = AIAnalysisHistory(
-        room_id=request.room_id,
-        created_by_id=current_user.id,
-        problem_description=request.problem_description,
-        language=request.language,
-        analysis_data=analysis_data,
-        status=AnalysisStatus.PENDING
+    ai_analysis = await save_breakdown_history(
+        request, current_user.id, problem_analysis, breakdown, db
     )
     
-    db.add(ai_analysis)
-    await db.commit()
-    await db.refresh(ai_analysis)
-    
     # Send WebSocket update: Analysis complete
     await ws_manager.send_personal_message({
         "type": "ai_progress",
@@ -161,16 +196,73 @@ async def create_task_breakdown(
         "analysis_id": ai_analysis.id
     }, current_user.id)
     
-    return TaskBreakdownResponse(
-        analysis_id=ai_analysis.id,
-        overall_strategy=breakdown.get("overall_strategy", ""),
-        subtasks=[SubtaskSuggestion(**st) for st in breakdown.get("subtasks", [])],
-        problem_analysis=problem_analysis,
-        model_used=breakdown.get("model_used", "gpt-4o"),
-        warnings=breakdown.get("warnings", []),
-        status="pending",
-        created_at=ai_analysis.created_at.isoformat()
-    )
+    return build_breakdown_response(ai_analysis, problem_analysis, breakdown)
+
+
+@router.post("/breakdown-task/stream")
+async def stream_task_breakdown(
+    request: TaskBreakdownRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory)
+):
+    """
+    Same as /breakdown-task, streamed as Server-Sent Events
+    
+    **OWNER ONLY**
+    
+    Events (JSON in `data:`):
+    - {"type": "started"} - sent right away, before the problem analysis
+    - {"type": "analysis", "problem_analysis": {...}}
+    - {"type": "reasoning", "content": "..."} - model tokens as they arrive
+    - {"type": "tool_result", "tool": "...", "output": ...}
+    - {"type": "final", "breakdown": TaskBreakdownResponse} - saved to history
+    - {"type": "error", "message": "..."} - sent instead of "final" if the breakdown fails
+    """
+    # Verify owner before the stream starts so errors keep their status code
+    await verify_room_owner(request.room_id, current_user.id, db)
+    
+    user_id = current_user.id
+    
+    def sse(event: Dict) -> bytes:
+        return b"data: " + orjson.dumps(event, default=str) + b"\n\n"
+    
+    async def event_stream():
+        # First bytes go out before the LLM round trip of the analysis
+        yield sse({"type": "started"})
+        
+        try:
+            analyzer = ProblemAnalyzer(language=request.language)
+            problem_analysis = await analyzer.analyze_problem(request.problem_description)
+            yield sse({"type": "analysis", "problem_analysis": problem_analysis})
+            
+            orchestrator = TaskBreakdownOrchestrator(
+                room_id=request.room_id,
+                session_factory=session_factory,
+                language=problem_analysis.get("language", request.language)
+            )
+            async for event in orchestrator.stream_breakdown(
+                problem_analysis=problem_analysis,
+                problem_description=request.problem_description,
+                use_reasoning=request.use_reasoning_model
+            ):
+                if event["type"] != "final":
+                    yield sse(event)
+                    continue
+                
+                # The request session may already be closed while the body streams
+                async with session_factory() as session:
+                    ai_analysis = await save_breakdown_history(
+                        request, user_id, problem_analysis, event["breakdown"], session
+                    )
+                response = build_breakdown_response(ai_analysis, problem_analysis, event["breakdown"])
+                yield sse({"type": "final", "breakdown": response.model_dump(mode="json")})
+        except Exception as e:
+            # Headers are already sent: report the failure as the last event
+            print(f"Breakdown stream error: {e}")
+            yield sse({"type": "error", "message": "Breakdown failed, please try again"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @router.post("/apply-breakdown", response_model=ApplyBreakdownResponse)
@@ -220,10 +312,6 @@ async def apply_task_breakdown(
             if i in request.selected_subtask_indices
         ]
     
-    # Create tasks
-    created_tasks = []
-    task_ids = []
-    
     priority_map = {
         "low": TaskPriority.LOW,
         "medium": TaskPriority.MEDIUM,
@@ -231,100 +319,116 @@ async def apply_task_breakdown(
         "urgent": TaskPriority.URGENT
     }
     
+    # Resolve assignees given only by username in one query
+    usernames = {
+        st["assigned_to_username"] for st in subtasks
+        if not st.get("assigned_to_user_id") and st.get("assigned_to_username")
+    }
+    username_to_id = {}
+    if usernames:
+        member_query = (
+            select(User.username, RoomMember.user_id)
+            .join(User, RoomMember.user_id == User.id)  # Explicit join condition
+            .where(
+                RoomMember.room_id == analysis.room_id,
+                User.username.in_(usernames)
+            )
+        )
+        username_to_id = dict((await db.execute(member_query)).all())
+    
+    now = datetime.utcnow()
+    task_rows = []
+    assignee_ids = []
+    
     for subtask in subtasks:
         # Calculate deadline if suggested by AI
         due_date = None
         if subtask.get("due_date_days"):
             try:
-                from datetime import timedelta
                 days = int(subtask["due_date_days"])
-                due_date = datetime.utcnow() + timedelta(days=days)
+                due_date = now + timedelta(days=days)
             except (ValueError, TypeError):
                 pass  # Skip if invalid
         
-        # Create task
-        new_task = Task(
-            title=subtask["title"],
-            description=subtask["description"],
-            room_id=analysis.room_id,
-            status=TaskStatus.TODO,
-            priority=priority_map.get(subtask.get("priority", "medium"), TaskPriority.MEDIUM),
-            created_by_id=current_user.id,
-            due_date=due_date,  # Set deadline from AI suggestion
-            estimated_hours=subtask.get("estimated_hours"),
-            complexity_score=subtask.get("complexity_score")
-        )
-        
-        db.add(new_task)
-        await db.flush()
+        task_rows.append({
+            "title": subtask["title"],
+            "description": subtask["description"],
+            "room_id": analysis.room_id,
+            "status": TaskStatus.TODO,
+            "priority": priority_map.get(subtask.get("priority", "medium"), TaskPriority.MEDIUM),
+            "created_by_id": current_user.id,
+            "due_date": due_date,  # Set deadline from AI suggestion
+            "estimated_hours": subtask.get("estimated_hours"),
+            "complexity_score": subtask.get("complexity_score")
+        })
         
-        # Assign if user specified
-        assignee_id = subtask.get("assigned_to_user_id")
+        # Fallback: username if ID is missing
+        assignee_ids.append(
+            subtask.get("assigned_to_user_id")
+            or username_to_id.get(subtask.get("assigned_to_username"))
+        )
+    
+    # Create all tasks with a single INSERT ... RETURNING id
+    task_ids = []
+    if task_rows:
+        task_ids = list(await db.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            task_rows
+        ))
+    
+    assignments = [
+        {"task_id": task_id, "user_id": assignee_id, "assigned_by_id": current_user.id}
+        for task_id, assignee_id in zip(task_ids, assignee_ids)
+        if assignee_id
+    ]
+    if assignments:
+        await db.execute(insert(TaskAssignment), assignments)
         
-        # Fallback: try to find user by username if ID is missing but username is present
-        if not assignee_id and subtask.get("assigned_to_username"):
-            username = subtask["assigned_to_username"]
-            # Find user in room members - FIXED: explicitly specify join condition
-            member_query = (
-                select(RoomMember)
-                .join(User, RoomMember.user_id == User.id)  # Explicit join condition
-                .where(
-                    RoomMember.room_id == analysis.room_id,
-                    User.username == username
-                )
-            )
-            member_result = await db.execute(member_query)
-            member = member_result.scalar_one_or_none()
-            if member:
-                assignee_id = member.user_id
-
-        if assignee_id:
-            assignment = TaskAssignment(
-                task_id=new_task.id,
+        # Notifications for assigned users are saved in the same transaction
+        db.add_all([
+            build_task_assigned_notification(
                 user_id=assignee_id,
-                assigned_by_id=current_user.id
+                task_id=task_id,
+                task_title=row["title"],
+                assigned_by_name=current_user.username
             )
-            db.add(assignment)
-            
-            # Create notification for assigned user
-            try:
-                await create_task_assigned_notification(
-                    db=db,
-                    user_id=assignee_id,
-                    task_id=new_task.id,
-                    task_title=new_task.title,
-                    assigned_by_name=current_user.username
-                )
-                
-                # Send WebSocket notification
-                await ws_manager.notify_task_assigned(
-                    user_id=assignee_id,
-                    task_data={
-                        "task_id": new_task.id,
-                        "title": new_task.title,
-                        "assigned_by": current_user.username
-                    }
-                )
-            except Exception as e:
-                # Don't fail task creation if notification fails
-                print(f"Failed to create notification: {e}")
-        
-        task_ids.append(new_task.id)
-        created_tasks.append({
-            "task_id": new_task.id,
-            "title": new_task.title,
-            "assigned_to": subtask.get("assigned_to_username"),
-            "priority": subtask.get("priority")
-        })
+            for task_id, assignee_id, row in zip(task_ids, assignee_ids, task_rows)
+            if assignee_id
+        ])
     
     # Update analysis status
     analysis.status = AnalysisStatus.APPROVED
-    analysis.applied_at = datetime.utcnow()
+    analysis.applied_at = now
     analysis.created_task_ids = task_ids
     
     await db.commit()
     
-    # TODO: Send notifications to assigned users
+    # Send WebSocket notifications once the tasks are committed
+    for task_id, assignee_id, row in zip(task_ids, assignee_ids, task_rows):
+        if not assignee_id:
+            continue
+        try:
+            await ws_manager.notify_task_assigned(
+                user_id=assignee_id,
+                task_data={
+                    "task_id": task_id,
+                    "title": row["title"],
+                    "assigned_by": current_user.username
+                }
+            )
+        except Exception as e:
+            # Don't fail task creation if notification fails
+            print(f"Failed to send notification: {e}")
+    
+    created_tasks = [
+        {
+            "task_id": task_id,
+            "title": row["title"],
+            "assigned_to": subtask.get("assigned_to_username"),
+            "priority": subtask.get("priority")
+        }
+        for task_id, row, subtask in zip(task_ids, task_rows, subtasks)
+    ]
     
     return ApplyBreakdownResponse(
         analysis_id=analysis.id,
@@ -432,7 +536,7 @@ async def get_analysis_details(
     return TaskBreakdownResponse(
         analysis_id=analysis.id,
         overall_strategy=analysis.analysis_data.get("overall_strategy", ""),
-        subtasks=[SubtaskSuggestion(**st) for st in analysis.analysis_data.get("suggested_subtasks", [])],
+        subtasks=SubtaskSuggestionListAdapter.validate_python(analysis.analysis_data.get("suggested_subtasks", [])),
         problem_analysis=analysis.analysis_data.get("problem_analysis", {}),
         model_used=analysis.analysis_data.get("model_used", "unknown"),
         warnings=[],
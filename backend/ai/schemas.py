@@ -2,11 +2,15 @@
 Enhanced Pydantic schemas for AI agent endpoints
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from typing import List, Optional, Literal, get_args
 from datetime import datetime
 
 
+Priority = Literal["low", "medium", "high", "urgent"]
+AnalysisStatusValue = Literal["pending", "approved", "rejected", "partially_applied"]
+
+
 class ProblemAnalysisRequest(BaseModel):
     """Request to analyze a problem"""
     problem_description: str = Field(..., description="Problem description text")
@@ -24,13 +28,23 @@ class ProblemAnalysisResponse(BaseModel):
     language: str
 
 
+class ProblemAnalysisSchema(BaseModel):
+    """Structured output of the problem analyzer"""
+    problem_summary: str = Field(..., description="Brief 1-2 sentence summary")
+    problem_type: str = Field(..., description="Category: bug, feature, infrastructure, database, frontend, backend, etc.")
+    priority: Priority
+    required_skills: List[str] = Field(..., description="Skills needed to solve the problem")
+    estimated_complexity: Literal["simple", "moderate", "complex"]
+    keywords: List[str] = Field(..., description="Important keywords")
+
+
 class SubtaskSuggestion(BaseModel):
     """Single subtask suggestion"""
     title: str
     description: str
     assigned_to_user_id: Optional[int]
     assigned_to_username: Optional[str]
-    priority: str
+    priority: Priority
     estimated_time: str  # Human-readable like "2-3 days"
     estimated_hours: Optional[int] = Field(None, description="Estimated hours for completion")
     due_date_days: Optional[int] = Field(None, description="Days from now for deadline")
@@ -38,6 +52,21 @@ class SubtaskSuggestion(BaseModel):
     required_skills: List[str]
     reasoning: str
 
+    @field_validator("priority", mode="before")
+    @classmethod
+    def normalize_priority(cls, v):
+        """Stored breakdowns may hold "High", "critical", etc.; unknown values read as medium"""
+        if isinstance(v, str) and v.lower() in get_args(Priority):
+            return v.lower()
+        return "medium"
+
+
+class BreakdownSchema(BaseModel):
+    """Structured final answer of the breakdown agent"""
+    overall_strategy: str = Field(..., description="Brief explanation of the overall approach")
+    subtasks: List[SubtaskSuggestion] = Field(..., description="2-5 subtasks with assignments")
+    warnings: List[str] = Field(default_factory=list, description="Any concerns or notes")
+
 
 class TaskBreakdownRequest(BaseModel):
     """Request for AI task breakdown"""
@@ -55,7 +84,7 @@ class TaskBreakdownResponse(BaseModel):
     problem_analysis: dict
     model_used: str
     warnings: List[str]
-    status: str = Field("pending", description="Analysis status")
+    status: AnalysisStatusValue = Field("pending", description="Analysis status")
     created_at: str
 
 
@@ -73,7 +102,7 @@ class ApplyBreakdownResponse(BaseModel):
     analysis_id: int
     created_tasks: List[dict]
     total_created: int
-    status: str
+    status: AnalysisStatusValue
     applied_at: str
 
 
@@ -81,7 +110,7 @@ class AnalysisHistoryItem(BaseModel):
     """Single analysis history item"""
     id: int
     problem_description: str
-    status: str
+    status: AnalysisStatusValue
     overall_strategy: str
     subtasks_count: int
     created_tasks_count: int
@@ -94,3 +123,7 @@ class AnalysisHistoryResponse(BaseModel):
     """List of analysis history"""
     total: int
     items: List[AnalysisHistoryItem]
+
+
+# Built once at import; reused to validate subtask lists on every breakdown response
+SubtaskSuggestionListAdapter = TypeAdapter(List[SubtaskSuggestion])
@@ -0,0 +1,170 @@
+"""
+Semantic cache for ProblemAnalyzer results
+Reuses a previous analysis when a new problem description is close enough
+to an already analyzed one (same language only)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import operator
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_openai import OpenAIEmbeddings
+
+from core.cache import cache
+from core.config import settings
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_problem_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivial edits map to the same key"""
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def _unit_vector(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return vector
+    return [x / norm for x in vector]
+
+
+def _best_match(
+    embedding: List[float],
+    candidates: List[Tuple[str, List[float]]],
+    threshold: float
+) -> Optional[str]:
+    """Key of the most similar candidate with cosine similarity >= threshold"""
+    best_key, best_score = None, threshold
+    for key, candidate in candidates:
+        score = sum(map(operator.mul, embedding, candidate))
+        if score >= best_score:
+            best_key, best_score = key, score
+    return best_key
+
+
+class SemanticCache:
+    """
+    Two-tier cache for problem analyses
+
+    1. Exact tier (Redis): sha256 of the normalized text -> analysis JSON
+    2. Semantic tier (in-process): unit embedding -> analysis, matched by
+       cosine similarity above `threshold`
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 512,
+        ttl_seconds: int = 86400,
+        enabled: bool = True
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+        # "{language}:{digest}" -> (language, unit embedding, analysis)
+        self._entries: "OrderedDict[str, Tuple[str, List[float], Dict]]" = OrderedDict()
+
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        if self._embeddings is None:
+            self._embeddings = OpenAIEmbeddings(
+                model="text-embedding-3-small",
+                api_key=settings.openai_api_key,
+                max_retries=0
+            )
+        return self._embeddings
+
+    @staticmethod
+    def _key(normalized: str, language: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{language}:{digest}"
+
+    async def _embed(self, normalized: str) -> Optional[List[float]]:
+        try:
+            return _unit_vector(await self.embeddings.aembed_query(normalized))
+        except Exception as e:
+            # Cache must never break analysis
+            print(f"Semantic cache embedding error: {e}")
+            return None
+
+    async def lookup(
+        self,
+        problem_description: str,
+        language: str
+    ) -> Tuple[Optional[Dict], Optional[List[float]]]:
+        """
+        Find a cached analysis for the description
+
+        Returns:
+            (cached analysis or None, embedding of the description or None).
+            The embedding is returned so `store` doesn't have to compute it again.
+        """
+        if not self.enabled:
+            return None, None
+
+        normalized = normalize_problem_text(problem_description)
+        key = self._key(normalized, language)
+
+        cached = await cache.get(f"ai:analysis:{key}")
+        if cached:
+            return json.loads(cached), None
+
+        embedding = await self._embed(normalized)
+        if embedding is None:
+            return None, None
+
+        # Scanning up to max_entries embeddings is tens of ms of pure Python:
+        # run it off the event loop, over a snapshot of the same-language entries
+        candidates = [
+            (entry_key, entry_embedding)
+            for entry_key, (entry_language, entry_embedding, _) in self._entries.items()
+            if entry_language == language
+        ]
+        best_key = await asyncio.to_thread(_best_match, embedding, candidates, self.threshold)
+
+        if best_key is None or best_key not in self._entries:
+            return None, embedding
+
+        self._entries.move_to_end(best_key)
+        return dict(self._entries[best_key][2]), embedding
+
+    async def store(
+        self,
+        problem_description: str,
+        language: str,
+        analysis: Dict,
+        embedding: Optional[List[float]] = None
+    ) -> None:
+        """Remember analysis for the description (both tiers)"""
+        if not self.enabled:
+            return
+
+        normalized = normalize_problem_text(problem_description)
+        key = self._key(normalized, language)
+
+        await cache.set(f"ai:analysis:{key}", json.dumps(analysis), ex=self.ttl_seconds)
+
+        if embedding is None:
+            return
+
+        self._entries[key] = (language, embedding, dict(analysis))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+semantic_cache = SemanticCache(
+    threshold=settings.AI_SEMANTIC_CACHE_THRESHOLD,
+    enabled=settings.AI_SEMANTIC_CACHE_ENABLED
+)
@@ -2,18 +2,20 @@
 AI Agent Tools
 Functions that the AI agent can call to gather information
 All tools work within a specific room context
+Datetimes are returned as-is: the agent serializes tool results with orjson
 """
 
 from typing import List, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select, and_, or_, func, literal_column, cast, exists, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import joinedload, selectinload
 
 from auth.models import User
 from rooms.models import Room, RoomMember
-from my_tasks.models import Task, TaskStatus, TaskAssignment
-from resume_ai.models import ResumeAnalysis
-import json
+from my_tasks.models import Task, TaskStatus, TaskAssignment, task_search_vector
+from resume_ai.models import ResumeAnalysis, normalize_skill
+import orjson
 
 
 async def get_room_members(
@@ -46,18 +48,43 @@ async def get_room_members(
             "email": member.user.email,
             "role_in_room": member.role.value,
             "is_lead": member.user.is_lead,
-            "joined_at": member.joined_at.isoformat()
+            "joined_at": member.joined_at
         }
         for member in members
     ]
 
 
+def _skills_overlap(required: List[str], dialect_name: str):
+    """SQL condition: precomputed skills_normalized shares an element with `required`"""
+    if dialect_name == "postgresql":
+        # GIN-indexed JSONB key existence
+        return ResumeAnalysis.skills_normalized.op("?|")(cast(required, ARRAY(Text)))
+    
+    skill = func.json_each(ResumeAnalysis.skills_normalized).table_valued("value")
+    return exists(select(1).select_from(skill).where(skill.c.value.in_(required)))
+
+
+def _skills_match_count(required: List[str], dialect_name: str):
+    """SQL expression: how many of `required` are in skills_normalized"""
+    if dialect_name == "postgresql":
+        skill = func.jsonb_array_elements_text(ResumeAnalysis.skills_normalized).table_valued("value")
+    else:
+        skill = func.json_each(ResumeAnalysis.skills_normalized).table_valued("value")
+    return (
+        select(func.count())
+        .select_from(skill)
+        .where(skill.c.value.in_(required))
+        .scalar_subquery()
+    )
+
+
 async def find_employees_by_skills(
     room_id: int,
     required_skills: List[str],
     db: AsyncSession,
     role: Optional[str] = None,
-    min_experience_years: Optional[int] = None
+    min_experience_years: Optional[int] = None,
+    limit: int = 50
 ) -> List[Dict]:
     """
     Find room members with specific skills
@@ -69,26 +96,30 @@ async def find_employees_by_skills(
         db: Database session
         role: Optional role filter (e.g., "backend", "frontend")
         min_experience_years: Minimum years of experience
+        limit: Maximum number of best matches to return
         
     Returns:
-        List of matching users with their skills and experience
+        List of matching users with their skills and experience,
+        best match first
     """
-    # Get room members first
-    members_query = (
-        select(RoomMember.user_id)
-        .where(RoomMember.room_id == room_id)
-    )
-    members_result = await db.execute(members_query)
-    room_member_ids = [row[0] for row in members_result.all()]
-    
-    if not room_member_ids:
+    if not required_skills:
         return []
     
-    # Now find users with matching skills from room members only
+    required_normalized = list({normalize_skill(skill) for skill in required_skills})
+    dialect_name = db.get_bind().dialect.name
+    matched_count = _skills_match_count(required_normalized, dialect_name).label("matched_count")
+    
+    # Room membership is part of the join condition, served by the
+    # room_members (room_id, user_id) primary key
     query = (
-        select(User, ResumeAnalysis)
+        select(User, ResumeAnalysis, matched_count)
         .join(ResumeAnalysis, User.id == ResumeAnalysis.user_id)
-        .where(User.id.in_(room_member_ids))
+        .join(RoomMember, and_(RoomMember.user_id == User.id, RoomMember.room_id == room_id))
+        # Only resumes sharing at least one required skill leave the database
+        .where(_skills_overlap(required_normalized, dialect_name))
+        # Ranked in the database, only the top matches are fetched
+        .order_by(matched_count.desc(), User.id)
+        .limit(limit)
     )
     
     # Add experience filter if specified
@@ -97,37 +128,36 @@ async def find_employees_by_skills(
             ResumeAnalysis.years_of_experience >= min_experience_years
         )
     
+    # Role filter (members without a position, NULL or empty, are not excluded)
+    if role:
+        query = query.where(
+            or_(
+                func.coalesce(ResumeAnalysis.current_position, "") == "",
+                func.lower(ResumeAnalysis.current_position).contains(role.lower(), autoescape=True)
+            )
+        )
+    
     result = await db.execute(query)
     users_with_resume = result.all()
     
+    required_tokens = frozenset(required_normalized)
+    score_per_skill = 100 / len(required_normalized)
     matched_users = []
     
-    for user, resume in users_with_resume:
+    for user, resume, skills_matched in users_with_resume:
         # Parse skills from core_skills JSON field
         try:
-            if resume.core_skills:
-                user_skills = json.loads(resume.core_skills)
-            else:
-                user_skills = []
-        except:
+            user_skills = orjson.loads(resume.core_skills) if resume.core_skills else []
+        except orjson.JSONDecodeError:
             user_skills = []
         
         # Check if user has any of the required skills (case-insensitive)
-        user_skills_lower = [skill.lower() for skill in user_skills]
-        required_skills_lower = [skill.lower() for skill in required_skills]
-        
         matching_skills = [
             skill for skill in user_skills 
-            if skill.lower() in required_skills_lower
+            if normalize_skill(skill) in required_tokens
         ]
         
-        # Also check role if specified
-        if role and resume.current_position:
-            role_match = role.lower() in resume.current_position.lower()
-        else:
-            role_match = True
-        
-        if matching_skills and role_match:
+        if matching_skills:
             matched_users.append({
                 "user_id": user.id,
                 "username": user.username,
@@ -138,12 +168,9 @@ async def find_employees_by_skills(
                 "matching_skills": matching_skills,
                 "all_skills": user_skills,
                 "professional_summary": resume.professional_summary,
-                "match_score": len(matching_skills) / len(required_skills) * 100
+                "match_score": skills_matched * score_per_skill
             })
     
-    # Sort by match score (highest first)
-    matched_users.sort(key=lambda x: x["match_score"], reverse=True)
-    
     return matched_users
 
 
@@ -172,7 +199,8 @@ async def get_recent_tasks(
         .where(Task.room_id == room_id)
         .options(
             joinedload(Task.created_by),
-            joinedload(Task.assignments).joinedload(TaskAssignment.user)  # Added proper eager loading
+            # selectinload: no row multiplication per assignee, LIMIT applies to tasks
+            selectinload(Task.assignments).selectinload(TaskAssignment.user)
         )
         .order_by(Task.created_at.desc())
         .limit(limit)
@@ -184,12 +212,20 @@ async def get_recent_tasks(
     
     # Add topic filter if specified
     if topic:
-        query = query.where(
-            or_(
-                Task.title.ilike(f"%{topic}%"),
-                Task.description.ilike(f"%{topic}%")
+        if db.get_bind().dialect.name == "postgresql":
+            # Full-text match backed by the ix_tasks_search_fts GIN index
+            query = query.where(
+                task_search_vector(Task.title, Task.description).op("@@")(
+                    func.plainto_tsquery(literal_column("'simple'"), topic)
+                )
+            )
+        else:
+            query = query.where(
+                or_(
+                    Task.title.ilike(f"%{topic}%"),
+                    Task.description.ilike(f"%{topic}%")
+                )
             )
-        )
     
     result = await db.execute(query)
     tasks = result.scalars().all()
@@ -202,7 +238,7 @@ async def get_recent_tasks(
             "status": task.status.value,
             "priority": task.priority.value,
             "created_by": task.created_by.username,
-            "created_at": task.created_at.isoformat(),
+            "created_at": task.created_at,
             "assignees": [
                 {
                     "user_id": assignment.user.id,
@@ -210,7 +246,7 @@ async def get_recent_tasks(
                 }
                 for assignment in task.assignments
             ],
-            "due_date": task.due_date.isoformat() if task.due_date else None
+            "due_date": task.due_date
         }
         for task in tasks
     ]
@@ -238,13 +274,13 @@ async def get_user_resume(
         return None
     
     try:
-        core_skills = json.loads(resume.core_skills) if resume.core_skills else []
-    except:
+        core_skills = orjson.loads(resume.core_skills) if resume.core_skills else []
+    except orjson.JSONDecodeError:
         core_skills = []
     
     try:
-        languages = json.loads(resume.languages) if resume.languages else []
-    except:
+        languages = orjson.loads(resume.languages) if resume.languages else []
+    except orjson.JSONDecodeError:
         languages = []
     
     return {
@@ -279,26 +315,34 @@ async def get_room_info(
     Returns:
         Room information or None if not found
     """
+    # Считаем участников в БД, не загружая сами строки RoomMember
+    member_count = (
+        select(func.count())
+        .select_from(RoomMember)
+        .where(RoomMember.room_id == Room.id)
+        .correlate(Room)
+        .scalar_subquery()
+        .label("member_count")
+    )
     query = (
-        select(Room)
+        select(Room, member_count)
         .where(Room.id == room_id)
-        .options(
-            joinedload(Room.created_by),
-            joinedload(Room.members)
-        )
+        .options(joinedload(Room.created_by))
     )
     
     result = await db.execute(query)
-    room = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not room:
+    if not row:
         return None
     
+    room, total_members = row
+    
     return {
         "room_id": room.id,
         "name": room.name,
         "description": room.description,
         "created_by": room.created_by.username,
-        "created_at": room.created_at.isoformat(),
-        "total_members": len(room.members)
+        "created_at": room.created_at,
+        "total_members": total_members
     }
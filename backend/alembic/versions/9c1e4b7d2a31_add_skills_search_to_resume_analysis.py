@@ -0,0 +1,48 @@
+"""add_skills_search_to_resume_analysis
+
+Revision ID: 9c1e4b7d2a31
+Revises: 5000f09530ba
+Create Date: 2026-10-15 10:12:40.118230
+
+"""
+from typing import Sequence, Union
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e4b7d2a31'
+down_revision: Union[str, Sequence[str], None] = '5000f09530ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _skills_search(core_skills):
+    try:
+        skills = json.loads(core_skills) if core_skills else []
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(skills, list) or not skills:
+        return None
+    return "".join(f"|{str(skill).strip().lower().replace('|', ' ')}|" for skill in skills)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_analysis', sa.Column('skills_search', sa.Text(), nullable=True))
+
+    # Backfill existing resumes
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, core_skills FROM resume_analysis")).all()
+    for row_id, core_skills in rows:
+        conn.execute(
+            sa.text("UPDATE resume_analysis SET skills_search = :skills_search WHERE id = :id"),
+            {"skills_search": _skills_search(core_skills), "id": row_id}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resume_analysis', 'skills_search')
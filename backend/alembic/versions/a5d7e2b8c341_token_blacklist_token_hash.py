@@ -0,0 +1,36 @@
+"""token_blacklist_token_hash
+
+Revision ID: a5d7e2b8c341
+Revises: f2a6c0d9b134
+Create Date: 2026-10-15 23:31:47.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d7e2b8c341'
+down_revision: Union[str, Sequence[str], None] = 'f2a6c0d9b134'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('token_blacklist', sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+    # Must match auth.security_service.token_models.token_digest
+    op.execute("UPDATE token_blacklist SET token_hash = sha256(convert_to(token, 'UTF8'))")
+    op.alter_column('token_blacklist', 'token_hash', nullable=False)
+    op.create_index('ix_token_blacklist_token_hash', 'token_blacklist', ['token_hash'], unique=True)
+    # Lookups go through token_hash, the wide varchar index is no longer needed
+    op.drop_index('ix_token_blacklist_token', table_name='token_blacklist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_token_blacklist_token', 'token_blacklist', ['token'], unique=True)
+    op.drop_index('ix_token_blacklist_token_hash', table_name='token_blacklist')
+    op.drop_column('token_blacklist', 'token_hash')
@@ -0,0 +1,38 @@
+"""tasks_overdue_and_listing_indexes
+
+Revision ID: b4d8e1c6f925
+Revises: e6c2f9a4b713
+Create Date: 2026-10-16 09:41:18.772306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d8e1c6f925'
+down_revision: Union[str, Sequence[str], None] = 'e6c2f9a4b713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Predicate must match my_tasks.models.task_is_open for the planner to use it
+    op.create_index(
+        'ix_tasks_open_due_date', 'tasks', ['due_date'], unique=False,
+        postgresql_where=sa.text("status NOT IN ('DONE', 'CANCELLED')")
+    )
+    op.create_index('ix_tasks_created_at', 'tasks', ['created_at'], unique=False)
+    op.create_index(
+        'ix_task_assignments_user_id_task_id', 'task_assignments', ['user_id', 'task_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_assignments_user_id_task_id', table_name='task_assignments')
+    op.drop_index('ix_tasks_created_at', table_name='tasks')
+    op.drop_index('ix_tasks_open_due_date', table_name='tasks')
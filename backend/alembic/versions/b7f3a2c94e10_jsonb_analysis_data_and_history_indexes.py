@@ -0,0 +1,59 @@
+"""jsonb_analysis_data_and_history_indexes
+
+Revision ID: b7f3a2c94e10
+Revises: 9c1e4b7d2a31
+Create Date: 2026-10-15 11:02:17.530941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3a2c94e10'
+down_revision: Union[str, Sequence[str], None] = '9c1e4b7d2a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'ai_analysis_history',
+        'analysis_data',
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='analysis_data::jsonb'
+    )
+    op.create_index(
+        'ix_ai_analysis_history_analysis_data_gin',
+        'ai_analysis_history',
+        ['analysis_data'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'analysis_data': 'jsonb_path_ops'}
+    )
+    op.create_index(
+        'ix_ai_analysis_history_room_id_created_at',
+        'ai_analysis_history',
+        ['room_id', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ai_analysis_history_room_id_created_at', table_name='ai_analysis_history')
+    op.drop_index('ix_ai_analysis_history_analysis_data_gin', table_name='ai_analysis_history')
+    op.alter_column(
+        'ai_analysis_history',
+        'analysis_data',
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='analysis_data::json'
+    )
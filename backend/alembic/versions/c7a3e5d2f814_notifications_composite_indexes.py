@@ -0,0 +1,47 @@
+"""notifications_composite_indexes
+
+Revision ID: c7a3e5d2f814
+Revises: b4d8e1c6f925
+Create Date: 2026-10-16 11:05:32.918274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a3e5d2f814'
+down_revision: Union[str, Sequence[str], None] = 'b4d8e1c6f925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction; notifications is written constantly
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notifications_user_id_created_at', 'notifications',
+            ['user_id', sa.text('created_at DESC')], unique=False,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_notifications_user_id_unread', 'notifications', ['user_id'], unique=False,
+            postgresql_where=sa.text('is_read = false'),
+            postgresql_concurrently=True
+        )
+        # Covered by the composite indexes above
+        op.drop_index('ix_notifications_user_id', table_name='notifications', postgresql_concurrently=True)
+        op.drop_index('ix_notifications_is_read', table_name='notifications', postgresql_concurrently=True)
+        op.drop_index('ix_notifications_created_at', table_name='notifications', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_notifications_created_at'), 'notifications', ['created_at'], unique=False)
+    op.create_index(op.f('ix_notifications_is_read'), 'notifications', ['is_read'], unique=False)
+    op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
+    op.drop_index('ix_notifications_user_id_unread', table_name='notifications')
+    op.drop_index('ix_notifications_user_id_created_at', table_name='notifications')
@@ -0,0 +1,46 @@
+"""refresh_sessions_token_hash
+
+Revision ID: c9e1f4a7b258
+Revises: a5d7e2b8c341
+Create Date: 2026-10-15 23:52:09.640317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1f4a7b258'
+down_revision: Union[str, Sequence[str], None] = 'a5d7e2b8c341'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_token_sessions', sa.Column('refresh_token_hash', sa.LargeBinary(length=32), nullable=True))
+    # Must match auth.security_service.token_models.token_digest
+    op.execute("UPDATE refresh_token_sessions SET refresh_token_hash = sha256(convert_to(refresh_token, 'UTF8'))")
+    op.alter_column('refresh_token_sessions', 'refresh_token_hash', nullable=False)
+    op.create_index(
+        'ix_refresh_token_sessions_refresh_token_hash',
+        'refresh_token_sessions',
+        ['refresh_token_hash'],
+        unique=True
+    )
+    # Lookups go through refresh_token_hash, the wide varchar index is no longer needed
+    op.drop_index('ix_refresh_token_sessions_refresh_token', table_name='refresh_token_sessions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_refresh_token_sessions_refresh_token',
+        'refresh_token_sessions',
+        ['refresh_token'],
+        unique=True
+    )
+    op.drop_index('ix_refresh_token_sessions_refresh_token_hash', table_name='refresh_token_sessions')
+    op.drop_column('refresh_token_sessions', 'refresh_token_hash')
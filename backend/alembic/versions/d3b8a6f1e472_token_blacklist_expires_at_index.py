@@ -0,0 +1,28 @@
+"""token_blacklist_expires_at_index
+
+Revision ID: d3b8a6f1e472
+Revises: c9e1f4a7b258
+Create Date: 2026-10-16 00:04:26.517830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b8a6f1e472'
+down_revision: Union[str, Sequence[str], None] = 'c9e1f4a7b258'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_token_blacklist_expires_at', 'token_blacklist', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_token_blacklist_expires_at', table_name='token_blacklist')
@@ -0,0 +1,32 @@
+"""add_tasks_fts_index
+
+Revision ID: d41c8e5f7a92
+Revises: b7f3a2c94e10
+Create Date: 2026-10-15 12:20:05.410377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c8e5f7a92'
+down_revision: Union[str, Sequence[str], None] = 'b7f3a2c94e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Must match my_tasks.models.task_search_vector for the planner to use it
+    op.execute(
+        "CREATE INDEX ix_tasks_search_fts ON tasks USING gin "
+        "(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, '')))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_search_fts', table_name='tasks')
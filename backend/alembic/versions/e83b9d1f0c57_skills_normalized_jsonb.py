@@ -0,0 +1,66 @@
+"""skills_normalized_jsonb
+
+Revision ID: e83b9d1f0c57
+Revises: d41c8e5f7a92
+Create Date: 2026-10-15 12:48:31.902114
+
+"""
+from typing import Sequence, Union
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b9d1f0c57'
+down_revision: Union[str, Sequence[str], None] = 'd41c8e5f7a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _skills_normalized(core_skills):
+    try:
+        skills = json.loads(core_skills) if core_skills else []
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(skills, list) or not skills:
+        return None
+    return list(dict.fromkeys(str(skill).strip().lower() for skill in skills))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_analysis', sa.Column('skills_normalized', postgresql.JSONB(), nullable=True))
+
+    # Backfill existing resumes
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, core_skills FROM resume_analysis")).all()
+    for row_id, core_skills in rows:
+        skills = _skills_normalized(core_skills)
+        conn.execute(
+            sa.text("UPDATE resume_analysis SET skills_normalized = CAST(:skills AS jsonb) WHERE id = :id"),
+            {"skills": json.dumps(skills) if skills is not None else None, "id": row_id}
+        )
+
+    op.create_index(
+        'ix_resume_analysis_skills_normalized_gin',
+        'resume_analysis',
+        ['skills_normalized'],
+        unique=False,
+        postgresql_using='gin'
+    )
+    op.drop_column('resume_analysis', 'skills_search')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('resume_analysis', sa.Column('skills_search', sa.Text(), nullable=True))
+    op.execute(
+        "UPDATE resume_analysis SET skills_search = ("
+        "SELECT string_agg('|' || skill || '|', '') FROM jsonb_array_elements_text(skills_normalized) AS skill"
+        ")"
+    )
+    op.drop_index('ix_resume_analysis_skills_normalized_gin', table_name='resume_analysis')
+    op.drop_column('resume_analysis', 'skills_normalized')
@@ -0,0 +1,35 @@
+"""refresh_sessions_active_index
+
+Revision ID: f2a6c0d9b134
+Revises: e83b9d1f0c57
+Create Date: 2026-10-15 23:05:12.284913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c0d9b134'
+down_revision: Union[str, Sequence[str], None] = 'e83b9d1f0c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partial index: deactivated sessions pile up, only active ones are queried by user
+    op.create_index(
+        'ix_refresh_token_sessions_user_id_active',
+        'refresh_token_sessions',
+        ['user_id'],
+        unique=False,
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_token_sessions_user_id_active', table_name='refresh_token_sessions')
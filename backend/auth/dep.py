@@ -4,8 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from .security_service import decode_token
 from auth.models import User
-from sqlalchemy import select
-from .security_service import is_token_blacklisted
+from sqlalchemy.orm import defer
+from .security_service import is_token_blacklisted, get_cached_user_id, cache_verified_token
 from .security_service.schemas import BlacklistService
 from .security_service.token_models import RefreshTokenSession
 
@@ -21,17 +21,35 @@ async def get_current_user(credentials: HTTPBearer = Depends(security), db: Asyn
 
     token = credentials.credentials
 
+    # Токен уже проверялся недавно - пропускаем blacklist и JWT
+    user_id = get_cached_user_id(token)
+    if user_id is None:
+        user_id = await _verify_access_token(token, db)
 
-    blacklist_check = BlacklistService(
-        token=token,
-        user_id=0,
-        token_type="access"
-    )
+    try:
+        # hashed_password зависимостям не нужен
+        user = await db.get(User, user_id, options=[defer(User.hashed_password)])
 
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
 
-    if await is_token_blacklisted(blacklist_check, db):
+    if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
 
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not active")
+
+    # Check if the session is still active
+    
+
+    return user
+
+
+#Проверяем access токен (blacklist + подпись), возвращаем user_id
+async def _verify_access_token(token: str, db: AsyncSession) -> int:
+
+    # Сначала подпись и срок (HMAC, без I/O) - мусорные и просроченные
+    # токены отсекаются без обращения к Redis/БД
     payload = decode_token(token)
     if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
@@ -50,32 +68,26 @@ async def get_current_user(credentials: HTTPBearer = Depends(security), db: Asyn
         user_id = int(user_id_str)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
-    
 
-    try:
-        query = select(User).where(User.id == user_id)
-        result = await db.execute(query)
-        user = result.scalar_one_or_none()
+    blacklist_check = BlacklistService(
+        token=token,
+        user_id=user_id,
+        token_type="access"
+    )
 
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
 
-    if user is None:
+    if await is_token_blacklisted(blacklist_check, db):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
 
-    if not user.is_active:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not active")
-
-    # Check if the session is still active
-    
+    cache_verified_token(token, user_id, payload.get("exp"))
 
-    return user
+    return user_id
 
         
 
 
 #Получаем текущего лидера
-async def get_lead_user(current_user: Depends(get_current_user)) -> User:
+async def get_lead_user(current_user: User = Depends(get_current_user)) -> User:
 
     if not current_user.is_lead:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not a lead")
@@ -84,7 +96,7 @@ async def get_lead_user(current_user: Depends(get_current_user)) -> User:
 
 
 #Получаем текущего активного пользователя
-async def get_is_active_user(current_user: Depends(get_current_user)) -> User:
+async def get_is_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not active")
     
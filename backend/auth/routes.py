@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 from core.database import get_db
 from auth.security_service import (
     create_access_token, create_refresh_token, decode_token, get_token_expiry_minutes,
-    TokenService, get_password_hash, verify_password, create_refresh_session, SessionService,
-    deactivate_session
+    TokenService, get_password_hash_async, verify_password_async, needs_rehash,
+    create_refresh_session, SessionService,
+    deactivate_session, invalidate_token, invalidate_user_tokens
 )
-from auth.security_service.token_models import RefreshTokenSession
+from auth.security_service.token_models import RefreshTokenSession, token_digest
 from auth.models import User
 from auth.schemas import UserCreate, UserResponse, UserLogin, TokenResponse, SessionResponse, TokenRefresh
 from auth.dep import (
@@ -21,21 +24,32 @@ from datetime import timedelta, datetime
 
 router = APIRouter(prefix='/auth')
 
+# Колонки для UserResponse - без hashed_password
+USER_RESPONSE_COLUMNS = (
+    User.id, User.username, User.email, User.is_active, User.is_lead,
+    User.created_at, User.updated_at
+)
+
+# Запросы горячих путей собираем один раз: на каждый запрос
+# не строится новый select и не считается его cache key
+_USER_EXISTS_STMT = select(User.id).where(
+    or_(User.email == bindparam("email"), User.username == bindparam("username"))
+).limit(1)
+
+_LOGIN_USER_STMT = select(
+    User.id, User.username, User.hashed_password, User.is_active
+).where(User.username == bindparam("username"))
+
 @router.post('/register', response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
-    query = select(User).where(User.email == user_data.email)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
-    if user:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
-    
-    query = select(User).where(User.username == user_data.username)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
-    if user:
+    # Одним запросом проверяем и email, и username
+    result = await db.execute(
+        _USER_EXISTS_STMT, {"email": user_data.email, "username": user_data.username}
+    )
+    if result.first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
-    
-    hashed_password = get_password_hash(user_data.password)
+
+    hashed_password = await get_password_hash_async(user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
@@ -44,7 +58,12 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         is_lead=False
     )
     db.add(user)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Параллельная регистрация с теми же данными успела раньше
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
     await db.refresh(user)
 
     return user
@@ -52,19 +71,26 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post('/login', response_model=TokenResponse, status_code=status.HTTP_200_OK)
 async def login(credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
-    query = select(User).where(User.username == credentials.username)
-    
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    result = await db.execute(_LOGIN_USER_STMT, {"username": credentials.username})
+    user = result.one_or_none()
     
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not active")
+
+    # Пароль верный - заодно обновляем хеш, если это старый bcrypt или другие параметры Argon2
+    # (коммитится вместе с новой сессией)
+    if needs_rehash(user.hashed_password):
+        await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(hashed_password=await get_password_hash_async(credentials.password))
+        )
     
     access_token = create_access_token(TokenService(user_id=user.id, username=user.username))
     refresh_token = create_refresh_token(TokenService(user_id=user.id, username=user.username))
@@ -127,6 +153,7 @@ async def logout(
     # Деактивируем сессию вместо удаления (лучше для аудита)
     session.is_active = False
     await db.commit()
+    invalidate_token(access_token)
     
     return {"message": "Logout successful"}
 
@@ -151,7 +178,7 @@ async def refresh_token(token_data: TokenRefresh, db: AsyncSession = Depends(get
     
     # 2. Ищем активную сессию в БД по этому refresh токену
     query = select(RefreshTokenSession).where(
-        RefreshTokenSession.refresh_token == token_data.refresh_token,
+        RefreshTokenSession.refresh_token_hash == token_digest(token_data.refresh_token),
         RefreshTokenSession.is_active == True
     )
     result = await db.execute(query)
@@ -175,7 +202,7 @@ async def refresh_token(token_data: TokenRefresh, db: AsyncSession = Depends(get
     
     # Обновляем время истечения сессии (берем из нового refresh токена)
     new_refresh_payload = decode_token(new_refresh_token)
-    session.expires_at = datetime.fromtimestamp(new_refresh_payload['exp'])
+    session.expires_at = datetime.utcfromtimestamp(new_refresh_payload['exp'])
     session.last_used_at = datetime.utcnow()
     
     await db.commit()
@@ -211,19 +238,21 @@ async def logout_all_devices(
     db: AsyncSession = Depends(get_db)
 ):
     #Выходим из всех устройств деактивируя все сессии пользователя
-    query = select(RefreshTokenSession).where(
-        RefreshTokenSession.user_id == current_user.id,
-        RefreshTokenSession.is_active == True
+    # Один UPDATE вместо загрузки и изменения каждой сессии
+    stmt = (
+        update(RefreshTokenSession)
+        .where(
+            RefreshTokenSession.user_id == current_user.id,
+            RefreshTokenSession.is_active == True
+        )
+        .values(is_active=False)
+        .returning(RefreshTokenSession.id)
     )
-    result = await db.execute(query)
-    sessions = result.scalars().all()
-    
-    count = 0
-    for session in sessions:
-        session.is_active = False
-        count += 1
+    result = await db.execute(stmt)
+    count = len(result.scalars().all())
     
     await db.commit()
+    invalidate_user_tokens(current_user.id)
     
     return {
         "message": f"Logged out from {count} device(s)",
@@ -259,6 +288,7 @@ async def logout_specific_session(
     
     session.is_active = False
     await db.commit()
+    invalidate_token(session.token)
     
     return {"message": "Session terminated successfully"}
 
@@ -269,7 +299,7 @@ async def get_all_users(
     db: AsyncSession = Depends(get_db)
 ):
     """Get all users - This endpoint returns ALL users (not recommended for teams page)"""
-    query = select(User).where(User.is_active == True)
+    query = select(User).options(load_only(*USER_RESPONSE_COLUMNS)).where(User.is_active == True)
     result = await db.execute(query)
     users = result.scalars().all()
     return users
@@ -286,28 +316,17 @@ async def get_team_members(
     """
     from rooms.models import RoomMember
     
-    # Get all room IDs where current user is a member
-    rooms_query = select(RoomMember.room_id).where(
-        RoomMember.user_id == current_user.id
-    )
-    rooms_result = await db.execute(rooms_query)
-    user_room_ids = [row[0] for row in rooms_result.all()]
-    
-    if not user_room_ids:
-        # User is not in any rooms, return empty list
-        return []
-    
-    # Get all user IDs who are members of those rooms
-    members_query = select(RoomMember.user_id).where(
-        RoomMember.room_id.in_(user_room_ids)
-    ).distinct()
-    members_result = await db.execute(members_query)
-    team_user_ids = [row[0] for row in members_result.all()]
-    
-    # Get user details for those IDs
-    users_query = select(User).where(
-        User.id.in_(team_user_ids),
-        User.is_active == True
+    # Одним запросом: участники всех комнат текущего пользователя
+    my_rooms = select(RoomMember.room_id).where(RoomMember.user_id == current_user.id)
+    users_query = (
+        select(User)
+        .options(load_only(*USER_RESPONSE_COLUMNS))
+        .where(
+            User.id.in_(
+                select(RoomMember.user_id).where(RoomMember.room_id.in_(my_rooms))
+            ),
+            User.is_active == True
+        )
     )
     users_result = await db.execute(users_query)
     users = users_result.scalars().all()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
 from typing import Optional
 
@@ -14,6 +14,8 @@ class UserCreate(UserBase):
 
 
 class UserResponse(UserBase):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     is_active: bool
     is_lead: bool
@@ -21,17 +23,14 @@ class UserResponse(UserBase):
     updated_at: datetime
 
 
-
-    class Config:
-        from_attributes = True
-
-
 class UserLogin(BaseModel):
     username: str
     password: str
 
 
 class TokenResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     refresh_token: str
     token_type: str = "bearer"
@@ -49,6 +48,8 @@ class ChangePasswordRequest(BaseModel):
 
 class SessionResponse(BaseModel):
     """Response model for user sessions"""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     device_name: Optional[str]
     ip_address: Optional[str]
@@ -57,8 +58,5 @@ class SessionResponse(BaseModel):
     last_used_at: datetime  # Changed from last_used to match DB column
     expires_at: datetime
     is_active: bool
-    
-    class Config:
-        from_attributes = True
 
 
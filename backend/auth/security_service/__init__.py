@@ -5,6 +5,19 @@ from .tokens import (
     get_token_expiry_minutes
 )
 from .schemas import TokenService, SessionService
-from .password import hash_password as get_password_hash, verify_password
+from .password import (
+    hash_password as get_password_hash,
+    verify_password,
+    hash_password_async as get_password_hash_async,
+    verify_password_async,
+    needs_rehash
+)
 from .session import create_refresh_session, deactivate_session
-from .blacklist import is_token_blacklisted
+from .blacklist import is_token_blacklisted, is_tokens_blacklisted, blacklist_tokens_bulk
+from .auth_cache import (
+    get_cached_user_id,
+    cache_verified_token,
+    invalidate_token,
+    invalidate_user_tokens,
+    clear_auth_cache
+)
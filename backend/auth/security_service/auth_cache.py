@@ -0,0 +1,62 @@
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+
+
+# Сколько секунд проверенный access токен не перепроверяется (blacklist + JWT)
+AUTH_CACHE_TTL_SECONDS = 60
+AUTH_CACHE_MAX_ENTRIES = 10000
+
+# sha256(token) -> (user_id, время истечения по time.time())
+_verified_tokens: Dict[str, Tuple[int, float]] = {}
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_cached_user_id(token: str) -> Optional[int]:
+    """user_id для уже проверенного токена или None"""
+    key = _token_key(token)
+    entry = _verified_tokens.get(key)
+    if entry is None:
+        return None
+
+    user_id, expires_at = entry
+    if expires_at <= time.time():
+        _verified_tokens.pop(key, None)
+        return None
+    return user_id
+
+
+def cache_verified_token(token: str, user_id: int, token_exp: Optional[float] = None) -> None:
+    """Запомнить проверенный токен, не дольше его собственного срока жизни"""
+    now = time.time()
+    expires_at = now + AUTH_CACHE_TTL_SECONDS
+    if token_exp is not None:
+        expires_at = min(expires_at, token_exp)
+    if expires_at <= now:
+        return
+
+    if len(_verified_tokens) >= AUTH_CACHE_MAX_ENTRIES:
+        for key in [k for k, (_, exp) in _verified_tokens.items() if exp <= now]:
+            del _verified_tokens[key]
+        if len(_verified_tokens) >= AUTH_CACHE_MAX_ENTRIES:
+            _verified_tokens.clear()
+
+    _verified_tokens[_token_key(token)] = (user_id, expires_at)
+
+
+def invalidate_token(token: str) -> None:
+    """Сбросить токен (logout, blacklist)"""
+    _verified_tokens.pop(_token_key(token), None)
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    """Сбросить все токены пользователя (logout со всех устройств)"""
+    for key in [k for k, (uid, _) in _verified_tokens.items() if uid == user_id]:
+        del _verified_tokens[key]
+
+
+def clear_auth_cache() -> None:
+    _verified_tokens.clear()
@@ -1,39 +1,174 @@
+import asyncio
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, bindparam
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from core.cache import cache
-from .token_models import TokenBlacklist
+from core.config import settings
+from .token_models import TokenBlacklist, token_digest
 from .schemas import BlacklistService
 from .tokens import decode_token
+from .auth_cache import invalidate_token
 
 
-async def is_token_blacklisted(tb: BlacklistService, db: AsyncSession) -> bool:
-     
-    # Проверка в кэше
-    if await cache.get(f"blacklist:{tb.token}"):
+# Собирается один раз при импорте; список хешей разворачивается в IN (...)
+_BLACKLISTED_HASHES_STMT = select(TokenBlacklist.token_hash, TokenBlacklist.expires_at).where(
+    TokenBlacklist.token_hash.in_(bindparam("hashes", expanding=True))
+)
+
+_ACTIVE_HASHES_STMT = select(TokenBlacklist.token_hash).where(
+    TokenBlacklist.expires_at > bindparam("now")
+)
+
+# Bloom-фильтр всех занесенных токенов (элемент - hex SHA-256 токена).
+# Ответ "нет" точный, поэтому непопавшие в фильтр токены не проверяются ни в кэше, ни в БД.
+# Фильтру доверяем только при наличии и самого фильтра, и маркера готовности: маркер ставит
+# прогрев из БД и снимает любая неудачная запись в фильтр
+BLACKLIST_BLOOM_KEY = "bl:bloom"
+BLACKLIST_BLOOM_READY_KEY = "bl:bloom:ready"
+BLACKLIST_BLOOM_WARMUP_CHUNK = 10000
+BLACKLIST_BLOOM_WARMUP_LOCK_KEY = "bl:bloom:warming"
+BLACKLIST_BLOOM_WARMUP_LOCK_SECONDS = 300
+
+# Отрицательный ответ БД кэшируется ненадолго. Ключ blacklist:{token}, который ставит
+# blacklist_token, важнее маркера; без Redis-записи отзыв вступит в силу не позже чем через минуту.
+# Ограничивать TTL остатком жизни токена не нужно: истекший токен не пройдет decode_token
+BLACKLIST_OK_TTL_SECONDS = 60
+
+
+def _ok_key(digest: bytes) -> str:
+    return f"blacklist_ok:{digest.hex()}"
+
+
+async def _bloom_add(digests: List[bytes]) -> None:
+    if not await cache.bloom_add_many(BLACKLIST_BLOOM_KEY, [digest.hex() for digest in digests]):
+        # Фильтр пропустил токен - до следующего прогрева работаем без него
+        await cache.delete(BLACKLIST_BLOOM_READY_KEY)
+
+
+async def warm_blacklist_bloom(db: AsyncSession) -> bool:
+    """
+    Заполнить Bloom-фильтр действующими записями blacklist и пометить его готовым.
+    Ошибка прогрева не роняет старт: маркер готовности не ставится,
+    и blacklist проверяется через кэш и БД
+    """
+    # Фильтр уже прогрет другим воркером (или прошлым запуском) - таблицу заново не читаем
+    if await cache.exists(BLACKLIST_BLOOM_READY_KEY) and await cache.exists(BLACKLIST_BLOOM_KEY):
         return True
-    
-    # Проверка в базе данных
+    # Воркеры стартуют одновременно: таблицу читает только тот, кто взял блокировку
+    if not await cache.set_if_absent(BLACKLIST_BLOOM_WARMUP_LOCK_KEY, "1", ex=BLACKLIST_BLOOM_WARMUP_LOCK_SECONDS):
+        return False
+
     try:
-        query = select(TokenBlacklist).where(TokenBlacklist.token == tb.token)
-        result = await db.execute(query)
-        token = result.scalar_one_or_none()
-
-        # Добавляем в кэш
-        if token:
-            expire_in = int((token.expires_at - datetime.utcnow()).total_seconds())
-            if expire_in > 0:
-                # Используем префикс blacklist: для согласованности и аргумент ex
-                await cache.set(f"blacklist:{tb.token}", "true", ex=expire_in)
-            return True
-        
+        if not await cache.bloom_reserve(
+            BLACKLIST_BLOOM_KEY, settings.BLACKLIST_BLOOM_ERROR_RATE, settings.BLACKLIST_BLOOM_CAPACITY
+        ):
+            return False
+
+        result = await db.stream_scalars(_ACTIVE_HASHES_STMT, {"now": datetime.utcnow()})
+        async for chunk in result.partitions(BLACKLIST_BLOOM_WARMUP_CHUNK):
+            if not await cache.bloom_add_many(BLACKLIST_BLOOM_KEY, [digest.hex() for digest in chunk]):
+                return False
+
+        await cache.set(BLACKLIST_BLOOM_READY_KEY, "1")
+        return True
+    except Exception as e:
+        print(f"Error warming blacklist bloom filter: {e}")
+        return False
+    finally:
+        await cache.delete(BLACKLIST_BLOOM_WARMUP_LOCK_KEY)
+
+
+# Одновременные проверки одного токена (WebSocket + REST + refresh) делят один поход
+# в Redis. Ждем через shield: отмена одного запроса не отменяет проверку для остальных.
+# Общая задача не трогает сессию БД: запрос в базу идет в сессии своего вызывающего
+_inflight: Dict[str, "asyncio.Task[Tuple[Set[str], List[str]]]"] = {}
+
+
+async def is_token_blacklisted(tb: BlacklistService, db: AsyncSession) -> bool:
+    task = _inflight.get(tb.token)
+    if task is None:
+        task = asyncio.ensure_future(_check_cached([tb.token]))
+        _inflight[tb.token] = task
+        task.add_done_callback(lambda _: _inflight.pop(tb.token, None))
+    blacklisted, misses = await asyncio.shield(task)
+    if blacklisted:
+        return True
+    if not misses:
         return False
-        
+    return tb.token in await _check_db(misses, db)
+
+
+async def is_tokens_blacklisted(tokens: List[str], db: AsyncSession) -> Set[str]:
+    """Какие из токенов в blacklist: один MGET в Redis + один SELECT ... IN по промахам"""
+    blacklisted, misses = await _check_cached(tokens)
+    if misses:
+        blacklisted |= await _check_db(misses, db)
+    return blacklisted
+
+
+async def _check_cached(tokens: List[str]) -> Tuple[Set[str], List[str]]:
+    """Bloom-фильтр и кэш: (точно в blacklist, нужно проверить в БД)"""
+    if not tokens:
+        return set(), []
+
+    # Bloom-фильтр: отрицательный ответ окончательный
+    token_digests = {token: token_digest(token) for token in tokens}
+    in_bloom = await cache.bloom_mexists(
+        BLACKLIST_BLOOM_KEY,
+        [token_digests[token].hex() for token in tokens],
+        BLACKLIST_BLOOM_READY_KEY
+    )
+    if in_bloom is not None:
+        tokens = [token for token, hit in zip(tokens, in_bloom) if hit]
+        if not tokens:
+            return set(), []
+
+    # Проверка в кэше: на каждый токен пара ключей - "в blacklist" и "точно не в blacklist"
+    keys = []
+    for token in tokens:
+        keys.append(f"blacklist:{token}")
+        keys.append(_ok_key(token_digests[token]))
+    cached = await cache.mget(keys)
+    blacklisted = set()
+    misses = []
+    for token, hit, ok in zip(tokens, cached[0::2], cached[1::2]):
+        if hit:
+            blacklisted.add(token)
+        elif not ok:
+            misses.append(token)
+    return blacklisted, misses
+
+
+async def _check_db(tokens: List[str], db: AsyncSession) -> Set[str]:
+    """Проверка промахов кэша в базе данных с записью ответов обратно в кэш"""
+    digests = {token_digest(token): token for token in tokens}
+    try:
+        result = await db.execute(_BLACKLISTED_HASHES_STMT, {"hashes": list(digests)})
+        rows = result.all()
     except Exception as e:
         print(f"Error checking blacklist in DB: {e}")
-        # Возвращаем False при ошибке - токен считается не в blacklist
-        return False
+        # При ошибке токены считаются не в blacklist
+        return set()
+
+    # Добавляем в кэш и положительные, и отрицательные ответы
+    now = datetime.utcnow()
+    blacklisted = set()
+    backfill = []
+    for digest, expires_at in rows:
+        token = digests.pop(digest)
+        blacklisted.add(token)
+        expire_in = int((expires_at - now).total_seconds())
+        if expire_in > 0:
+            backfill.append((f"blacklist:{token}", "true", expire_in))
+    for digest in digests:
+        backfill.append((_ok_key(digest), "1", BLACKLIST_OK_TTL_SECONDS))
+    await cache.set_many(backfill)
+
+    return blacklisted
 
 
 async def blacklist_token(tb: BlacklistService, db: AsyncSession) ->  TokenBlacklist:
@@ -42,35 +177,113 @@ async def blacklist_token(tb: BlacklistService, db: AsyncSession) ->  TokenBlack
     if not payload:
         raise ValueError("Невалидный токен")
 
+    invalidate_token(tb.token)
 
-    expires_at = datetime.fromtimestamp(payload['exp'])
-    expire_in = int((expires_at - datetime.utcnow()).total_seconds())
-    if expire_in > 0:
-        # Исправлен аргумент на ex (согласно core/cache.py)
-        await cache.set(f'blacklist:{tb.token}', 'true', ex=expire_in)
 
+    # exp - Unix timestamp; TTL считаем целыми секундами без datetime
+    expires_at = datetime.utcfromtimestamp(payload['exp'])
+    expire_in = payload['exp'] - int(time.time())
 
+
+    digest = token_digest(tb.token)
     blacklist_entry = TokenBlacklist(
         token=tb.token,
+        token_hash=digest,
         user_id=tb.user_id,
         token_type=tb.token_type,
-        reason=tb.reason,
+        reason=tb.reason or "logout",
         expires_at=expires_at
     )
     db.add(blacklist_entry)
+
+    # Сначала коммит: если он упадет, в Redis не останется записи о несуществующем отзыве.
+    # Записи в Redis независимы друг от друга - отправляем параллельно.
+    # refresh не нужен: expire_on_commit=False, id заполняется при flush
     await db.commit()
-    await db.refresh(blacklist_entry)
+    writes = [_bloom_add([digest])]
+    if expire_in > 0:
+        writes.append(cache.set(f'blacklist:{tb.token}', 'true', ex=expire_in))
+    await asyncio.gather(*writes)
 
     return blacklist_entry  
 
 
 
+async def blacklist_tokens_bulk(tokens: List[BlacklistService], db: AsyncSession) -> int:
+    """Blacklist сразу нескольких токенов: один INSERT в БД + один pipeline в Redis"""
+
+    now = datetime.utcnow()
+    now_ts = int(time.time())
+    rows = []
+    cache_items = []
+    for tb in tokens:
+        payload = decode_token(tb.token)
+        if not payload:
+            # Невалидный или уже истекший токен и так не пройдет проверку
+            continue
+
+        invalidate_token(tb.token)
 
-async def cleanup_expired_blacklist(db: AsyncSession) -> int:
+        expires_at = datetime.utcfromtimestamp(payload['exp'])
+        rows.append({
+            "token": tb.token,
+            "token_hash": token_digest(tb.token),
+            "user_id": tb.user_id,
+            "token_type": tb.token_type,
+            "reason": tb.reason or "logout",
+            "expires_at": expires_at,
+            "blacklisted_at": now
+        })
+        expire_in = payload['exp'] - now_ts
+        if expire_in > 0:
+            cache_items.append((f'blacklist:{tb.token}', 'true', expire_in))
+
+    if not rows:
+        return 0
+
+    # Уже занесенные токены пропускаем (ON CONFLICT DO NOTHING)
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = (
+        dialect_insert(TokenBlacklist)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[TokenBlacklist.token_hash])
+        .returning(TokenBlacklist.id)
+    )
+    result = await db.execute(stmt)
+    inserted = len(result.scalars().all())
+
+    # Коммит до записи в Redis, сами записи в Redis - параллельно
+    await db.commit()
+    await asyncio.gather(
+        cache.set_many(cache_items),
+        _bloom_add([row["token_hash"] for row in rows])
+    )
+
+    return inserted
+
+
+
+
+# Удаляем пачками с коммитом между ними: короткие блокировки и умеренный WAL
+BLACKLIST_CLEANUP_BATCH_SIZE = 10000
+
+
+async def cleanup_expired_blacklist(db: AsyncSession, batch_size: int = BLACKLIST_CLEANUP_BATCH_SIZE) -> int:
 
     now = datetime.utcnow()
     
-    query = delete(TokenBlacklist).where(TokenBlacklist.expires_at < now)
-    result = await db.execute(query)
-    await db.commit()
-    return result.rowcount
+    # В PostgreSQL нет DELETE ... LIMIT, поэтому id выбираются подзапросом
+    expired_ids = (
+        select(TokenBlacklist.id)
+        .where(TokenBlacklist.expires_at < now)
+        .limit(batch_size)
+    )
+    query = delete(TokenBlacklist).where(TokenBlacklist.id.in_(expired_ids))
+
+    deleted = 0
+    while True:
+        result = await db.execute(query)
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
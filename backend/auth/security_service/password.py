@@ -1,23 +1,69 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from core.config import settings
 
 
+# Новые пароли хешируются Argon2id; старые bcrypt хеши ($2b$...) еще проверяются
+# и перехешируются при следующем успешном логине (см. needs_rehash)
+_password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM
+)
 
-def hash_password(password: str) -> str:
-    password_bytes = password.encode('utf-8')[:72]
+# Argon2 (cffi) и bcrypt отпускают GIL, так что N потоков дают ~N хешей параллельно.
+# Отдельный пул: хеширование не занимает default executor (asyncio.to_thread)
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    thread_name_prefix="password-hash"
+)
 
-    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
-    hashed_password = bcrypt.hashpw(password_bytes, salt)
-    
-    return hashed_password.decode('utf-8')
+
+def _is_bcrypt_hash(hashed_password: str) -> bool:
+    return hashed_password.startswith('$2')
+
+
+
+def hash_password(password: str) -> str:
+    return _password_hasher.hash(password)
     
 
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    
-    password_bytes = password.encode('utf-8')[:72]
-    hashed_password_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_password_bytes)
-    
 
+    if _is_bcrypt_hash(hashed_password):
+        password_bytes = password.encode('utf-8')[:72]
+        hashed_password_bytes = hashed_password.encode('utf-8')
+        return bcrypt.checkpw(password_bytes, hashed_password_bytes)
+
+    try:
+        return _password_hasher.verify(hashed_password, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+# Хеширование занимает десятки-сотни мс CPU - в async коде считаем его
+# в пуле потоков, не блокируя event loop
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, verify_password, password, hashed_password)
+
+
+#Хеш bcrypt или Argon2 с другими параметрами (ARGON2_* изменили) - надо перехешировать
+def needs_rehash(hashed_password: str) -> bool:
+    if _is_bcrypt_hash(hashed_password):
+        return True
+    try:
+        return _password_hasher.check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return True
@@ -1,9 +1,10 @@
 from typing import Optional
 from datetime import timedelta
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class BlacklistService(BaseModel):
+    model_config = ConfigDict(frozen=True)
 
     token: str
     user_id: int
@@ -13,6 +14,8 @@ class BlacklistService(BaseModel):
 
 
 class TokenService(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     user_id: int
     username: str
     expires_delta: Optional[timedelta] = None
@@ -20,6 +23,8 @@ class TokenService(BaseModel):
 
 
 class SessionService(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     user_id: int
     access_token: str
     refresh_token: str
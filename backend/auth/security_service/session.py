@@ -1,11 +1,35 @@
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from .token_models import RefreshTokenSession
+from sqlalchemy import select, update, bindparam
+from core.cache import cache
+from .token_models import RefreshTokenSession, token_digest
 from .tokens import decode_token
 from .schemas import SessionService
 
+# Запросы собираются один раз при импорте: на вызов не строится новый
+# statement и не считается его cache key, значения идут через bindparam
+_TOUCH_SESSION_STMT = (
+    update(RefreshTokenSession)
+    .where(
+        RefreshTokenSession.refresh_token_hash == bindparam("b_refresh_token_hash"),
+        RefreshTokenSession.is_active == True
+    )
+    .values(last_used_at=bindparam("now"))
+    .returning(RefreshTokenSession)
+)
+
+_ACTIVE_USER_SESSION_STMT = select(RefreshTokenSession).where(
+    RefreshTokenSession.user_id == bindparam("user_id"),
+    RefreshTokenSession.is_active == True,
+    RefreshTokenSession.expires_at > bindparam("now")
+)
+
+_DEACTIVATE_SESSION_STMT = update(RefreshTokenSession).where(
+    RefreshTokenSession.refresh_token_hash == bindparam("b_refresh_token_hash")
+).values(is_active=False)
+
+
 #Создает запись сессии refresh токена.
 async def create_refresh_session(session: SessionService, db: AsyncSession) -> Optional[RefreshTokenSession]:
 
@@ -19,7 +43,7 @@ async def create_refresh_session(session: SessionService, db: AsyncSession) -> O
         return None
 
 
-    expires_at = datetime.fromtimestamp(payload['exp'])
+    expires_at = datetime.utcfromtimestamp(payload['exp'])
     
     session = RefreshTokenSession(
         user_id=session.user_id,
@@ -31,71 +55,63 @@ async def create_refresh_session(session: SessionService, db: AsyncSession) -> O
         user_agent=session.user_agent
     )
     db.add(session)
+    # refresh не нужен: id приходит из INSERT, остальные поля - Python defaults,
+    # а expire_on_commit=False не сбрасывает их после коммита
     await db.commit()
-    await db.refresh(session)
     return session
 
 
+# last_used_at нужен с точностью до минуты, чаще в БД не пишем
+SESSION_TOUCH_INTERVAL_SECONDS = 60
+
+
 #Обновляет время последнего использования сессии.
+#None - сессия не найдена или уже обновлялась за последние SESSION_TOUCH_INTERVAL_SECONDS
 async def update_session_last_used(refresh_token: str, db: AsyncSession) -> Optional[RefreshTokenSession]:
-    query = select(RefreshTokenSession).where(
-        RefreshTokenSession.refresh_token == refresh_token,
-        RefreshTokenSession.is_active == True
+    # SET NX EX - одна атомарная операция в Redis; без Redis обновляем всегда
+    touch_key = f"session_touch:{token_digest(refresh_token).hex()}"
+    if not await cache.set_if_absent(touch_key, "1", ex=SESSION_TOUCH_INTERVAL_SECONDS):
+        return None
+
+    # Один UPDATE ... RETURNING вместо SELECT + изменение + refresh
+    result = await db.execute(
+        _TOUCH_SESSION_STMT, {"b_refresh_token_hash": token_digest(refresh_token), "now": datetime.utcnow()}
     )
-    result = await db.execute(query)
     session = result.scalar_one_or_none()
-    if session:
-        session.last_used_at = datetime.utcnow()
-        await db.commit()
-        await db.refresh(session)
+    await db.commit()
     
     return session
     
 
 
 async def get_user_session(user_id: int, db: AsyncSession) -> Optional[RefreshTokenSession]:
-    query = select(RefreshTokenSession).where(
-        RefreshTokenSession.user_id == user_id,
-        RefreshTokenSession.is_active == True,
-        RefreshTokenSession.expires_at > datetime.utcnow()
+    result = await db.execute(
+        _ACTIVE_USER_SESSION_STMT, {"user_id": user_id, "now": datetime.utcnow()}
     )
-    result = await db.execute(query)
     session = result.scalar_one_or_none()
     return session
 
 
 async def deactivate_session(refresh_token: str, db: AsyncSession) -> bool:
-    query = select(RefreshTokenSession).where(
-        RefreshTokenSession.refresh_token == refresh_token
-    )
-    result = await db.execute(query)
-    session = result.scalar_one_or_none()
-    if session:
-        session.is_active = False
-        await db.commit()
-        return True
-    return False
+    result = await db.execute(_DEACTIVATE_SESSION_STMT, {"b_refresh_token_hash": token_digest(refresh_token)})
+    await db.commit()
+    return result.rowcount > 0
 
 
 
-async def deactivate_all_user_sessions(user_id: str, db: AsyncSession, except_current: Optional[str] = None) -> bool:
-    query = select(RefreshTokenSession).where(
+async def deactivate_all_user_sessions(user_id: str, db: AsyncSession, except_current: Optional[str] = None) -> int:
+    stmt = update(RefreshTokenSession).where(
         RefreshTokenSession.user_id == user_id,
         RefreshTokenSession.is_active == True,
 
     )
 
     if except_current:
-        query = query.where(
-            RefreshTokenSession.refresh_token != except_current
+        stmt = stmt.where(
+            RefreshTokenSession.refresh_token_hash != token_digest(except_current)
         )
 
-    result = await db.execute(query)
-    sessions = result.scalars().all()
-   
-    for session in sessions:
-        session.is_active = False
-        db.add(session)
+    stmt = stmt.values(is_active=False).execution_options(synchronize_session=False)
+    result = await db.execute(stmt)
     await db.commit()
-    return len(sessions)
-    
+    return result.rowcount
@@ -1,7 +1,13 @@
 from core.database import Base
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Boolean
+from sqlalchemy.orm import Mapped, mapped_column, validates
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Boolean, Index, LargeBinary, text
 from datetime import datetime
+import hashlib
+
+
+def token_digest(token: str) -> bytes:
+    """SHA-256 токена - короткий ключ фиксированной длины для индекса"""
+    return hashlib.sha256(token.encode("utf-8")).digest()
 
 
 class TokenBlacklist(Base):
@@ -9,11 +15,14 @@ class TokenBlacklist(Base):
     __tablename__ = "token_blacklist"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    token: Mapped[str] = mapped_column(String(500), unique=True, nullable=False, index=True)
+    token: Mapped[str] = mapped_column(String(500), nullable=False)
+    # Поиск идет по 32-байтному хешу, а не по JWT в сотни байт
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), unique=True, nullable=False, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
     token_type: Mapped[str] = mapped_column(String(20), nullable=False)
     blacklisted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
-    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Индекс для cleanup_expired_blacklist: expires_at < now без полного скана
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     reason: Mapped[str] = mapped_column(String(255), default="logout")
 
     def __repr__(self):
@@ -23,10 +32,22 @@ class TokenBlacklist(Base):
 class RefreshTokenSession(Base):
     """Сессии refresh токенов для отслеживания активных сессий."""
     __tablename__ = "refresh_token_sessions"
+    __table_args__ = (
+        # Активные сессии пользователя (logout-all, список сессий).
+        # Поиск по token/refresh_token идет по unique индексам token и refresh_token_hash
+        Index(
+            "ix_refresh_token_sessions_user_id_active",
+            "user_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active")
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    refresh_token: Mapped[str] = mapped_column(String(500), unique=True, nullable=False, index=True)
+    refresh_token: Mapped[str] = mapped_column(String(500), nullable=False)
+    # Поиск идет по 32-байтному хешу, а не по JWT в сотни байт
+    refresh_token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), unique=True, nullable=False, index=True)
     token: Mapped[str] = mapped_column(String(500), unique=True, nullable=False)
     
     device_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -39,5 +60,11 @@ class RefreshTokenSession(Base):
     last_used_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
+    @validates("refresh_token")
+    def _sync_refresh_token_hash(self, key, value):
+        # Хеш обновляется и при создании сессии, и при ротации refresh токена
+        self.refresh_token_hash = token_digest(value)
+        return value
+
     def __repr__(self):
         return f"<RefreshTokenSession(user_id={self.user_id}, device_name={self.device_name})>"
\ No newline at end of file
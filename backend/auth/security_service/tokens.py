@@ -1,10 +1,44 @@
+import base64
+import calendar
+import hmac
 import jwt
+import orjson
+import time
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Optional
 from core.config import settings
 from .schemas import TokenService
 
 
+# Для HS* токен собираем сами: orjson вместо json.dumps в PyJWT,
+# заголовок и ключ готовятся один раз. Проверка остается на jwt.decode
+_HMAC_DIGESTS = {'HS256': 'sha256', 'HS384': 'sha384', 'HS512': 'sha512'}
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+_SECRET = settings.SECRET_KEY.encode('utf-8')
+_HEADER_B64 = _b64url(orjson.dumps({'alg': settings.ALGORITHM, 'typ': 'JWT'}))
+
+
+def _encode(payload: dict) -> str:
+    digest = _HMAC_DIGESTS.get(settings.ALGORITHM)
+    if digest is None:
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    signing_input = _HEADER_B64 + b'.' + _b64url(orjson.dumps(payload))
+    signature = hmac.digest(_SECRET, signing_input, digest)
+    return (signing_input + b'.' + _b64url(signature)).decode('ascii')
+
+
+def _timestamp(moment: datetime) -> int:
+    # moment - naive UTC, как datetime.utcnow()
+    return calendar.timegm(moment.utctimetuple())
+
+
 def create_access_token(token_service: TokenService) -> str:
 
 
@@ -16,13 +50,8 @@ def create_access_token(token_service: TokenService) -> str:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
 
-    to_encode.update({'exp': expire})
-    encoded_jwt = jwt.encode(
-
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
+    to_encode.update({'exp': _timestamp(expire)})
+    encoded_jwt = _encode(to_encode)
 
     return encoded_jwt
 
@@ -31,34 +60,43 @@ def create_refresh_token(token_service: TokenService) -> str:
 
     to_encode = {'sub': str(token_service.user_id), 'username': token_service.username, 'type': 'refresh'}
     expier = datetime.utcnow() + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({'exp': expier})
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
+    to_encode.update({'exp': _timestamp(expier)})
+    encoded_jwt = _encode(to_encode)
     return encoded_jwt
 
 
 
-def decode_token(token: str) -> Optional[dict]:
+# Подпись токена проверяется один раз на процесс: повторные запросы с тем же
+# токеном (SPA polling) берут payload из LRU. exp проверяется при каждом вызове
+@lru_cache(maxsize=8192)
+def _decode_verified(token: str) -> Optional[dict]:
 
     try:
-        payload = jwt.decode(token,
+        return jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+            options={'verify_exp': False}
+        )
+
+    except jwt.InvalidTokenError:
+        return None
 
-        settings.SECRET_KEY,
-        algorithms=[settings.ALGORITHM]
 
-        )
 
-        return payload
+def decode_token(token: str) -> Optional[dict]:
 
-    except jwt.ExpiredSignatureError:
+    payload = _decode_verified(token)
+    if payload is None:
         return None
 
-    except jwt.InvalidTokenError:
+    exp = payload.get('exp')
+    if exp is not None and exp <= time.time():
         return None
 
+    # Копия: закэшированный payload не должен меняться снаружи
+    return dict(payload)
+
 
 
 def get_token_expiry_minutes(token: str) -> Optional[int]:
@@ -71,8 +109,7 @@ def get_token_expiry_minutes(token: str) -> Optional[int]:
     if not exp_timestamp:
         return None
 
-    now = datetime.utcnow().timestamp()
-    remaining_seconds = exp_timestamp - now
+    remaining_seconds = exp_timestamp - time.time()
 
     return max(0, int(remaining_seconds / 60))
     
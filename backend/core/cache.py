@@ -1,5 +1,5 @@
 import redis.asyncio as aioredis
-from typing import Optional
+from typing import List, Optional, Tuple
 from core.config import settings
 
 
@@ -35,6 +35,16 @@ class RedisCache:
         except:
             print('Ошибка при записи в Redis')
 
+    async def set_if_absent(self, key: str, value: str, ex: int) -> bool:
+        """SET NX EX: True если ключа не было и он записан. Без Redis всегда True"""
+        if not self.redis:
+            return True
+        try:
+            return bool(await self.redis.set(key, value, ex=ex, nx=True))
+        except:
+            print('Ошибка при записи в Redis')
+            return True
+
     async def get(self, key: str):
         if not self.redis:
             return None
@@ -44,6 +54,85 @@ class RedisCache:
             print('Ошибка при чтении из Redis')
             return None
 
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        if not self.redis or not keys:
+            return [None] * len(keys)
+        try:
+            return await self.redis.mget(keys)
+        except:
+            print('Ошибка при чтении из Redis')
+            return [None] * len(keys)
+
+    async def set_many(self, items: List[Tuple[str, str, Optional[int]]]):
+        """Записать несколько (key, value, ex) одним pipeline - один round-trip"""
+        if not self.redis or not items:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value, ex in items:
+                    if ex:
+                        pipe.setex(key, ex, value)
+                    else:
+                        pipe.set(key, value)
+                await pipe.execute()
+        except:
+            print('Ошибка при записи в Redis')
+
+    async def bloom_reserve(self, key: str, error_rate: float, capacity: int) -> bool:
+        """BF.RESERVE; уже существующий фильтр не пересоздается. False - нет Redis или RedisBloom"""
+        if not self.redis:
+            return False
+        try:
+            await self.redis.execute_command("BF.RESERVE", key, error_rate, capacity)
+        except Exception as e:
+            if "exists" not in str(e).lower():
+                print('Ошибка RedisBloom')
+                return False
+        return True
+
+    async def bloom_add_many(self, key: str, items: List[str]) -> bool:
+        """BF.MADD; False если записать в фильтр не удалось"""
+        if not self.redis:
+            return False
+        if not items:
+            return True
+        try:
+            await self.redis.execute_command("BF.MADD", key, *items)
+            return True
+        except:
+            print('Ошибка RedisBloom')
+            return False
+
+    async def bloom_mexists(self, key: str, items: List[str], ready_key: str) -> Optional[List[bool]]:
+        """
+        EXISTS ready_key key + BF.MEXISTS одним pipeline.
+        None - фильтру нельзя доверять (нет Redis, нет модуля, фильтр не прогрет
+        или вытеснен: BF.MEXISTS по отсутствующему ключу отвечает одними нулями)
+        """
+        if not self.redis or not items:
+            return None
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(ready_key, key)
+                pipe.execute_command("BF.MEXISTS", key, *items)
+                existing, found = await pipe.execute()
+        except:
+            return None
+        if existing != 2:
+            return None
+        return [bool(hit) for hit in found]
+
+    async def publish(self, channel: str, message: str) -> bool:
+        """PUBLISH; False если Redis недоступен"""
+        if not self.redis:
+            return False
+        try:
+            await self.redis.publish(channel, message)
+            return True
+        except:
+            print('Ошибка публикации в Redis')
+            return False
+
     async def delete(self, key: str):
         if not self.redis:
             return
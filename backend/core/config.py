@@ -10,10 +10,19 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_HOST: str
     DB_PORT: int
+    # asyncpg готовит каждый запрос и держит LRU подготовленных statement на соединение
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_PGBOUNCER: bool = False  # PgBouncer в transaction mode: уникальные имена statement
 
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    # Bloom-фильтр blacklist (RedisBloom): ожидаемое число токенов за 30 дней и доля ложных срабатываний
+    BLACKLIST_BLOOM_CAPACITY: int = 100000
+    BLACKLIST_BLOOM_ERROR_RATE: float = 0.001
+
+    # RAG microservice
+    RAG_SERVICE_URL: str = "http://localhost:8001"
 
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -27,12 +36,24 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 43200  # 30 days in minutes
 
     # Security
-    BCRYPT_ROUNDS: int = 12
+    # Argon2id для паролей (memory_cost в KiB)
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 2
+    PASSWORD_HASH_WORKERS: int | None = None  # потоки для хеширования, по умолчанию = числу ядер
     MAX_LOGIN_ATTEMPTS: int = 5
     LOCK_TIME_MINUTES: int = 15
 
     openai_api_key: str
 
+    # AI
+    AI_SEMANTIC_CACHE_ENABLED: bool = True
+    AI_SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    # Problem analyzer is plain schema extraction, any cheap model works;
+    # set the base URL to use a self-hosted OpenAI-compatible server (e.g. vLLM)
+    AI_ANALYZER_MODEL: str = "gpt-4.1-nano"
+    AI_ANALYZER_BASE_URL: str | None = None
+
     ALLOWED_ORIGINS: list = ['http://localhost:3000', 'http://localhost:8000']
 
     model_config = SettingsConfigDict(
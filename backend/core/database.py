@@ -1,16 +1,32 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from typing import AsyncGenerator
+from uuid import uuid4
 from core.config import settings
 
 
+# Точечные запросы (blacklist, сессии) выполняются как подготовленные statement:
+# parse/plan один раз на соединение, дальше только bind + execute
+connect_args = {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+if settings.DB_PGBOUNCER:
+    # Соединения с сервером переиспользуются между клиентами - имена не должны пересекаться
+    connect_args["statement_cache_size"] = 0
+    connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+
 engine = create_async_engine(
     settings.get_database_url(),  
     echo=True,
     future=True,
     pool_size=20,
-    max_overflow=0,
+    max_overflow=10,
+    pool_timeout=30,
     pool_pre_ping=True,
+    pool_recycle=1800,  # переоткрываем соединения раньше, чем их закроет сервер или балансировщик
+    connect_args=connect_args,
 )
 
 
@@ -27,6 +43,31 @@ class Base(DeclarativeBase):
     pass
 
 
+class utc_now(FunctionElement):
+    """
+    Текущее время UTC без часового пояса, вычисляется в БД (как datetime.utcnow в колонках)
+    Одно значение на весь запрос вместо параметра из Python
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    return "timezone('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utc_now)
+def _utc_now_default(element, compiler, **kw):
+    # SQLite: CURRENT_TIMESTAMP уже в UTC
+    return "CURRENT_TIMESTAMP"
+
+
+# Dependency для получения фабрики сессий (когда нужно несколько сессий параллельно)
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_session
+
+
 # Dependency для получения сессии
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
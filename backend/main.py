@@ -1,16 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from granian import Granian
 from core.config import settings
+from core.cache import cache
+from core.database import async_session
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from auth.routes import router as auth_router
 from my_tasks.routes import router as tasks_router
 from resume_ai.routes import router as resume_ai_router
 from rooms.routes import router as rooms_router
 from ai.routes import router as ai_router
 from notifications.routes import router as notifications_router
+from auth.security_service.blacklist import warm_blacklist_bloom
+from notifications.service import notification_writer
+from notifications.websocket import manager as ws_manager
+from rag_client import RAGClient
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await cache.connect()
+    # Без RedisBloom прогрев не пройдет, и blacklist проверяется через кэш и БД
+    async with async_session() as db:
+        await warm_blacklist_bloom(db)
+    # WebSocket-сообщения между воркерами идут через Redis pub/sub
+    await ws_manager.start()
+    # Один HTTP-клиент (и пул соединений) к RAG-сервису на все приложение
+    app.state.rag_client = RAGClient(base_url=settings.RAG_SERVICE_URL)
+    yield
+    await app.state.rag_client.close()
+    await ws_manager.stop()
+    await notification_writer.close()
+    await cache.disconnect()
+
+
+# orjson сериализует ответы быстрее стандартного json
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 
 app.add_middleware(
@@ -21,6 +48,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжимаем крупные ответы (списки задач, кандидаты из AI tools);
+# text/event-stream (SSE) Starlette не сжимает
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
 
 app.router.include_router(auth_router, tags=['Auth'])
 app.router.include_router(tasks_router)
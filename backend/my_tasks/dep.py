@@ -1,11 +1,14 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_
-from sqlalchemy.orm import selectinload
-from datetime import datetime
+from sqlalchemy import select, insert, update, func, or_, lambda_stmt, any_, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload, raiseload
 from typing import Optional
 
-from my_tasks.models import Task, TaskAssignment, TaskStatus, TaskPriority
+from core.database import utc_now
+from my_tasks.models import Task, TaskAssignment, TaskStatus, TaskPriority, task_is_open
 from auth.models import User
 from rooms.models import RoomMember
 from my_tasks.schemas import (
@@ -16,6 +19,32 @@ from my_tasks.schemas import (
 )
 
 
+def _id_in(db: AsyncSession, column, ids: list[int]):
+    """
+    column IN ids. В PostgreSQL - column = ANY(:ids) с одним параметром-массивом:
+    текст запроса не зависит от длины списка и план переиспользуется
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(literal(ids, ARRAY(Integer)))
+    return column.in_(ids)
+
+
+def _task_response_options() -> tuple:
+    """
+    Связи, которые нужны TaskResponse. Все остальные (room, assigned_by, ...) запрещены:
+    случайная ленивая загрузка упадет сразу, а не превратится в N+1
+    (функция, а не константа - опции конфигурируют мапперы при создании)
+    """
+    # Пользователи в ответе - UserBrief: только id, username, email
+    user_brief_columns = (User.id, User.username, User.email)
+    return (
+        selectinload(Task.created_by).load_only(*user_brief_columns),
+        selectinload(Task.assignments).selectinload(TaskAssignment.user).load_only(*user_brief_columns),
+        selectinload(Task.assignments).raiseload("*"),
+        raiseload("*"),
+    )
+
+
 # ============================================
 # CRUD операции для задач
 # ============================================
@@ -30,94 +59,80 @@ async def create_task(
         if due_date and due_date.tzinfo is not None:
             due_date = due_date.replace(tzinfo=None)
 
-        # 2. Проверка прав СОЗДАТЕЛЯ (если задача в комнате)
+        # 2. Обработка списка ответственных
+        # dict.fromkeys убирает дубли с сохранением порядка (детерминированный текст ошибок)
+        unique_assignee_ids = list(dict.fromkeys(task_data.assignee_ids or [creator_id]))
+        
+        # 3. Проверка прав создателя и валидация ответственных - до создания задачи
         if task_data.room_id:
-            member_check = await db.execute(
-                select(RoomMember).where(
-                    RoomMember.room_id == task_data.room_id,
-                    RoomMember.user_id == creator_id
-                )
+            # ВАРИАНТ А: Задача в комнате -> одним запросом членство и создателя, и ответственных
+            query = select(RoomMember.user_id).where(
+                RoomMember.room_id == task_data.room_id,
+                _id_in(db, RoomMember.user_id, list({creator_id, *unique_assignee_ids}))
             )
-            if not member_check.scalar_one_or_none():
+            result = await db.execute(query)
+            found_ids = set(result.scalars().all())
+            
+            if creator_id not in found_ids:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="You are not a member of this room and cannot create tasks in it."
                 )
-        
-        # 3. Создаем объект задачи
-        new_task = Task(
-            title=task_data.title,
-            description=task_data.description,
-            status=task_data.status,
-            priority=task_data.priority,
-            due_date=due_date,
-            created_by_id=creator_id,
-            room_id=task_data.room_id
-        )
-        db.add(new_task)
-        await db.flush()  # Генерируем ID
-        
-        # 4. Обработка списка ответственных
-        assignee_ids = task_data.assignee_ids if task_data.assignee_ids else []
-        
-        if not assignee_ids:
-            assignee_ids = [creator_id]
-        
-        unique_assignee_ids = list(set(assignee_ids))
-        
-        # 5. Валидация ответственных
-        if unique_assignee_ids:
-            if task_data.room_id:
-                # ВАРИАНТ А: Задача в комнате -> Проверяем членство в комнате
-                # (Тут у вас все отлично, оптимизация не нужна, вы уже выбираете user_id)
-                query = select(RoomMember.user_id).where(
-                    RoomMember.room_id == task_data.room_id,
-                    RoomMember.user_id.in_(unique_assignee_ids)
-                )
-                result = await db.execute(query)
-                found_ids = set(result.scalars().all())
-                
-                missing_ids = set(unique_assignee_ids) - found_ids
-                if missing_ids:
-                    await db.rollback()
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Users {list(missing_ids)} are not members of the room."
-                    )
-            else:
-                # ВАРИАНТ Б: Задача личная -> Проверяем существование юзеров
-                # ОПТИМИЗАЦИЯ: select(User.id) вместо select(User)
-                users_query = select(User.id).where(User.id.in_(unique_assignee_ids))
-                users_result = await db.execute(users_query)
-                found_ids = set(users_result.scalars().all()) # Тут сразу список int
             
-                missing_ids = set(unique_assignee_ids) - found_ids
-                if missing_ids:
-                    await db.rollback()
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Users with ids {list(missing_ids)} not found"
-                    )
+            missing_ids = [user_id for user_id in unique_assignee_ids if user_id not in found_ids]
+            if missing_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Users {missing_ids} are not members of the room."
+                )
+        elif unique_assignee_ids != [creator_id]:
+            # ВАРИАНТ Б: Задача личная -> Проверяем существование юзеров
+            # (создатель авторизован, значит существует - если ответственный только он, проверять нечего)
+            # ОПТИМИЗАЦИЯ: count вместо строк; сами id нужны только для текста ошибки
+            users_query = select(func.count()).select_from(User).where(_id_in(db, User.id, unique_assignee_ids))
+            users_found = (await db.execute(users_query)).scalar_one()
+        
+            if users_found != len(unique_assignee_ids):
+                found_query = select(User.id).where(_id_in(db, User.id, unique_assignee_ids))
+                found_ids = set((await db.execute(found_query)).scalars().all())
+                missing_ids = [user_id for user_id in unique_assignee_ids if user_id not in found_ids]
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Users with ids {missing_ids} not found"
+                )
         
-        # 6. Создаем записи в TaskAssignment
-        for assignee_id in unique_assignee_ids:
-            assignment = TaskAssignment(
-                task_id=new_task.id,
-                user_id=assignee_id,
-                assigned_by_id=creator_id
+        # 4. Создаем задачу: INSERT ... RETURNING id без объекта в unit of work
+        result = await db.execute(
+            insert(Task)
+            .values(
+                title=task_data.title,
+                description=task_data.description,
+                status=task_data.status,
+                priority=task_data.priority,
+                due_date=due_date,
+                created_by_id=creator_id,
+                room_id=task_data.room_id
             )
-            db.add(assignment)
+            .returning(Task.id)
+        )
+        new_task_id = result.scalar_one()
+        
+        # 5. Создаем записи в TaskAssignment одним INSERT (executemany)
+        await db.execute(
+            insert(TaskAssignment),
+            [
+                {"task_id": new_task_id, "user_id": assignee_id, "assigned_by_id": creator_id}
+                for assignee_id in unique_assignee_ids
+            ]
+        )
         
         await db.commit()
         
-        # 7. Подгружаем связи для ответа API
+        # 6. Подгружаем связи для ответа API
         query = (
             select(Task)
-            .options(
-                selectinload(Task.created_by),
-                selectinload(Task.assignments).selectinload(TaskAssignment.user)
-            )
-            .where(Task.id == new_task.id)
+            .options(*_task_response_options())
+            .where(Task.id == new_task_id)
         )
         result = await db.execute(query)
         task_with_relations = result.scalar_one()
@@ -155,10 +170,7 @@ async def get_task_by_id(
     try:
         query = (
             select(Task)
-            .options(
-                selectinload(Task.created_by),
-                selectinload(Task.assignments).selectinload(TaskAssignment.user)
-            )
+            .options(*_task_response_options())
             .where(Task.id == task_id)
         )
         result = await db.execute(query)
@@ -200,85 +212,83 @@ async def get_tasks(
         Кортеж (список задач, общее количество)
     """
     try:
-        # Базовый запрос
-        query = select(Task).options(
-            selectinload(Task.created_by),
-            selectinload(Task.assignments).selectinload(TaskAssignment.user)
-        )
-        
-        # Применяем фильтры
-        conditions = []
+        # Фильтры - лямбды: SQLAlchemy кэширует построенный запрос по коду лямбд,
+        # на повторных вызовах выполняется только извлечение значений для параметров
+        where_clauses = []
         
         if filters:
             if filters.status:
-                conditions.append(Task.status == filters.status)
+                status_value = filters.status
+                where_clauses.append(lambda s: s.where(Task.status == status_value))
             
             if filters.priority:
-                conditions.append(Task.priority == filters.priority)
+                priority_value = filters.priority
+                where_clauses.append(lambda s: s.where(Task.priority == priority_value))
             
             if filters.created_by_id:
-                conditions.append(Task.created_by_id == filters.created_by_id)
+                created_by_id = filters.created_by_id
+                where_clauses.append(lambda s: s.where(Task.created_by_id == created_by_id))
             
             if filters.room_id:
-                conditions.append(Task.room_id == filters.room_id)
+                room_id = filters.room_id
+                where_clauses.append(lambda s: s.where(Task.room_id == room_id))
             
             if filters.assignee_id:
                 # Фильтр по ответственному через join
-                query = query.join(TaskAssignment).where(
-                    TaskAssignment.user_id == filters.assignee_id
+                assignee_id = filters.assignee_id
+                where_clauses.append(
+                    lambda s: s.join(TaskAssignment).where(TaskAssignment.user_id == assignee_id)
                 )
             
             if filters.is_overdue is not None:
-                now = datetime.utcnow()
                 if filters.is_overdue:
-                    conditions.append(
-                        and_(
-                            Task.due_date < now,
-                            Task.status.not_in([TaskStatus.DONE, TaskStatus.CANCELLED])
-                        )
+                    where_clauses.append(
+                        lambda s: s.where(Task.due_date < utc_now(), task_is_open(Task.status))
                     )
                 else:
-                    conditions.append(
-                        or_(
-                            Task.due_date >= now,
+                    where_clauses.append(
+                        lambda s: s.where(or_(
+                            Task.due_date >= utc_now(),
                             Task.due_date.is_(None),
-                            Task.status.in_([TaskStatus.DONE, TaskStatus.CANCELLED])
-                        )
+                            ~task_is_open(Task.status)
+                        ))
                     )
             
             if filters.search:
                 search_pattern = f"%{filters.search}%"
-                conditions.append(
-                    or_(
+                where_clauses.append(
+                    lambda s: s.where(or_(
                         Task.title.ilike(search_pattern),
                         Task.description.ilike(search_pattern)
-                    )
+                    ))
                 )
         
-        if conditions:
-            query = query.where(and_(*conditions))
-        
-        # Получаем общее количество
-        count_query = select(func.count()).select_from(Task)
-        
-        if filters and filters.assignee_id:
-             count_query = count_query.join(TaskAssignment).where(
-                 TaskAssignment.user_id == filters.assignee_id
-             )
-
-        if conditions:
-            count_query = count_query.where(and_(*conditions))
-        
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        # Базовый запрос; общее количество считается оконной функцией в том же проходе
+        query = lambda_stmt(
+            lambda: select(Task, func.count().over().label("total")).options(*_task_response_options())
+        )
+        for clause in where_clauses:
+            query += clause
         
         # Применяем пагинацию и сортировку
-        query = query.order_by(Task.created_at.desc()).offset(skip).limit(limit)
+        query += lambda s: s.order_by(Task.created_at.desc()).offset(skip).limit(limit)
         
         result = await db.execute(query)
-        tasks = result.scalars().all()
-        
-        return list(tasks), total
+        rows = result.all()
+        tasks = [row.Task for row in rows]
+        
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Страница за пределами выборки - строк с total нет, считаем отдельно
+            count_query = lambda_stmt(lambda: select(func.count()).select_from(Task))
+            for clause in where_clauses:
+                count_query += clause
+            total = (await db.execute(count_query)).scalar()
+        else:
+            total = 0
+        
+        return tasks, total
         
     except Exception as e:
         raise HTTPException(
@@ -306,20 +316,29 @@ async def update_task(
         Обновленная задача
     """
     try:
-        task = await get_task_by_id(db, task_id)
-        
         # Обновляем только переданные поля
         update_data = task_data.model_dump(exclude_unset=True)
+        if not update_data:
+            return await get_task_by_id(db, task_id)
         
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        # Если статус изменен на DONE, устанавливаем время завершения (если его еще нет)
+        if task_data.status == TaskStatus.DONE:
+            update_data["completed_at"] = func.coalesce(Task.completed_at, utc_now())
         
-        # Если статус изменен на DONE, устанавливаем время завершения
-        if task_data.status == TaskStatus.DONE and task.completed_at is None:
-            task.completed_at = datetime.utcnow()
+        # Один UPDATE ... RETURNING вместо загрузки задачи со связями перед изменением
+        result = await db.execute(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**update_data)
+            .returning(Task.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task with id {task_id} not found"
+            )
         
         await db.commit()
-        await db.refresh(task)
         
         return await get_task_by_id(db, task_id)
         
@@ -337,7 +356,7 @@ async def update_task(
 async def delete_task(
     db: AsyncSession,
     task_id: int,
-    user_id: int
+    current_user: User
 ) -> bool:
     """
     Удалить задачу
@@ -345,7 +364,7 @@ async def delete_task(
     Args:
         db: Сессия базы данных
         task_id: ID задачи
-        user_id: ID пользователя, выполняющего удаление
+        current_user: Пользователь, выполняющий удаление (уже загружен get_current_user)
         
     Returns:
         True если успешно удалено
@@ -354,17 +373,7 @@ async def delete_task(
         task = await get_task_by_id(db, task_id)
         
         # Проверяем права (только создатель или лид может удалить)
-        user_query = select(User).where(User.id == user_id)
-        user_result = await db.execute(user_query)
-        user = user_result.scalar_one_or_none()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        if task.created_by_id != user_id and not user.is_lead:
+        if task.created_by_id != current_user.id and not current_user.is_lead:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to delete this task"
@@ -464,7 +473,7 @@ async def remove_assignee(
     db: AsyncSession,
     task_id: int,
     assignee_id: int,
-    user_id: int
+    current_user: User
 ) -> bool:
     """
     Удалить ответственного из задачи
@@ -473,7 +482,7 @@ async def remove_assignee(
         db: Сессия базы данных
         task_id: ID задачи
         assignee_id: ID ответственного для удаления
-        user_id: ID пользователя, выполняющего удаление
+        current_user: Пользователь, выполняющий удаление (уже загружен get_current_user)
         
     Returns:
         True если успешно удалено
@@ -497,17 +506,11 @@ async def remove_assignee(
             )
         
         # Проверяем права (создатель задачи, сам ответственный или лид)
-        user_query = select(User).where(User.id == user_id)
-        user_result = await db.execute(user_query)
-        user = user_result.scalar_one_or_none()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        if task.created_by_id != user_id and assignee_id != user_id and not user.is_lead:
+        if (
+            task.created_by_id != current_user.id
+            and assignee_id != current_user.id
+            and not current_user.is_lead
+        ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to remove this assignee"
@@ -548,47 +551,47 @@ async def bulk_assign(
         Список созданных назначений
     """
     try:
-        # Проверяем существование задачи
-        await get_task_by_id(db, task_id)
+        # Существование задачи и всех пользователей одним SELECT, без загрузки строк
+        unique_assignee_ids = list(dict.fromkeys(assignee_ids))
+        check_query = select(
+            select(Task.id).where(Task.id == task_id).exists(),
+            select(func.count()).select_from(User).where(_id_in(db, User.id, unique_assignee_ids)).scalar_subquery()
+        )
+        task_exists, users_found = (await db.execute(check_query)).one()
         
-        # Проверяем существование всех пользователей
-        users_query = select(User).where(User.id.in_(assignee_ids))
-        users_result = await db.execute(users_query)
-        users = users_result.scalars().all()
+        if not task_exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task with id {task_id} not found"
+            )
         
-        if len(users) != len(assignee_ids):
+        if users_found != len(unique_assignee_ids):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="One or more users not found"
             )
         
-        # Получаем уже существующие назначения
-        existing_query = select(TaskAssignment).where(
-            TaskAssignment.task_id == task_id,
-            TaskAssignment.user_id.in_(assignee_ids)
+        # Одним INSERT; уже назначенных пропускает ON CONFLICT DO NOTHING
+        # вместо отдельного SELECT существующих назначений
+        dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        await db.execute(
+            dialect_insert(TaskAssignment)
+            .values([
+                {"task_id": task_id, "user_id": assignee_id, "assigned_by_id": assigned_by_id}
+                for assignee_id in unique_assignee_ids
+            ])
+            .on_conflict_do_nothing(index_elements=[TaskAssignment.task_id, TaskAssignment.user_id])
         )
-        existing_result = await db.execute(existing_query)
-        existing_assignments = existing_result.scalars().all()
-        existing_user_ids = {a.user_id for a in existing_assignments}
-        
-        # Создаем новые назначения только для тех, кто еще не назначен
-        new_assignments = []
-        for assignee_id in assignee_ids:
-            if assignee_id not in existing_user_ids:
-                assignment = TaskAssignment(
-                    task_id=task_id,
-                    user_id=assignee_id,
-                    assigned_by_id=assigned_by_id
-                )
-                db.add(assignment)
-                new_assignments.append(assignment)
-        
         await db.commit()
         
-        # Возвращаем все назначения (существующие + новые)
-        all_assignments_query = select(TaskAssignment).where(
-            TaskAssignment.task_id == task_id,
-            TaskAssignment.user_id.in_(assignee_ids)
+        # Возвращаем все назначения (существующие + новые) вместе с user для ответа
+        all_assignments_query = (
+            select(TaskAssignment)
+            .options(selectinload(TaskAssignment.user))
+            .where(
+                TaskAssignment.task_id == task_id,
+                _id_in(db, TaskAssignment.user_id, unique_assignee_ids)
+            )
         )
         all_result = await db.execute(all_assignments_query)
         return list(all_result.scalars().all())
@@ -623,34 +626,40 @@ async def get_user_task_statistics(
         Статистика по задачам
     """
     try:
-        # Получаем все задачи пользователя
+        # Все счетчики одним запросом: count(*) FILTER (WHERE ...) по каждому срезу
         query = (
-            select(Task)
-            .join(TaskAssignment)
+            select(
+                func.count().label("total"),
+                *[
+                    func.count().filter(Task.status == task_status).label(task_status.value)
+                    for task_status in TaskStatus
+                ],
+                func.count().filter(
+                    Task.due_date < utc_now(),
+                    task_is_open(Task.status)
+                ).label("overdue"),
+                *[
+                    func.count().filter(Task.priority == priority).label(f"priority_{priority.value}")
+                    for priority in TaskPriority
+                ],
+            )
+            .select_from(TaskAssignment)
+            .join(Task, Task.id == TaskAssignment.task_id)
             .where(TaskAssignment.user_id == user_id)
         )
-        result = await db.execute(query)
-        tasks = result.scalars().all()
-        
-        # Подсчитываем статистику
-        now = datetime.utcnow()
+        row = (await db.execute(query)).one()._mapping
+
         stats = TaskStatistics(
-            total=len(tasks),
-            todo=len([t for t in tasks if t.status == TaskStatus.TODO]),
-            in_progress=len([t for t in tasks if t.status == TaskStatus.IN_PROGRESS]),
-            review=len([t for t in tasks if t.status == TaskStatus.REVIEW]),
-            done=len([t for t in tasks if t.status == TaskStatus.DONE]),
-            cancelled=len([t for t in tasks if t.status == TaskStatus.CANCELLED]),
-            overdue=len([
-                t for t in tasks 
-                if t.due_date and t.due_date < now 
-                and t.status not in [TaskStatus.DONE, TaskStatus.CANCELLED]
-            ]),
+            total=row["total"],
+            todo=row[TaskStatus.TODO.value],
+            in_progress=row[TaskStatus.IN_PROGRESS.value],
+            review=row[TaskStatus.REVIEW.value],
+            done=row[TaskStatus.DONE.value],
+            cancelled=row[TaskStatus.CANCELLED.value],
+            overdue=row["overdue"],
             by_priority={
-                "low": len([t for t in tasks if t.priority == TaskPriority.LOW]),
-                "medium": len([t for t in tasks if t.priority == TaskPriority.MEDIUM]),
-                "high": len([t for t in tasks if t.priority == TaskPriority.HIGH]),
-                "urgent": len([t for t in tasks if t.priority == TaskPriority.URGENT]),
+                priority.value: row[f"priority_{priority.value}"]
+                for priority in TaskPriority
             }
         )
         
@@ -678,14 +687,9 @@ async def get_overdue_tasks(
         Список просроченных задач
     """
     try:
-        now = datetime.utcnow()
-        
-        query = select(Task).options(
-            selectinload(Task.created_by),
-            selectinload(Task.assignments).selectinload(TaskAssignment.user)
-        ).where(
-            Task.due_date < now,
-            Task.status.not_in([TaskStatus.DONE, TaskStatus.CANCELLED])
+        query = select(Task).options(*_task_response_options()).where(
+            Task.due_date < utc_now(),
+            task_is_open(Task.status)
         )
         
         if user_id:
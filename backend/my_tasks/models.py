@@ -1,7 +1,7 @@
 from core.database import Base
 from datetime import datetime
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, Float
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, Float, Index, func, literal_column, bindparam, text
 import enum
 
 
@@ -36,6 +36,11 @@ class TaskAssignment(Base):
     user: Mapped["User"] = relationship("User", foreign_keys=[user_id])
     assigned_by: Mapped["User | None"] = relationship("User", foreign_keys=[assigned_by_id])
     
+    __table_args__ = (
+        # PK (task_id, user_id) не помогает выборкам по пользователю: "мои задачи", статистика
+        Index("ix_task_assignments_user_id_task_id", "user_id", "task_id"),
+    )
+    
     def __repr__(self):
         return f"TaskAssignment(task_id={self.task_id}, user_id={self.user_id})"
 
@@ -45,6 +50,33 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from rooms.models import Room
 
+def task_search_vector(title, description):
+    """
+    Выражение полнотекстового поиска по задаче (совпадает с GIN индексом)
+    Константы - литералы, а не параметры, иначе планировщик не узнает индекс
+    """
+    empty = literal_column("''")
+    return func.to_tsvector(
+        literal_column("'simple'"),
+        func.coalesce(title, empty).op("||")(literal_column("' '")).op("||")(func.coalesce(description, empty))
+    )
+
+
+def task_is_open(status):
+    """
+    Задача не закрыта: status NOT IN ('DONE', 'CANCELLED')
+    Статусы подставляются литералами, иначе планировщик не сопоставит условие
+    с частичным индексом ix_tasks_open_due_date
+    """
+    return status.not_in(bindparam(
+        "closed_statuses",
+        [TaskStatus.DONE, TaskStatus.CANCELLED],
+        expanding=True,
+        literal_execute=True,
+        type_=status.type
+    ))
+
+
 class Task(Base):
     """Модель задачи"""
     __tablename__ = "tasks"
@@ -102,5 +134,35 @@ class Task(Base):
         """Получить список всех ответственных за задачу"""
         return [assignment.user for assignment in self.assignments]
     
+    __table_args__ = (
+        # Полнотекстовый поиск по теме (только PostgreSQL)
+        Index(
+            "ix_tasks_search_fts",
+            task_search_vector(title, description),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        # Просроченные задачи: только незакрытые, условие совпадает с task_is_open
+        Index(
+            "ix_tasks_open_due_date",
+            due_date,
+            postgresql_where=text("status NOT IN ('DONE', 'CANCELLED')")
+        ).ddl_if(dialect="postgresql"),
+        # ORDER BY created_at DESC в get_tasks (индекс читается в обратном порядке)
+        Index("ix_tasks_created_at", created_at),
+        # Триграммы для поиска ILIKE '%...%' в get_tasks (расширение pg_trgm)
+        Index(
+            "ix_tasks_title_trgm",
+            title,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tasks_description_trgm",
+            description,
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     def __repr__(self):
         return f"Task(id={self.id}, title={self.title}, status={self.status.value}, priority={self.priority.value})"
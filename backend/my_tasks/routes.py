@@ -39,6 +39,31 @@ from my_tasks.dep import (
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
+async def _task_list_page(
+    db: AsyncSession,
+    pagination: PaginationParams,
+    filter_params: TaskFilterParams
+) -> TaskListResponse:
+    """Общая часть списков задач: выборка страницы и подсчет страниц"""
+    tasks, total = await get_tasks(
+        db, 
+        skip=pagination.skip, 
+        limit=pagination.limit, 
+        filters=filter_params
+    )
+    
+    # Вычисляем общее количество страниц
+    total_pages = math.ceil(total / pagination.page_size) if total > 0 else 1
+    
+    return TaskListResponse(
+        tasks=tasks,
+        total=total,
+        page=pagination.page,
+        page_size=pagination.page_size,
+        total_pages=total_pages
+    )
+
+
 # ============================================
 # CRUD эндпоинты для задач
 # ============================================
@@ -83,24 +108,7 @@ async def get_all_tasks(
     # Конвертируем dependency в TaskFilterParams
     filter_params = filters.to_filter_params()
     
-    # Получаем задачи
-    tasks, total = await get_tasks(
-        db, 
-        skip=pagination.skip, 
-        limit=pagination.limit, 
-        filters=filter_params
-    )
-    
-    # Вычисляем общее количество страниц
-    total_pages = math.ceil(total / pagination.page_size) if total > 0 else 1
-    
-    return TaskListResponse(
-        tasks=tasks,
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        total_pages=total_pages
-    )
+    return await _task_list_page(db, pagination, filter_params)
 
 
 @router.get("/my", response_model=TaskListResponse)
@@ -116,22 +124,7 @@ async def get_my_tasks(
     # Конвертируем и добавляем фильтр по текущему пользователю
     filter_params = filters.to_filter_params()
     filter_params.assignee_id = current_user.id  # Переопределяем фильтр по ответственному
-    
-    tasks, total = await get_tasks(
-        db, 
-        skip=pagination.skip, 
-        limit=pagination.limit, 
-        filters=filter_params
-    )
-    total_pages = math.ceil(total / pagination.page_size) if total > 0 else 1
-    
-    return TaskListResponse(
-        tasks=tasks,
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        total_pages=total_pages
-    )
+    return await _task_list_page(db, pagination, filter_params)
 
 
 @router.get("/created-by-me", response_model=TaskListResponse)
@@ -147,22 +140,7 @@ async def get_tasks_created_by_me(
     # Конвертируем и добавляем фильтр по создателю
     filter_params = filters.to_filter_params()
     filter_params.created_by_id = current_user.id  # Переопределяем фильтр по создателю
-    
-    tasks, total = await get_tasks(
-        db, 
-        skip=pagination.skip, 
-        limit=pagination.limit, 
-        filters=filter_params
-    )
-    total_pages = math.ceil(total / pagination.page_size) if total > 0 else 1
-    
-    return TaskListResponse(
-        tasks=tasks,
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        total_pages=total_pages
-    )
+    return await _task_list_page(db, pagination, filter_params)
 
 
 @router.get("/overdue", response_model=list[TaskResponse])
@@ -233,7 +211,7 @@ async def delete_task_endpoint(
     
     Только создатель задачи или лид может удалить задачу
     """
-    await delete_task(db, task_id, current_user.id)
+    await delete_task(db, task_id, current_user)
     return None
 
 
@@ -275,7 +253,7 @@ async def remove_assignee_from_task(
     - Сам ответственный
     - Лид
     """
-    await remove_assignee(db, task_id, user_id, current_user.id)
+    await remove_assignee(db, task_id, user_id, current_user)
     return None
 
 
@@ -5,7 +5,7 @@ Notification System Models
 from core.database import Base
 from datetime import datetime
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, JSON
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Boolean, Text, Enum, JSON, Index, text
 import enum
 
 
@@ -26,7 +26,7 @@ class Notification(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     
     # Who receives the notification
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Notification details
     type: Mapped[NotificationType] = mapped_column(Enum(NotificationType), nullable=False)
@@ -40,14 +40,27 @@ class Notification(Base):
     payload: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     
     # Read status
-    is_read: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
+    is_read: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     read_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="notifications")
     
+    __table_args__ = (
+        # Every query filters by user; the feed is ordered by created_at desc
+        Index("ix_notifications_user_id_created_at", "user_id", created_at.desc()),
+        # Unread badge / unread-only feed: small index over unread rows only
+        Index(
+            "ix_notifications_user_id_unread",
+            "user_id",
+            postgresql_where=text("is_read = false")
+        ).ddl_if(dialect="postgresql"),
+    )
+    # Generated columns come back in the INSERT's RETURNING, no refresh needed
+    __mapper_args__ = {"eager_defaults": True}
+    
     def __repr__(self):
         return f"Notification(id={self.id}, type={self.type.value}, user_id={self.user_id}, is_read={self.is_read})"
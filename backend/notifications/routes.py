@@ -2,12 +2,12 @@
 Notification API Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from auth.dep import get_current_user
 from auth.models import User
-from notifications.schemas import NotificationResponse, NotificationMarkRead
+from notifications.schemas import NotificationResponse, NotificationMarkRead, NotificationListAdapter
 from notifications import service
 
 
@@ -29,7 +29,14 @@ async def get_notifications(
         limit=limit
     )
     
-    return notifications
+    # Skip FastAPI's response_model round trip (model -> dict -> JSON):
+    # rows are validated and serialized straight to JSON bytes
+    return Response(
+        content=NotificationListAdapter.dump_json(
+            NotificationListAdapter.validate_python(notifications, from_attributes=True)
+        ),
+        media_type="application/json"
+    )
 
 
 @router.get("/unread-count", response_model=dict)
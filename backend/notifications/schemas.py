@@ -2,7 +2,7 @@
 Notification Schemas
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import Optional, Dict, Any
 from datetime import datetime
 from .models import NotificationType
@@ -31,10 +31,13 @@ class NotificationResponse(BaseModel):
     read_at: Optional[datetime] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class NotificationMarkRead(BaseModel):
     """Mark notification as read"""
     notification_ids: list[int]
+
+
+# Built once at import; validates ORM rows and dumps JSON in one pydantic-core pass
+NotificationListAdapter = TypeAdapter(list[NotificationResponse])
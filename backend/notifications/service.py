@@ -3,15 +3,129 @@ Notification Service
 Handles creating and managing notifications
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, update, func, insert
+from core.database import async_session, utc_now
 from notifications.models import Notification, NotificationType
-from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+
+class NotificationWriter:
+    """
+    Coalesces concurrent notification writes into batched inserts
+
+    Callers put a row on the queue and await a future; a single worker
+    drains up to `max_batch` rows (or whatever arrived within `max_wait`
+    seconds) and writes them with one INSERT ... RETURNING in its own session
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        max_batch: int = 64,
+        max_wait: float = 0.005
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Batch taken off the queue and being written, for close()
+        self._batch: Optional[List[Tuple[Dict[str, Any], asyncio.Future]]] = None
+
+    async def write(self, row: Dict[str, Any]) -> Notification:
+        """Queue a notification row and wait until its batch is committed"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._batch = batch
+            await self._flush(batch)
+            self._batch = None
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            notifications = await self._insert([row for row, _ in batch])
+        except Exception:
+            # One bad row (e.g. a deleted user) fails the whole INSERT;
+            # retry row by row so only its own caller gets the error
+            for row, future in batch:
+                try:
+                    notifications = await self._insert([row])
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                if not future.done():
+                    future.set_result(notifications[0])
+            return
+
+        for (_, future), notification in zip(batch, notifications):
+            if not future.done():
+                future.set_result(notification)
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> List[Notification]:
+        async with self.session_factory() as db:
+            # ORM bulk insert hands back the rows as entities, in parameter order
+            result = await db.scalars(
+                insert(Notification).returning(Notification, sort_by_parameter_order=True),
+                rows
+            )
+            notifications = result.all()
+            await db.commit()
+        return notifications
+
+    async def close(self) -> None:
+        """Stop the worker; rows still queued or being written fail with CancelledError"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        for _, future in self._batch or ():
+            future.cancel()
+        self._batch = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._worker = None
+
+
+notification_writer = NotificationWriter()
+
+
+def _notification_row(notification: Notification) -> Dict[str, Any]:
+    return {
+        "user_id": notification.user_id,
+        "type": notification.type,
+        "title": notification.title,
+        "message": notification.message,
+        "link_url": notification.link_url,
+        "payload": notification.payload
+    }
 
 
 async def create_notification(
-    db: AsyncSession,
     user_id: int,
     notification_type: NotificationType,
     title: str,
@@ -19,35 +133,27 @@ async def create_notification(
     link_url: Optional[str] = None,
     payload: Optional[Dict[str, Any]] = None
 ) -> Notification:
-    """Create a new notification"""
-    notification = Notification(
-        user_id=user_id,
-        type=notification_type,
-        title=title,
-        message=message,
-        link_url=link_url,
-        payload=payload or {}
-    )
-    
-    db.add(notification)
-    await db.commit()
-    await db.refresh(notification)
-    
-    return notification
+    """Create a new notification (batched with concurrent writes)"""
+    return await notification_writer.write({
+        "user_id": user_id,
+        "type": notification_type,
+        "title": title,
+        "message": message,
+        "link_url": link_url,
+        "payload": payload or {}
+    })
 
 
-async def create_task_assigned_notification(
-    db: AsyncSession,
+def build_task_assigned_notification(
     user_id: int,
     task_id: int,
     task_title: str,
     assigned_by_name: str
 ) -> Notification:
-    """Create notification when task is assigned to user"""
-    return await create_notification(
-        db=db,
+    """Build (not save) task assigned notification, for batched inserts"""
+    return Notification(
         user_id=user_id,
-        notification_type=NotificationType.TASK_ASSIGNED,
+        type=NotificationType.TASK_ASSIGNED,
         title="New Task Assigned",
         message=f"{assigned_by_name} assigned you to task: {task_title}",
         link_url=f"/tasks/{task_id}",
@@ -59,6 +165,17 @@ async def create_task_assigned_notification(
     )
 
 
+async def create_task_assigned_notification(
+    user_id: int,
+    task_id: int,
+    task_title: str,
+    assigned_by_name: str
+) -> Notification:
+    """Create notification when task is assigned to user"""
+    notification = build_task_assigned_notification(user_id, task_id, task_title, assigned_by_name)
+    return await notification_writer.write(_notification_row(notification))
+
+
 async def get_user_notifications(
     db: AsyncSession,
     user_id: int,
@@ -86,27 +203,33 @@ async def mark_notifications_as_read(
     user_id: int
 ) -> int:
     """Mark notifications as read"""
+    # Already read rows are skipped so their read_at is kept;
+    # read_at is computed by the database, ids come back in the same round trip
     stmt = (
         update(Notification)
         .where(
             Notification.id.in_(notification_ids),
-            Notification.user_id == user_id
+            Notification.user_id == user_id,
+            Notification.is_read == False
         )
-        .values(is_read=True, read_at=datetime.utcnow())
+        .values(is_read=True, read_at=utc_now())
+        .returning(Notification.id)
+        .execution_options(synchronize_session=False)
     )
     
     result = await db.execute(stmt)
+    updated_ids = result.scalars().all()
     await db.commit()
     
-    return result.rowcount
+    return len(updated_ids)
 
 
 async def get_unread_count(db: AsyncSession, user_id: int) -> int:
     """Get count of unread notifications"""
-    query = select(Notification).where(
+    query = select(func.count()).select_from(Notification).where(
         Notification.user_id == user_id,
         Notification.is_read == False
     )
     
     result = await db.execute(query)
-    return len(result.scalars().all())
+    return result.scalar_one()
@@ -4,82 +4,143 @@ Handles AI analysis progress updates and notifications
 """
 
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set
-import json
+from typing import Dict, List, Optional, Set
+from weakref import WeakSet
 import asyncio
+import orjson
+from core.cache import cache
+
+
+# A client that can't take a frame within this time is treated as gone
+SEND_TIMEOUT_SECONDS = 2.0
+
+# Redis pub/sub channels, one pattern per event kind; every worker subscribes
+# and delivers to the sockets connected to it
+USER_CHANNEL_PREFIX = "ws:user:"
+ANALYSIS_CHANNEL_PREFIX = "ws:analysis:"
+
+# Backplane messages delivered at once; beyond that the listener waits
+MAX_PENDING_DELIVERIES = 256
+# Resubscribe delays after a Redis error: 1s, 2s, 4s ... up to the cap
+RESUBSCRIBE_MAX_DELAY_SECONDS = 30.0
 
 
 class ConnectionManager:
     """Manages WebSocket connections"""
     
     def __init__(self):
-        # user_id -> set of websockets
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+        # user_id -> list of websockets (a handful of tabs/devices per user,
+        # a list is cheaper than hashing; iterate over a snapshot)
+        self.active_connections: Dict[int, List[WebSocket]] = {}
+        
+        # analysis_id -> websockets (for AI progress tracking); weak refs so
+        # a socket that was never disconnected properly doesn't stay here
+        self.analysis_watchers: Dict[int, WeakSet] = {}
         
-        #analysis_id -> set of websockets (for AI progress tracking)
-        self.analysis_watchers: Dict[int, Set[WebSocket]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = False
+        self._deliveries: Set[asyncio.Task] = set()
+        self._delivery_slots = asyncio.Semaphore(MAX_PENDING_DELIVERIES)
     
     async def connect(self, websocket: WebSocket, user_id: int):
         """Connect a user's websocket"""
         await websocket.accept()
         
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
-        
-        self.active_connections[user_id].add(websocket)
+        self.active_connections.setdefault(user_id, []).append(websocket)
     
     def disconnect(self, websocket: WebSocket, user_id: int):
         """Disconnect a user's websocket"""
-        if user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
-            
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+        self._remove_connection(websocket, user_id)
         
-        # Also remove from analysis watchers
-        for analysis_id in list(self.analysis_watchers.keys()):
-            self.analysis_watchers[analysis_id].discard(websocket)
-            if not self.analysis_watchers[analysis_id]:
+        # Also remove from analysis watchers: only the analyses this socket
+        # subscribed to, not every analysis being watched
+        for analysis_id in getattr(websocket.state, "analysis_subscriptions", ()):
+            watchers = self.analysis_watchers.get(analysis_id)
+            if watchers is None:
+                continue
+            watchers.discard(websocket)
+            if not watchers:
                 del self.analysis_watchers[analysis_id]
     
+    def _remove_connection(self, websocket: WebSocket, user_id: int):
+        connections = self.active_connections.get(user_id)
+        if connections is None:
+            return
+        if websocket in connections:
+            connections.remove(websocket)
+        if not connections:
+            del self.active_connections[user_id]
+    
+    @staticmethod
+    async def _send_all(connections: tuple, payload: str) -> List[WebSocket]:
+        """Send to all connections concurrently, return the ones that failed"""
+        if not connections:
+            return []
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(connection.send_text(payload), SEND_TIMEOUT_SECONDS)
+                for connection in connections
+            ),
+            return_exceptions=True
+        )
+        return [
+            connection
+            for connection, result in zip(connections, results)
+            if isinstance(result, BaseException)
+        ]
+    
+    @staticmethod
+    def _serialize(message: dict) -> str:
+        # Serialized once for every recipient; sent as a text frame because
+        # the frontend JSON.parse-s event.data (a binary frame would be a Blob)
+        return orjson.dumps(message).decode()
+    
+    async def _publish(self, channel: str, payload: str) -> bool:
+        """Publish to all workers; False means deliver locally instead"""
+        if not self._subscribed:
+            return False
+        return await cache.publish(channel, payload)
+    
+    async def _deliver_to_user(self, user_id: int, payload: str):
+        # Snapshot: connect/disconnect may change the list while we await sends
+        connections = tuple(self.active_connections.get(user_id, ()))
+        for connection in await self._send_all(connections, payload):
+            self._remove_connection(connection, user_id)
+    
+    async def _deliver_to_analysis(self, analysis_id: int, payload: str):
+        watchers = self.analysis_watchers.get(analysis_id)
+        if not watchers:
+            return
+        for connection in await self._send_all(tuple(watchers), payload):
+            watchers.discard(connection)
+    
     async def send_personal_message(self, message: dict, user_id: int):
-        """Send message to specific user"""
-        if user_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    disconnected.append(connection)
-            
-            # Clean up disconnected connections
-            for conn in disconnected:
-                self.active_connections[user_id].discard(conn)
+        """Send message to specific user (on whichever worker they are connected)"""
+        payload = self._serialize(message)
+        if not await self._publish(f"{USER_CHANNEL_PREFIX}{user_id}", payload):
+            await self._deliver_to_user(user_id, payload)
     
     async def subscribe_to_analysis(self, websocket: WebSocket, analysis_id: int):
         """Subscribe to AI analysis updates"""
         if analysis_id not in self.analysis_watchers:
-            self.analysis_watchers[analysis_id] = set()
+            self.analysis_watchers[analysis_id] = WeakSet()
         
         self.analysis_watchers[analysis_id].add(websocket)
+        
+        # Reverse index for disconnect
+        if not hasattr(websocket.state, "analysis_subscriptions"):
+            websocket.state.analysis_subscriptions = set()
+        websocket.state.analysis_subscriptions.add(analysis_id)
     
     async def send_analysis_update(self, analysis_id: int, update: dict):
         """Send update to all watchers of an analysis"""
-        if analysis_id in self.analysis_watchers:
-            disconnected = []
-            for connection in self.analysis_watchers[analysis_id]:
-                try:
-                    await connection.send_json({
-                        "type": "analysis_update",
-                        "analysis_id": analysis_id,
-                        **update
-                    })
-                except:
-                    disconnected.append(connection)
-            
-            # Clean up disconnected
-            for conn in disconnected:
-                self.analysis_watchers[analysis_id].discard(conn)
+        payload = self._serialize({
+            "type": "analysis_update",
+            "analysis_id": analysis_id,
+            **update
+        })
+        if not await self._publish(f"{ANALYSIS_CHANNEL_PREFIX}{analysis_id}", payload):
+            await self._deliver_to_analysis(analysis_id, payload)
     
     async def notify_task_assigned(self, user_id: int, task_data: dict):
         """Notify user about task assignment"""
@@ -94,6 +155,72 @@ class ConnectionManager:
             "type": "new_notification",
             "data": notification_data
         }, user_id)
+    
+    async def start(self):
+        """
+        Subscribe this worker to the Redis backplane
+        
+        Without Redis (or while the subscription is down) messages are
+        delivered to the local sockets only, as with a single worker
+        """
+        if cache.redis is None:
+            return
+        self._listener = asyncio.create_task(self._listen())
+    
+    async def stop(self):
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+        for delivery in tuple(self._deliveries):
+            delivery.cancel()
+    
+    async def _listen(self):
+        """Keep the subscription up, resubscribing with backoff after Redis errors"""
+        delay = 1.0
+        while True:
+            pubsub = cache.redis.pubsub()
+            try:
+                await pubsub.psubscribe(f"{USER_CHANNEL_PREFIX}*", f"{ANALYSIS_CHANNEL_PREFIX}*")
+                self._subscribed = True
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        await self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WebSocket backplane error: {e}")
+            finally:
+                self._subscribed = False
+                await pubsub.aclose()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESUBSCRIBE_MAX_DELAY_SECONDS)
+    
+    async def _dispatch(self, channel: str, payload: str):
+        # Each message is delivered in its own task so one slow socket
+        # doesn't hold up the rest of the backplane
+        if channel.startswith(USER_CHANNEL_PREFIX):
+            deliver, target = self._deliver_to_user, channel[len(USER_CHANNEL_PREFIX):]
+        elif channel.startswith(ANALYSIS_CHANNEL_PREFIX):
+            deliver, target = self._deliver_to_analysis, channel[len(ANALYSIS_CHANNEL_PREFIX):]
+        else:
+            return
+        if not target.isdigit():
+            return
+        
+        await self._delivery_slots.acquire()
+        task = asyncio.create_task(deliver(int(target), payload))
+        self._deliveries.add(task)
+        task.add_done_callback(self._delivery_done)
+    
+    def _delivery_done(self, task: asyncio.Task):
+        self._deliveries.discard(task)
+        self._delivery_slots.release()
 
 
 # Global connection manager instance
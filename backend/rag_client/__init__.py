@@ -4,5 +4,6 @@ HTTP client for communicating with RAG microservice
 """
 
 from .client import RAGClient
+from .dep import get_rag_client
 
-__all__ = ["RAGClient"]
+__all__ = ["RAGClient", "get_rag_client"]
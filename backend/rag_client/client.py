@@ -3,14 +3,23 @@ HTTP Client for RAG Microservice
 Provides async methods to interact with the RAG service
 """
 
+import asyncio
 import httpx
 from typing import List, Dict, Optional
 
 
+# Coalescing window for index_document
+BATCH_MAX_DOCUMENTS = 32
+BATCH_MAX_WAIT_SECONDS = 0.02
+
+
 class RAGClient:
     """
     Async HTTP client for RAG microservice
     Handles communication between main backend and RAG service
+
+    One instance lives for the whole app (created in the lifespan) so
+    requests reuse pooled keep-alive connections
     """
     
     def __init__(self, base_url: str = "http://localhost:8001"):
@@ -21,7 +30,15 @@ class RAGClient:
             base_url: Base URL of the RAG microservice
         """
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=100)
+        )
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_worker: Optional[asyncio.Task] = None
+        # Batch taken off the queue and being sent, for close()
+        self._batch: Optional[List] = None
     
     async def index_document(
         self,
@@ -32,6 +49,9 @@ class RAGClient:
         """
         Index a document in the RAG system
         
+        Concurrent calls are coalesced (up to BATCH_MAX_DOCUMENTS documents
+        or BATCH_MAX_WAIT_SECONDS) into one bulk request
+        
         Args:
             text: Document text to index
             document_id: Unique document identifier
@@ -40,22 +60,98 @@ class RAGClient:
         Returns:
             Indexing result with status and chunk count
         """
+        if self._batch_worker is None or self._batch_worker.done():
+            self._batch_queue = asyncio.Queue()
+            self._batch_worker = asyncio.create_task(self._run_batches())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put(({
+            "text": text,
+            "document_id": document_id,
+            "metadata": metadata
+        }, future))
+        return await future
+    
+    async def index_documents(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Index several documents with one request
+        
+        Args:
+            documents: Dicts with text, document_id and optional metadata
+            
+        Returns:
+            Indexing result per document, in input order
+        """
+        if not documents:
+            return []
         try:
-            response = await self.client.post(
-                f"{self.base_url}/api/rag/documents",
-                json={
-                    "text": text,
-                    "document_id": document_id,
-                    "metadata": metadata
-                }
-            )
+            response = await self.client.post("/api/rag/documents/batch", json=documents)
+            if response.is_client_error:
+                # No bulk endpoint (404/405) or one document rejected (422):
+                # concurrent single requests over the shared connection pool,
+                # so only an invalid document fails
+                return list(await asyncio.gather(
+                    *(self._post_document(document) for document in documents)
+                ))
+            response.raise_for_status()
+            results = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            return [self._index_error(e) for _ in documents]
+        
+        if not isinstance(results, list) or len(results) != len(documents):
+            return [
+                self._index_error("bulk response doesn't match the documents sent")
+                for _ in documents
+            ]
+        return results
+    
+    @staticmethod
+    def _index_error(error) -> Dict:
+        return {
+            "status": "error",
+            "message": f"Failed to index document: {str(error)}"
+        }
+    
+    async def _post_document(self, document: Dict) -> Dict:
+        try:
+            response = await self.client.post("/api/rag/documents", json=document)
             response.raise_for_status()
             return response.json()
-        except httpx.HTTPError as e:
-            return {
-                "status": "error",
-                "message": f"Failed to index document: {str(e)}"
-            }
+        except (httpx.HTTPError, ValueError) as e:
+            return self._index_error(e)
+    
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._batch_queue.get()]
+            deadline = loop.time() + BATCH_MAX_WAIT_SECONDS
+            while len(batch) < BATCH_MAX_DOCUMENTS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            self._batch = batch
+            try:
+                results = await self.index_documents([document for document, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            finally:
+                self._batch = None
+            
+            # Every caller gets an answer, even if fewer results came back
+            missing = self._index_error("no result for document")
+            for index, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                result = results[index] if index < len(results) else missing
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
     
     async def search(
         self,
@@ -80,7 +176,7 @@ class RAGClient:
         """
         try:
             response = await self.client.post(
-                f"{self.base_url}/api/rag/search",
+                "/api/rag/search",
                 json={
                     "query": query,
                     "top_k": top_k,
@@ -107,7 +203,7 @@ class RAGClient:
         """
         try:
             response = await self.client.get(
-                f"{self.base_url}/api/rag/documents/{document_id}"
+                f"/api/rag/documents/{document_id}"
             )
             response.raise_for_status()
             return response.json()
@@ -132,7 +228,7 @@ class RAGClient:
         """
         try:
             response = await self.client.delete(
-                f"{self.base_url}/api/rag/documents/{document_id}"
+                f"/api/rag/documents/{document_id}"
             )
             response.raise_for_status()
             return response.json()
@@ -151,7 +247,7 @@ class RAGClient:
         """
         try:
             response = await self.client.get(
-                f"{self.base_url}/api/rag/health"
+                "/api/rag/health"
             )
             response.raise_for_status()
             return response.json()
@@ -163,23 +259,34 @@ class RAGClient:
     
     async def close(self):
         """Close the HTTP client"""
+        if self._batch_worker is not None:
+            self._batch_worker.cancel()
+            try:
+                await self._batch_worker
+            except asyncio.CancelledError:
+                pass
+            for _, future in self._batch or ():
+                future.cancel()
+            self._batch = None
+            while not self._batch_queue.empty():
+                _, future = self._batch_queue.get_nowait()
+                future.cancel()
+            self._batch_worker = None
         await self.client.aclose()
 
 
 # Example usage in FastAPI endpoint:
 """
-from rag_client import RAGClient
+from fastapi import Depends
+from rag_client import RAGClient, get_rag_client
 
 @app.post("/documents/analyze")
-async def analyze_document(text: str, doc_id: str):
-    rag_client = RAGClient()
-    
+async def analyze_document(text: str, doc_id: str, rag_client: RAGClient = Depends(get_rag_client)):
     # Index the document
     result = await rag_client.index_document(text, doc_id)
     
     # Search for similar content
     results = await rag_client.search("your query", top_k=3)
     
-    await rag_client.close()
     return {"indexing": result, "search": results}
 """
@@ -0,0 +1,7 @@
+from fastapi import Request
+from .client import RAGClient
+
+
+def get_rag_client(request: Request) -> RAGClient:
+    """Shared RAGClient created in the app lifespan"""
+    return request.app.state.rag_client
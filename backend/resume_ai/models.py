@@ -1,10 +1,35 @@
 from core.database import Base
 from datetime import datetime
-from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.orm import relationship, Mapped, mapped_column, validates
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+import json
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase form of a skill, as stored in `skills_normalized`"""
+    return skill.strip().lower()
+
+
+def build_skills_normalized(core_skills: str | None) -> list[str] | None:
+    """Precompute `skills_normalized` from the core_skills JSON list"""
+    try:
+        skills = json.loads(core_skills) if core_skills else []
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(skills, list) or not skills:
+        return None
+    return list(dict.fromkeys(normalize_skill(str(skill)) for skill in skills))
+
 
 class ResumeAnalysis(Base):
     __tablename__ = "resume_analysis"
+    __table_args__ = (
+        # skills_normalized ?| array[...] (default jsonb_ops, jsonb_path_ops has no ?|)
+        Index("ix_resume_analysis_skills_normalized_gin", "skills_normalized", postgresql_using="gin"),
+    )
+    # id и defaults приходят в RETURNING того же INSERT/UPDATE, refresh не нужен
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
@@ -23,6 +48,7 @@ class ResumeAnalysis(Base):
     # Самое важное для векторного поиска
     professional_summary: Mapped[str | None] = mapped_column(Text)  # краткое описание профиля (2-3 предложения)
     core_skills: Mapped[str | None] = mapped_column(Text)  # JSON: топ 10-15 ключевых навыков
+    skills_normalized: Mapped[list | None] = mapped_column(JSON().with_variant(JSONB(), "postgresql"))  # ["python", "fastapi"] - навыки в нижнем регистре для поиска в SQL
     work_experience_summary: Mapped[str | None] = mapped_column(Text)  # сжатый опыт работы (компании + роли)
     project_experience_summary: Mapped[str | None] = mapped_column(Text)  # сжатый самари именно в каких проектах работал
     
@@ -37,5 +63,11 @@ class ResumeAnalysis(Base):
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="resume_analysis")
 
+    @validates("core_skills")
+    def _sync_skills_normalized(self, key, value):
+        # Keep the search column in sync on every save path (upload, patch)
+        self.skills_normalized = build_skills_normalized(value)
+        return value
+
     def __repr__(self):
         return f"ResumeAnalysis(id={self.id}, name='{self.full_name}', position='{self.current_position}')"
@@ -50,14 +50,12 @@ async def upload_resume(
             setattr(existing_analysis, key, value)
         db.add(existing_analysis)
         await db.commit()
-        await db.refresh(existing_analysis)
         return existing_analysis
     else:
         # Create new
         new_analysis = ResumeAnalysis(**extracted_data, user_id=user.id)
         db.add(new_analysis)
         await db.commit()
-        await db.refresh(new_analysis)
         return new_analysis
 
 @router.get("/", response_model=ResumeAnalysisResponse | None)
@@ -89,5 +87,4 @@ async def update_resume_analysis(
 
     db.add(analysis)
     await db.commit()
-    await db.refresh(analysis)
     return analysis
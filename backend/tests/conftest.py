@@ -8,7 +8,7 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from core.database import Base, get_db
+from core.database import Base, get_db, get_session_factory
 from main import app
 from auth.dep import get_current_user
 
@@ -19,12 +19,19 @@ from rooms.models import Room, RoomMember
 from auth.security_service.token_models import RefreshTokenSession, TokenBlacklist
 
 from auth.security_service.password import hash_password
+from ai.semantic_cache import semantic_cache
 
 
 # Тестовая база данных - используем StaticPool для in-memory SQLite
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
+@pytest.fixture(autouse=True)
+def disable_semantic_cache(monkeypatch):
+    """Отключаем семантический кэш, чтобы тесты не ходили за эмбеддингами в OpenAI"""
+    monkeypatch.setattr(semantic_cache, "enabled", False)
+
+
 @pytest_asyncio.fixture(scope="function")
 async def async_engine():
     """Создаем асинхронный движок для тестов"""
@@ -113,10 +120,14 @@ async def client(test_db: AsyncSession, test_user: User) -> AsyncGenerator[Async
     async def override_get_db():
         yield test_db
     
+    def override_get_session_factory():
+        return async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+    
     async def override_get_current_user():
         return test_user
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
     app.dependency_overrides[get_current_user] = override_get_current_user
     
     transport = ASGITransport(app=app)
@@ -133,10 +144,14 @@ async def client_lead(test_db: AsyncSession, test_lead_user: User) -> AsyncGener
     async def override_get_db():
         yield test_db
     
+    def override_get_session_factory():
+        return async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+    
     async def override_get_current_user():
         return test_lead_user
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
     app.dependency_overrides[get_current_user] = override_get_current_user
     
     transport = ASGITransport(app=app)
@@ -3,12 +3,15 @@ Comprehensive tests for AI Agent System with LangGraph
 Tests routes, agents, tools, and complete workflows
 """
 
+import asyncio
+import json
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ai.agents import ProblemAnalyzer, TaskBreakdownOrchestrator
+from ai.semantic_cache import SemanticCache
 from ai.models import AIAnalysisHistory, AnalysisStatus
 from rooms.models import Room, RoomMember, RoomRole
 from resume_ai.models import ResumeAnalysis
@@ -48,13 +51,150 @@ async def test_problem_analyzer():
         assert result["estimated_complexity"] == "moderate"
 
 
+@pytest.mark.asyncio
+async def test_problem_analyzer_uses_structured_output():
+    """Parsed schema object is used without touching the raw content"""
+    
+    from ai.schemas import ProblemAnalysisSchema
+    
+    parsed = ProblemAnalysisSchema(
+        problem_summary="Slow dashboard",
+        problem_type="frontend",
+        priority="high",
+        required_skills=["React"],
+        estimated_complexity="moderate",
+        keywords=["dashboard"]
+    )
+    
+    with patch("ai.agents.ChatOpenAI") as MockChatOpenAI:
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = AIMessage(content="", additional_kwargs={"parsed": parsed})
+        MockChatOpenAI.return_value = mock_llm
+        
+        analyzer = ProblemAnalyzer(language="en")
+        result = await analyzer.analyze_problem("Dashboard takes 10s to load")
+    
+    assert mock_llm.ainvoke.call_args.kwargs["response_format"] is ProblemAnalysisSchema
+    assert result == {**parsed.model_dump(), "language": "en"}
+
+
+@pytest.mark.asyncio
+async def test_problem_analyzer_repairs_malformed_json():
+    """Fenced JSON with trailing commas is repaired instead of discarded"""
+    
+    with patch("ai.agents.ChatOpenAI") as MockChatOpenAI:
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = MagicMock(content="""```json
+{
+    "problem_summary": "Login page crashes",
+    "problem_type": "bug",
+    "priority": "urgent",
+    "required_skills": ["React",],
+    "estimated_complexity": "simple",
+    "keywords": ["login",],
+}
+```""")
+        MockChatOpenAI.return_value = mock_llm
+        
+        analyzer = ProblemAnalyzer(language="en")
+        result = await analyzer.analyze_problem("Login page crashes")
+    
+    assert result["problem_type"] == "bug"
+    assert result["required_skills"] == ["React"]
+
+
+@pytest.mark.asyncio
+async def test_problem_analyzer_corrects_client_language():
+    """Cyrillic problem sent with language=en is analyzed with the Russian prompt"""
+    
+    from ai.agents import SYSTEM_PROMPTS
+    
+    with patch("ai.agents.ChatOpenAI") as MockChatOpenAI:
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = MagicMock(content="{}")
+        MockChatOpenAI.return_value = mock_llm
+        
+        analyzer = ProblemAnalyzer(language="en")
+        result = await analyzer.analyze_problem("Страница входа падает после обновления React")
+    
+    messages = mock_llm.ainvoke.call_args.args[0]
+    assert messages[0].content == SYSTEM_PROMPTS["ru"]["problem_analyzer"]
+    assert result["language"] == "ru"
+
+
+@pytest.mark.asyncio
+async def test_problem_analyzer_compresses_long_description():
+    """Oversized description is condensed before the analysis call"""
+    
+    with patch("ai.agents.ChatOpenAI") as MockChatOpenAI:
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = [
+            MagicMock(content="Checkout times out under load"),
+            MagicMock(content='{"problem_summary": "Checkout timeouts"}')
+        ]
+        MockChatOpenAI.return_value = mock_llm
+        
+        analyzer = ProblemAnalyzer(language="en")
+        result = await analyzer.analyze_problem("Checkout times out. " + "log line\n" * 5000)
+    
+    compress_messages = mock_llm.ainvoke.await_args_list[0].args[0]
+    analyze_messages = mock_llm.ainvoke.await_args_list[1].args[0]
+    assert len(compress_messages[1].content) == 32000
+    assert analyze_messages[1].content.endswith("Checkout times out under load")
+    assert result["problem_summary"] == "Checkout timeouts"
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings: similar texts share the first vector component"""
+    
+    async def aembed_query(self, text):
+        if "database" in text:
+            return [1.0, 0.05, 0.0]
+        return [0.0, 0.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_problem_analyzer_semantic_cache_hit():
+    """Near-duplicate problem in the same language skips the LLM call"""
+    
+    cache = SemanticCache(threshold=0.9)
+    cache._embeddings = FakeEmbeddings()
+    
+    with patch("ai.agents.ChatOpenAI") as MockChatOpenAI:
+        mock_llm = AsyncMock()
+        mock_response = MagicMock()
+        mock_response.content = """{
+            "problem_summary": "Database performance issue",
+            "problem_type": "infrastructure",
+            "priority": "high",
+            "required_skills": ["PostgreSQL"],
+            "estimated_complexity": "moderate",
+            "keywords": ["database"]
+        }"""
+        mock_llm.ainvoke.return_value = mock_response
+        MockChatOpenAI.return_value = mock_llm
+        
+        analyzer = ProblemAnalyzer(language="en", semantic_cache=cache)
+        first = await analyzer.analyze_problem("Our database is slow")
+        second = await analyzer.analyze_problem("  our DATABASE is   slow!! ")
+        
+        assert mock_llm.ainvoke.await_count == 1
+        assert second == first
+        
+        # Similar problem written in another language is a miss
+        await analyzer.analyze_problem("Наша database очень медленная")
+        assert mock_llm.ainvoke.await_count == 2
+        
+        # Unrelated problem is a miss
+        await analyzer.analyze_problem("Login button is broken")
+        assert mock_llm.ainvoke.await_count == 3
+
+
 @pytest.mark.asyncio
 async def test_langgraph_workflow():
     """Test TaskBreakdownOrchestrator uses LangGraph StateGraph correctly"""
     
-    mock_db = AsyncMock()
-    
-    orchestrator = TaskBreakdownOrchestrator(room_id=1, db=mock_db, language="en")
+    orchestrator = TaskBreakdownOrchestrator(room_id=1, session_factory=MagicMock(), language="en")
     
     # Mock tools
     orchestrator._execute_tool = AsyncMock(return_value=[
@@ -92,7 +232,7 @@ async def test_langgraph_workflow():
         
         mock_bound_llm = MagicMock()
         mock_bound_llm.ainvoke = mock_ainvoke
-        mock_llm.bind_tools.return_value = mock_bound_llm
+        mock_llm.bind_tools = MagicMock(return_value=mock_bound_llm)
         mock_get_model.return_value = mock_llm
         
         # Mock final parsing
@@ -125,10 +265,233 @@ async def test_langgraph_workflow():
             assert result["subtasks"][0]["assigned_to_username"] == "dev1"
 
 
+@pytest.mark.asyncio
+async def test_breakdown_stops_on_repeated_tool_call():
+    """Model repeating the same tool call again after a memoized repeat ends the loop"""
+    
+    orchestrator = TaskBreakdownOrchestrator(room_id=1, session_factory=MagicMock(), language="en")
+    orchestrator._run_tool = AsyncMock(return_value=[])
+    
+    with patch("ai.agents.get_model_for_complexity") as mock_get_model:
+        mock_llm = MagicMock()
+        mock_llm.model_name = "gpt-4o"
+        mock_bound_llm = MagicMock()
+        mock_bound_llm.ainvoke = AsyncMock(side_effect=lambda *args, **kwargs: AIMessage(
+            content="",
+            tool_calls=[{
+                "name": "find_employees_by_skills_tool",
+                "args": {"required_skills": ["Go"]},
+                "id": "call_1"
+            }]
+        ))
+        final_llm = MagicMock()
+        final_llm.ainvoke = AsyncMock(return_value=AIMessage(content=json.dumps({
+            "overall_strategy": "Rewrite with the team we have",
+            "subtasks": [{
+                "title": "Port handlers",
+                "description": "Port HTTP handlers to Go",
+                "assigned_to_user_id": None,
+                "assigned_to_username": None,
+                "priority": "medium",
+                "estimated_time": "3 days",
+                "required_skills": ["Go"],
+                "reasoning": "No Go developers found"
+            }],
+            "warnings": ["No Go developers in the room"]
+        })))
+        mock_llm.bind_tools = MagicMock(
+            side_effect=lambda *args, **kwargs: final_llm if kwargs.get("tool_choice") == "none" else mock_bound_llm
+        )
+        mock_get_model.return_value = mock_llm
+        
+        result = await orchestrator.create_breakdown(
+            problem_analysis={"estimated_complexity": "moderate"},
+            problem_description="Rewrite service in Go"
+        )
+    
+    # First repeat is served from the memo, the second one stops the loop
+    assert orchestrator._run_tool.await_count == 1
+    assert mock_bound_llm.ainvoke.await_count == 3
+    
+    # One last call without tools answers from the gathered results;
+    # the unanswered tool call message is not sent
+    assert final_llm.ainvoke.await_count == 1
+    final_messages = final_llm.ainvoke.await_args.args[0]
+    assert isinstance(final_messages[-1], HumanMessage)
+    assert isinstance(final_messages[-2], ToolMessage)
+    
+    assert [s["title"] for s in result["subtasks"]] == ["Port handlers"]
+    assert "repeated tool calls" in result["warnings"][0]
+    assert result["warnings"][1] == "No Go developers in the room"
+
+
+@pytest.mark.asyncio
+async def test_breakdown_completes_after_repeated_call_in_later_turn():
+    """Re-asking for room members in a later turn is answered from the memo, not stopped"""
+    
+    orchestrator = TaskBreakdownOrchestrator(room_id=1, session_factory=MagicMock(), language="en")
+    orchestrator._run_tool = AsyncMock(return_value=[{"user_id": 1, "username": "dev1"}])
+    
+    members_call = AIMessage(content="", tool_calls=[{
+        "name": "get_room_members_tool",
+        "args": {},
+        "id": "call_1"
+    }])
+    skills_call = AIMessage(content="", tool_calls=[{
+        "name": "find_employees_by_skills_tool",
+        "args": {"required_skills": ["Python"]},
+        "id": "call_2"
+    }])
+    members_again = AIMessage(content="", tool_calls=[{
+        "name": "get_room_members_tool",
+        "args": {},
+        "id": "call_3"
+    }])
+    final = AIMessage(content=json.dumps({
+        "overall_strategy": "Assign to dev1",
+        "subtasks": [{
+            "title": "Build API",
+            "description": "Desc",
+            "assigned_to_user_id": 1,
+            "assigned_to_username": "dev1",
+            "priority": "high",
+            "estimated_time": "2 days",
+            "required_skills": ["Python"],
+            "reasoning": "Only Python developer"
+        }],
+        "warnings": []
+    }))
+    
+    with patch("ai.agents.get_model_for_complexity") as mock_get_model:
+        mock_llm = MagicMock()
+        mock_llm.model_name = "gpt-4o"
+        mock_bound_llm = MagicMock()
+        mock_bound_llm.ainvoke = AsyncMock(side_effect=[members_call, skills_call, members_again, final])
+        mock_llm.bind_tools = MagicMock(return_value=mock_bound_llm)
+        mock_get_model.return_value = mock_llm
+        
+        result = await orchestrator.create_breakdown(
+            problem_analysis={"estimated_complexity": "moderate"},
+            problem_description="Build the API"
+        )
+    
+    assert mock_bound_llm.ainvoke.await_count == 4
+    # get_room_members_tool ran once, the repeat came from the memo
+    assert orchestrator._run_tool.await_count == 2
+    assert [s["title"] for s in result["subtasks"]] == ["Build API"]
+    assert result["warnings"] == []
+
+
+@pytest.mark.asyncio
+async def test_breakdown_answers_after_round_budget_with_one_call_per_turn():
+    """A model asking for one new tool per turn is cut by the round budget, not the recursion limit"""
+    
+    from ai.agents import MAX_TOOL_ROUNDS
+    
+    orchestrator = TaskBreakdownOrchestrator(room_id=1, session_factory=MagicMock(), language="en")
+    orchestrator._execute_tool = AsyncMock(return_value=[])
+    
+    turn = 0
+    async def one_call_per_turn(*args, **kwargs):
+        nonlocal turn
+        turn += 1
+        return AIMessage(content="", tool_calls=[{
+            "name": "get_user_resume_tool",
+            "args": {"user_id": turn},
+            "id": f"call_{turn}"
+        }])
+    
+    with patch("ai.agents.get_model_for_complexity") as mock_get_model:
+        mock_llm = MagicMock()
+        mock_llm.model_name = "gpt-4o"
+        mock_bound_llm = MagicMock()
+        mock_bound_llm.ainvoke = AsyncMock(side_effect=one_call_per_turn)
+        final_llm = MagicMock()
+        final_llm.ainvoke = AsyncMock(return_value=AIMessage(content=json.dumps({
+            "overall_strategy": "Use the resumes gathered",
+            "subtasks": [{
+                "title": "Do it",
+                "description": "Desc",
+                "assigned_to_user_id": 1,
+                "assigned_to_username": "dev1",
+                "priority": "high",
+                "estimated_time": "1 day",
+                "required_skills": [],
+                "reasoning": "Best fit"
+            }],
+            "warnings": []
+        })))
+        mock_llm.bind_tools = MagicMock(
+            side_effect=lambda *args, **kwargs: final_llm if kwargs.get("tool_choice") == "none" else mock_bound_llm
+        )
+        mock_get_model.return_value = mock_llm
+        
+        result = await orchestrator.create_breakdown(
+            problem_analysis={"estimated_complexity": "moderate"},
+            problem_description="Staff the project"
+        )
+    
+    assert orchestrator._execute_tool.await_count == MAX_TOOL_ROUNDS
+    assert mock_bound_llm.ainvoke.await_count == MAX_TOOL_ROUNDS + 1
+    assert final_llm.ainvoke.await_count == 1
+    assert [s["title"] for s in result["subtasks"]] == ["Do it"]
+    assert "too many or repeated tool calls" in result["warnings"][0]
+
+
+@pytest.mark.asyncio
+async def test_call_tools_runs_calls_concurrently():
+    """All tool calls of one model turn run together; a failing tool yields an error message"""
+    
+    orchestrator = TaskBreakdownOrchestrator(room_id=1, session_factory=MagicMock(), language="en")
+    
+    started = []
+    
+    async def fake_execute(function_name, arguments):
+        started.append(function_name)
+        # Every call waits until both have started - deadlocks if run serially
+        while len(started) < 2:
+            await asyncio.sleep(0)
+        if function_name == "get_user_resume_tool":
+            raise RuntimeError("db is down")
+        return [{"user_id": 1}]
+    
+    orchestrator._execute_tool = fake_execute
+    
+    state = {"messages": [AIMessage(content="", tool_calls=[
+        {"name": "get_room_members_tool", "args": {}, "id": "call_1"},
+        {"name": "get_user_resume_tool", "args": {"user_id": 1}, "id": "call_2"},
+    ])]}
+    
+    result = await asyncio.wait_for(orchestrator._call_tools(state), timeout=1)
+    
+    tool_messages = result["messages"]
+    assert [m.tool_call_id for m in tool_messages] == ["call_1", "call_2"]
+    assert json.loads(tool_messages[0].content) == [{"user_id": 1}]
+    assert json.loads(tool_messages[1].content) == {"error": "db is down"}
+
+
 # ========================================
 # INTEGRATION TESTS: API Routes
 # ========================================
 
+@pytest.mark.asyncio
+async def test_execute_tool_memoizes_identical_calls():
+    """Identical tool calls within a breakdown hit the database once"""
+    
+    orchestrator = TaskBreakdownOrchestrator(room_id=1, session_factory=MagicMock(), language="en")
+    orchestrator._run_tool = AsyncMock(return_value=[{"user_id": 1}])
+    
+    results = await asyncio.gather(
+        orchestrator._execute_tool("get_room_members_tool", {}),
+        orchestrator._execute_tool("get_room_members_tool", {}),
+        orchestrator._execute_tool("find_employees_by_skills_tool", {"required_skills": ["Python"], "role": None}),
+        orchestrator._execute_tool("find_employees_by_skills_tool", {"role": None, "required_skills": ["Python"]})
+    )
+    
+    assert results[0] == results[1] == [{"user_id": 1}]
+    assert orchestrator._run_tool.await_count == 2
+
+
 @pytest.mark.asyncio
 async def test_analyze_problem_endpoint(client: AsyncClient, test_user: User):
     """Test /ai/analyze-problem endpoint"""
@@ -262,12 +625,9 @@ async def test_breakdown_and_apply_workflow(
             
             if call_count == 1:
                 return mock_analysis_response
-            elif call_count == 2:
-                # First breakdown call
-                return AIMessage(content="Breakdown in progress")
             else:
-                # Final parse call
-                return MagicMock(content="""{
+                # Agent answers with structured breakdown (no separate parse call)
+                return AIMessage(content="""{
                     "overall_strategy": "Simple implementation",
                     "subtasks": [{
                         "title": "Task 1",
@@ -284,7 +644,7 @@ async def test_breakdown_and_apply_workflow(
         
         mock_llm.ainvoke = mock_ainvoke
         mock_llm.model_name = "gpt-4o"
-        mock_llm.bind_tools.return_value = mock_llm
+        mock_llm.bind_tools = MagicMock(return_value=mock_llm)
         MockChatOpenAI.return_value = mock_llm
         
         # Step 1: Create breakdown
@@ -318,6 +678,205 @@ async def test_breakdown_and_apply_workflow(
         assert data["total_created"] == 1
 
 
+@pytest.mark.asyncio
+async def test_breakdown_stream_endpoint(
+    client: AsyncClient,
+    test_user: User,
+    test_db: AsyncSession
+):
+    """Test SSE breakdown ends with the saved breakdown"""
+    
+    room = Room(
+        name="Stream Room",
+        description="Test",
+        created_by_id=test_user.id
+    )
+    test_db.add(room)
+    await test_db.commit()
+    await test_db.refresh(room)
+    
+    test_db.add(RoomMember(room_id=room.id, user_id=test_user.id, role=RoomRole.OWNER))
+    await test_db.commit()
+    
+    with patch("ai.agents.ChatOpenAI") as MockChatOpenAI:
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = [
+            MagicMock(content="""{
+                "problem_summary": "Feature request",
+                "problem_type": "feature",
+                "priority": "medium",
+                "required_skills": ["Python", "React"],
+                "estimated_complexity": "moderate",
+                "keywords": ["export"]
+            }"""),
+            AIMessage(content=json.dumps({
+                "overall_strategy": "Split by layer",
+                "subtasks": [{
+                    "title": "Backend",
+                    "description": "API endpoint",
+                    "assigned_to_user_id": None,
+                    "assigned_to_username": None,
+                    "priority": "medium",
+                    "estimated_time": "1 day",
+                    "required_skills": ["Python"],
+                    "reasoning": "Backend work"
+                }],
+                "warnings": []
+            }))
+        ]
+        mock_llm.model_name = "gpt-4o"
+        mock_llm.bind_tools = MagicMock(return_value=mock_llm)
+        MockChatOpenAI.return_value = mock_llm
+        
+        response = await client.post(
+            "/ai/breakdown-task/stream",
+            json={
+                "room_id": room.id,
+                "problem_description": "Add user export feature",
+                "language": "en"
+            }
+        )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert [e["type"] for e in events[:2]] == ["started", "analysis"]
+    assert events[-1]["type"] == "final"
+    
+    breakdown = events[-1]["breakdown"]
+    assert breakdown["status"] == "pending"
+    assert breakdown["subtasks"][0]["title"] == "Backend"
+    assert await test_db.get(AIAnalysisHistory, breakdown["analysis_id"]) is not None
+
+
+@pytest.mark.asyncio
+async def test_breakdown_stream_reports_error_event(
+    client: AsyncClient,
+    test_user: User,
+    test_db: AsyncSession
+):
+    """Test SSE breakdown ends with an error event when the agent fails mid-stream"""
+    
+    from sqlalchemy import select, func
+    
+    room = Room(name="Stream Error Room", description="Test", created_by_id=test_user.id)
+    test_db.add(room)
+    await test_db.commit()
+    await test_db.refresh(room)
+    
+    test_db.add(RoomMember(room_id=room.id, user_id=test_user.id, role=RoomRole.OWNER))
+    await test_db.commit()
+    
+    with patch("ai.agents.ChatOpenAI") as MockChatOpenAI:
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = [
+            MagicMock(content="""{
+                "problem_summary": "Feature request",
+                "problem_type": "feature",
+                "priority": "medium",
+                "required_skills": ["Python"],
+                "estimated_complexity": "simple",
+                "keywords": ["export"]
+            }"""),
+            RuntimeError("LLM unavailable")
+        ]
+        mock_llm.model_name = "gpt-4o"
+        mock_llm.bind_tools = MagicMock(return_value=mock_llm)
+        MockChatOpenAI.return_value = mock_llm
+        
+        response = await client.post(
+            "/ai/breakdown-task/stream",
+            json={
+                "room_id": room.id,
+                "problem_description": "Add user export feature",
+                "language": "en"
+            }
+        )
+    
+    assert response.status_code == 200
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert [e["type"] for e in events] == ["started", "analysis", "error"]
+    
+    count = await test_db.scalar(select(func.count()).select_from(AIAnalysisHistory))
+    assert count == 0
+
+
+@pytest.mark.asyncio
+async def test_apply_breakdown_creates_tasks_and_assignments(
+    client: AsyncClient,
+    test_user: User,
+    test_user_2: User,
+    test_db: AsyncSession
+):
+    """Apply resolves usernames, assigns and notifies in one transaction"""
+    
+    from sqlalchemy import select
+    from my_tasks.models import Task, TaskAssignment
+    from notifications.models import Notification
+    
+    room = Room(name="Apply Room", description="Test", created_by_id=test_user.id)
+    test_db.add(room)
+    await test_db.commit()
+    await test_db.refresh(room)
+    
+    test_db.add(RoomMember(room_id=room.id, user_id=test_user.id, role=RoomRole.OWNER))
+    test_db.add(RoomMember(room_id=room.id, user_id=test_user_2.id, role=RoomRole.MEMBER))
+    
+    subtask = {
+        "description": "Do it",
+        "assigned_to_user_id": None,
+        "assigned_to_username": None,
+        "priority": "high",
+        "estimated_time": "1 day",
+        "due_date_days": 2,
+        "required_skills": [],
+        "reasoning": "-"
+    }
+    analysis = AIAnalysisHistory(
+        room_id=room.id,
+        created_by_id=test_user.id,
+        problem_description="Problem",
+        analysis_data={
+            "problem_analysis": {},
+            "suggested_subtasks": [
+                {**subtask, "title": "Assigned", "assigned_to_username": test_user_2.username},
+                {**subtask, "title": "Unassigned"}
+            ]
+        },
+        status=AnalysisStatus.PENDING
+    )
+    test_db.add(analysis)
+    await test_db.commit()
+    await test_db.refresh(analysis)
+    
+    response = await client.post("/ai/apply-breakdown", json={"analysis_id": analysis.id})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["title"] for t in data["created_tasks"]] == ["Assigned", "Unassigned"]
+    
+    task_ids = [t["task_id"] for t in data["created_tasks"]]
+    tasks = (await test_db.scalars(select(Task).where(Task.id.in_(task_ids)))).all()
+    assert all(task.due_date is not None for task in tasks)
+    
+    assignments = (await test_db.scalars(select(TaskAssignment))).all()
+    assert [(a.task_id, a.user_id) for a in assignments] == [(task_ids[0], test_user_2.id)]
+    
+    notifications = (await test_db.scalars(
+        select(Notification).where(Notification.user_id == test_user_2.id)
+    )).all()
+    assert len(notifications) == 1
+    assert notifications[0].payload["task_id"] == task_ids[0]
+
+
 @pytest.mark.asyncio
 async def test_get_analysis_history(
     client: AsyncClient,
@@ -369,6 +928,52 @@ async def test_get_analysis_history(
     assert data["items"][0]["status"] == "pending"
 
 
+@pytest.mark.asyncio
+async def test_get_analysis_details_tolerates_stored_priorities(
+    client: AsyncClient,
+    test_user: User,
+    test_db: AsyncSession
+):
+    """Older stored subtasks with non-canonical priorities still load"""
+    
+    room = Room(name="Test Room", description="Test", created_by_id=test_user.id)
+    test_db.add(room)
+    await test_db.commit()
+    test_db.add(RoomMember(room_id=room.id, user_id=test_user.id, role=RoomRole.OWNER))
+    
+    subtask = {
+        "title": "Subtask",
+        "description": "Desc",
+        "assigned_to_user_id": None,
+        "assigned_to_username": None,
+        "estimated_time": "1 day",
+        "required_skills": [],
+        "reasoning": "Test"
+    }
+    analysis = AIAnalysisHistory(
+        room_id=room.id,
+        created_by_id=test_user.id,
+        problem_description="Test problem",
+        language="en",
+        analysis_data={
+            "overall_strategy": "Test",
+            "suggested_subtasks": [
+                {**subtask, "priority": "High"},
+                {**subtask, "priority": "critical"}
+            ],
+            "model_used": "gpt-4o"
+        },
+        status=AnalysisStatus.PENDING
+    )
+    test_db.add(analysis)
+    await test_db.commit()
+    
+    response = await client.get(f"/ai/analysis/{analysis.id}")
+    
+    assert response.status_code == 200
+    assert [s["priority"] for s in response.json()["subtasks"]] == ["high", "medium"]
+
+
 # ========================================
 # TOOLS TESTS
 # ========================================
@@ -423,6 +1028,168 @@ async def test_find_employees_by_skills(test_db: AsyncSession, test_user: User):
     assert results[0]["match_score"] == 100.0  # 2/2 skills matched
 
 
+@pytest.mark.asyncio
+async def test_find_employees_by_skills_filters_in_sql(
+    test_db: AsyncSession,
+    test_user: User,
+    test_user_2: User
+):
+    """Skills are matched case-insensitively against the precomputed column"""
+    
+    from ai.tools import find_employees_by_skills
+    
+    room = Room(
+        name="Skills Room",
+        description="Skills",
+        created_by_id=test_user.id
+    )
+    test_db.add(room)
+    await test_db.commit()
+    await test_db.refresh(room)
+    
+    for user, skills in ((test_user, '["Python", "C_Sharp"]'), (test_user_2, '["React"]')):
+        test_db.add(RoomMember(room_id=room.id, user_id=user.id, role=RoomRole.MEMBER))
+        test_db.add(ResumeAnalysis(user_id=user.id, full_name=user.username, core_skills=skills))
+    await test_db.commit()
+    
+    resume = await test_db.get(ResumeAnalysis, 1)
+    assert resume.skills_normalized == ["python", "c_sharp"]
+    
+    results = await find_employees_by_skills(room_id=room.id, required_skills=["python "], db=test_db)
+    assert [r["user_id"] for r in results] == [test_user.id]
+    
+    assert await find_employees_by_skills(room_id=room.id, required_skills=["C%Sharp"], db=test_db) == []
+    assert await find_employees_by_skills(room_id=room.id, required_skills=["C_Sharp"], db=test_db) != []
+    
+    # Ranked by number of matched skills in SQL
+    results = await find_employees_by_skills(
+        room_id=room.id, required_skills=["React", "Python", "C_Sharp", "Go"], db=test_db
+    )
+    assert [(r["user_id"], r["match_score"]) for r in results] == [(test_user.id, 50.0), (test_user_2.id, 25.0)]
+    
+    results = await find_employees_by_skills(
+        room_id=room.id, required_skills=["React", "Python"], db=test_db, limit=1
+    )
+    assert len(results) == 1
+    
+    # Role filter keeps members with an empty position, drops other roles
+    resume.current_position = ""
+    (await test_db.get(ResumeAnalysis, 2)).current_position = "Frontend Developer"
+    await test_db.commit()
+    results = await find_employees_by_skills(
+        room_id=room.id, required_skills=["React", "Python"], role="Backend", db=test_db
+    )
+    assert [r["user_id"] for r in results] == [test_user.id]
+
+
+@pytest.mark.asyncio
+async def test_get_room_info_counts_members(
+    test_db: AsyncSession,
+    test_user: User,
+    test_user_2: User
+):
+    """Member count comes from a COUNT subquery"""
+
+    from ai.tools import get_room_info
+
+    room = Room(name="Count Room", description="Count", created_by_id=test_user.id)
+    test_db.add(room)
+    await test_db.commit()
+    await test_db.refresh(room)
+
+    for user in (test_user, test_user_2):
+        test_db.add(RoomMember(room_id=room.id, user_id=user.id, role=RoomRole.MEMBER))
+    await test_db.commit()
+
+    info = await get_room_info(room.id, test_db)
+    assert info["total_members"] == 2
+    assert info["created_by"] == test_user.username
+
+    assert await get_room_info(room.id + 100, test_db) is None
+
+
+@pytest.mark.asyncio
+async def test_get_recent_tasks_limits_tasks_not_assignee_rows(
+    test_db: AsyncSession,
+    test_user: User,
+    test_user_2: User
+):
+    """LIMIT counts tasks even when every task has several assignees"""
+
+    from ai.tools import get_recent_tasks
+    from my_tasks.models import Task, TaskAssignment, TaskStatus, TaskPriority
+
+    room = Room(name="Tasks Room", description="Tasks", created_by_id=test_user.id)
+    test_db.add(room)
+    await test_db.commit()
+    await test_db.refresh(room)
+
+    for i in range(3):
+        task = Task(
+            title=f"Task {i}",
+            room_id=room.id,
+            created_by_id=test_user.id,
+            status=TaskStatus.TODO,
+            priority=TaskPriority.MEDIUM
+        )
+        test_db.add(task)
+        await test_db.flush()
+        for user in (test_user, test_user_2):
+            test_db.add(TaskAssignment(task_id=task.id, user_id=user.id))
+    await test_db.commit()
+    test_db.expunge_all()
+
+    tasks = await get_recent_tasks(room.id, test_db, limit=2)
+    assert len(tasks) == 2
+    assert all(len(task["assignees"]) == 2 for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_breakdown_fast_path_skips_llm(test_db: AsyncSession, test_user: User):
+    """Simple single-skill problem is assigned without calling the LLM"""
+    
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    
+    room = Room(
+        name="Fast Room",
+        description="Fast path",
+        created_by_id=test_user.id
+    )
+    test_db.add(room)
+    await test_db.commit()
+    await test_db.refresh(room)
+    
+    test_db.add(RoomMember(room_id=room.id, user_id=test_user.id, role=RoomRole.MEMBER))
+    test_db.add(ResumeAnalysis(
+        user_id=test_user.id,
+        full_name="Test Developer",
+        email=test_user.email,
+        current_position="Backend Developer",
+        years_of_experience=3,
+        career_level="Middle",
+        core_skills='["Python", "FastAPI"]'
+    ))
+    await test_db.commit()
+    
+    session_factory = async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+    analysis = {
+        "problem_summary": "Fix typo in API response",
+        "priority": "low",
+        "required_skills": ["Python"],
+        "estimated_complexity": "simple"
+    }
+    
+    with patch("ai.agents.get_model_for_complexity") as mock_get_model:
+        orchestrator = TaskBreakdownOrchestrator(room_id=room.id, session_factory=session_factory)
+        result = await orchestrator.create_breakdown(analysis, "Fix typo in API response")
+    
+    mock_get_model.assert_not_called()
+    assert result["model_used"] == "fast-path"
+    assert len(result["subtasks"]) == 1
+    assert result["subtasks"][0]["assigned_to_user_id"] == test_user.id
+    assert result["subtasks"][0]["priority"] == "low"
+
+
 if __name__ == "__main__":
     # Helper to run tests directly
     import asyncio
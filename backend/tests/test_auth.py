@@ -0,0 +1,112 @@
+"""
+Тесты выпуска и проверки JWT токенов
+"""
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import jwt
+import pytest
+
+from core.config import settings
+from auth.security_service import blacklist, tokens
+from auth.security_service.schemas import TokenService
+from auth.security_service.tokens import (
+    create_access_token, create_refresh_token, decode_token, _decode_verified
+)
+
+
+def _pyjwt_decode(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def test_access_token_roundtrip_through_pyjwt():
+    """Токен, подписанный вручную, проходит проверку PyJWT, включая не-ASCII username"""
+    token = create_access_token(TokenService(user_id=42, username="Айгерим"))
+
+    assert jwt.get_unverified_header(token) == {"alg": settings.ALGORITHM, "typ": "JWT"}
+    payload = _pyjwt_decode(token)
+    assert payload["sub"] == "42"
+    assert payload["username"] == "Айгерим"
+    assert payload["type"] == "access"
+    assert payload["exp"] > time.time()
+    assert decode_token(token) == payload
+
+
+def test_refresh_token_roundtrip_through_pyjwt():
+    """Refresh токен так же совместим с PyJWT"""
+    token = create_refresh_token(TokenService(user_id=7, username="user_ü"))
+
+    payload = _pyjwt_decode(token)
+    assert payload["sub"] == "7"
+    assert payload["username"] == "user_ü"
+    assert payload["type"] == "refresh"
+    assert payload["exp"] - time.time() > (settings.REFRESH_TOKEN_EXPIRE_MINUTES - 1) * 60
+
+
+def test_tampered_token_is_rejected():
+    """Измененная подпись не проходит проверку"""
+    token = create_access_token(TokenService(user_id=1, username="user"))
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+    assert decode_token(tampered) is None
+
+
+def test_cached_payload_rejected_after_exp(monkeypatch):
+    """Payload из LRU подписей не переживает exp"""
+    token = create_access_token(TokenService(user_id=1, username="user", expires_delta=timedelta(minutes=1)))
+
+    payload = decode_token(token)
+    assert payload is not None
+    hits = _decode_verified.cache_info().hits
+
+    monkeypatch.setattr(tokens.time, "time", lambda: payload["exp"] + 1)
+
+    assert decode_token(token) is None
+    # Подпись повторно не проверялась - ответ пришел из кэша, но exp отсек токен
+    assert _decode_verified.cache_info().hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_bloom_warmup_skips_when_ready(monkeypatch):
+    """Прогретый фильтр не прогревается повторно: таблица не читается"""
+    async def exists(key):
+        return True
+
+    db = AsyncMock()
+    monkeypatch.setattr(blacklist.cache, "exists", exists)
+
+    assert await blacklist.warm_blacklist_bloom(db) is True
+    db.stream_scalars.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bloom_warmup_error_leaves_filter_untrusted(monkeypatch):
+    """Ошибка чтения БД не пробрасывается, маркер готовности не ставится"""
+    written = []
+
+    async def exists(key):
+        return False
+
+    async def set_if_absent(key, value, ex):
+        return True
+
+    async def bloom_reserve(key, error_rate, capacity):
+        return True
+
+    async def set_(key, value, ex=None):
+        written.append(key)
+
+    async def delete(key):
+        pass
+
+    db = AsyncMock()
+    db.stream_scalars.side_effect = RuntimeError("connection lost")
+    monkeypatch.setattr(blacklist.cache, "exists", exists)
+    monkeypatch.setattr(blacklist.cache, "set_if_absent", set_if_absent)
+    monkeypatch.setattr(blacklist.cache, "bloom_reserve", bloom_reserve)
+    monkeypatch.setattr(blacklist.cache, "set", set_)
+    monkeypatch.setattr(blacklist.cache, "delete", delete)
+
+    assert await blacklist.warm_blacklist_bloom(db) is False
+    assert blacklist.BLACKLIST_BLOOM_READY_KEY not in written
@@ -0,0 +1,98 @@
+"""
+Tests for notification writes
+"""
+
+import asyncio
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from auth.models import User
+from notifications.models import Notification, NotificationType
+from notifications.service import NotificationWriter
+
+
+def _row(user_id, title):
+    return {
+        "user_id": user_id,
+        "type": NotificationType.TASK_ASSIGNED,
+        "title": title,
+        "message": "Message",
+        "link_url": None,
+        "payload": {"title": title}
+    }
+
+
+@pytest.fixture
+def session_factory(async_engine):
+    return async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _count_notifications(session_factory) -> int:
+    async with session_factory() as db:
+        return await db.scalar(select(func.count()).select_from(Notification))
+
+
+@pytest.mark.asyncio
+async def test_writer_coalesces_concurrent_writes(session_factory, test_user: User, monkeypatch):
+    """Concurrent writes go out in max_batch sized inserts, each caller gets its own row"""
+    writer = NotificationWriter(session_factory=session_factory, max_batch=4)
+    insert_sizes = []
+    original_insert = writer._insert
+
+    async def recording_insert(rows):
+        insert_sizes.append(len(rows))
+        return await original_insert(rows)
+
+    monkeypatch.setattr(writer, "_insert", recording_insert)
+
+    notifications = await asyncio.gather(
+        *(writer.write(_row(test_user.id, f"n{i}")) for i in range(10))
+    )
+    await writer.close()
+
+    assert insert_sizes == [4, 4, 2]
+    assert [n.title for n in notifications] == [f"n{i}" for i in range(10)]
+    assert [n.payload for n in notifications] == [{"title": f"n{i}"} for i in range(10)]
+    assert len({n.id for n in notifications}) == 10
+    assert all(n.created_at is not None and n.is_read is False for n in notifications)
+    assert await _count_notifications(session_factory) == 10
+
+
+@pytest.mark.asyncio
+async def test_writer_isolates_failing_row(session_factory, test_user: User):
+    """A row that breaks the batch insert fails only its own caller"""
+    writer = NotificationWriter(session_factory=session_factory)
+
+    results = await asyncio.gather(
+        writer.write(_row(test_user.id, "first")),
+        writer.write(_row(None, "broken")),
+        writer.write(_row(test_user.id, "last")),
+        return_exceptions=True
+    )
+    await writer.close()
+
+    assert results[0].title == "first"
+    assert isinstance(results[1], Exception)
+    assert results[2].title == "last"
+    assert await _count_notifications(session_factory) == 2
+
+
+@pytest.mark.asyncio
+async def test_writer_close_cancels_batch_in_flight(session_factory, test_user: User, monkeypatch):
+    """Closing while a batch is being written doesn't leave its callers hanging"""
+    writer = NotificationWriter(session_factory=session_factory)
+    started = asyncio.Event()
+
+    async def hanging_insert(rows):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(writer, "_insert", hanging_insert)
+
+    write = asyncio.ensure_future(writer.write(_row(test_user.id, "pending")))
+    await started.wait()
+    await writer.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(write, 1)
@@ -0,0 +1,87 @@
+"""
+Tests for RAGClient document indexing batches
+"""
+
+import asyncio
+import json
+import httpx
+import pytest
+
+from rag_client import RAGClient
+
+
+def _make_client(handler) -> RAGClient:
+    rag_client = RAGClient(base_url="http://rag")
+    rag_client.client = httpx.AsyncClient(
+        base_url="http://rag",
+        transport=httpx.MockTransport(handler)
+    )
+    return rag_client
+
+
+def _indexed(document):
+    return {"status": "success", "document_id": document["document_id"]}
+
+
+@pytest.mark.asyncio
+async def test_index_document_coalesces_into_bulk_requests():
+    """Concurrent index_document calls share bulk requests, results keep caller order"""
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        documents = json.loads(request.content)
+        return httpx.Response(200, json=[_indexed(d) for d in documents])
+
+    rag_client = _make_client(handler)
+    results = await asyncio.gather(
+        *(rag_client.index_document("text", f"doc{i}") for i in range(40))
+    )
+    await rag_client.close()
+
+    assert requests == ["/api/rag/documents/batch"] * 2
+    assert [r["document_id"] for r in results] == [f"doc{i}" for i in range(40)]
+
+
+@pytest.mark.asyncio
+async def test_index_documents_falls_back_per_document_on_client_error():
+    """A rejected bulk request is retried per document, only the invalid one fails"""
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path.endswith("/batch"):
+            return httpx.Response(422)
+        document = json.loads(request.content)
+        if not document["text"]:
+            return httpx.Response(422)
+        return httpx.Response(200, json=_indexed(document))
+
+    rag_client = _make_client(handler)
+    results = await asyncio.gather(
+        rag_client.index_document("text", "doc1"),
+        rag_client.index_document("", "doc2"),
+        rag_client.index_document("text", "doc3")
+    )
+    await rag_client.close()
+
+    assert requests.count("/api/rag/documents/batch") == 1
+    assert requests.count("/api/rag/documents") == 3
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [[{"status": "success", "document_id": "doc1"}], {"status": "success"}])
+async def test_index_document_answers_every_caller_on_short_response(body):
+    """A bulk response that doesn't match the batch doesn't leave callers waiting"""
+    rag_client = _make_client(lambda request: httpx.Response(200, json=body))
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            rag_client.index_document("text", "doc1"),
+            rag_client.index_document("text", "doc2")
+        ),
+        1
+    )
+    await rag_client.close()
+
+    assert [r["status"] for r in results] == ["error", "error"]
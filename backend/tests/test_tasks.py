@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.models import User
 from my_tasks.models import Task, TaskStatus, TaskPriority, TaskAssignment
+from rooms.models import Room, RoomMember, RoomRole
 
 
 # ============================================
@@ -55,6 +56,69 @@ async def test_create_task_with_assignees(
     assert len(data["assignments"]) > 0
 
 
+@pytest.mark.asyncio
+async def test_create_task_unknown_assignee(client: AsyncClient, test_user_2: User):
+    """Тест создания задачи с несуществующим ответственным"""
+    task_data = {
+        "title": "Задача",
+        "assignee_ids": [test_user_2.id, 99999]
+    }
+    
+    response = await client.post("/tasks/", json=task_data)
+    
+    assert response.status_code == 400
+    assert "99999" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_create_task_in_room_membership(
+    client: AsyncClient,
+    test_user: User,
+    test_user_2: User,
+    test_lead_user: User,
+    test_db: AsyncSession
+):
+    """Тест создания задачи в комнате: создатель и ответственные должны быть участниками"""
+    room = Room(name="Комната", created_by_id=test_user.id)
+    test_db.add(room)
+    await test_db.flush()
+    test_db.add_all([
+        RoomMember(room_id=room.id, user_id=test_user.id, role=RoomRole.OWNER),
+        RoomMember(room_id=room.id, user_id=test_user_2.id, role=RoomRole.MEMBER)
+    ])
+    await test_db.commit()
+    
+    response = await client.post("/tasks/", json={
+        "title": "Задача в комнате",
+        "room_id": room.id,
+        "assignee_ids": [test_user_2.id]
+    })
+    assert response.status_code == 201
+    assert [a["user_id"] for a in response.json()["assignments"]] == [test_user_2.id]
+    
+    # Ответственный не в комнате
+    response = await client.post("/tasks/", json={
+        "title": "Задача в комнате",
+        "room_id": room.id,
+        "assignee_ids": [test_lead_user.id]
+    })
+    assert response.status_code == 400
+    
+    # Создатель не в комнате
+    other_room = Room(name="Чужая комната", created_by_id=test_user_2.id)
+    test_db.add(other_room)
+    await test_db.flush()
+    test_db.add(RoomMember(room_id=other_room.id, user_id=test_user_2.id, role=RoomRole.OWNER))
+    await test_db.commit()
+    
+    response = await client.post("/tasks/", json={
+        "title": "Задача в чужой комнате",
+        "room_id": other_room.id,
+        "assignee_ids": [test_user_2.id]
+    })
+    assert response.status_code == 403
+
+
 @pytest.mark.asyncio
 async def test_create_task_unauthorized(client_unauthorized: AsyncClient):
     """Тест создания задачи без авторизации"""
@@ -134,6 +198,14 @@ async def test_get_tasks_with_pagination(
     assert len(data["tasks"]) == 10
     assert data["page"] == 1
     assert data["total_pages"] == 3
+    
+    # Страница за пределами выборки: задач нет, но total сохраняется
+    response = await client.get("/tasks/?page=5&page_size=10")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["tasks"] == []
+    assert data["total"] == 25
 
 
 @pytest.mark.asyncio
@@ -320,6 +392,7 @@ async def test_update_task_status_only(
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "done"
+    assert data["completed_at"] is not None
 
 
 # ============================================
@@ -438,6 +511,44 @@ async def test_bulk_assign_success(
     assert isinstance(data, list)
 
 
+@pytest.mark.asyncio
+async def test_bulk_assign_skips_existing(
+    client: AsyncClient, 
+    test_user: User,
+    test_user_2: User,
+    test_db: AsyncSession
+):
+    """Тест повторного массового назначения: уже назначенные не дублируются"""
+    task = Task(
+        title="Задача",
+        created_by_id=test_user.id,
+        status=TaskStatus.TODO,
+        priority=TaskPriority.MEDIUM
+    )
+    test_db.add(task)
+    await test_db.commit()
+    await test_db.refresh(task)
+    
+    test_db.add(TaskAssignment(task_id=task.id, user_id=test_user_2.id, assigned_by_id=test_user.id))
+    await test_db.commit()
+    
+    bulk_data = {"user_ids": [test_user_2.id, test_user.id, test_user.id]}
+    
+    response = await client.post(f"/tasks/{task.id}/assignees/bulk", json=bulk_data)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(a["user_id"] for a in data) == sorted([test_user.id, test_user_2.id])
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_nonexistent_task(client: AsyncClient, test_user_2: User):
+    """Тест массового назначения на несуществующую задачу"""
+    response = await client.post("/tasks/99999/assignees/bulk", json={"user_ids": [test_user_2.id]})
+    
+    assert response.status_code == 404
+
+
 # ============================================
 # Тесты статистики
 # ============================================
@@ -461,13 +572,15 @@ async def test_get_my_statistics(
             title="IN_PROGRESS задача",
             created_by_id=test_user.id,
             status=TaskStatus.IN_PROGRESS,
-            priority=TaskPriority.HIGH
+            priority=TaskPriority.HIGH,
+            due_date=datetime.utcnow() - timedelta(days=1)
         ),
         Task(
             title="DONE задача",
             created_by_id=test_user.id,
             status=TaskStatus.DONE,
-            priority=TaskPriority.LOW
+            priority=TaskPriority.LOW,
+            due_date=datetime.utcnow() - timedelta(days=1)
         )
     ]
     test_db.add_all(tasks)
@@ -488,10 +601,13 @@ async def test_get_my_statistics(
     
     assert response.status_code == 200
     data = response.json()
-    assert "total" in data
-    assert "todo" in data
-    assert "in_progress" in data
-    assert "done" in data
+    assert data["total"] == 3
+    assert data["todo"] == 1
+    assert data["in_progress"] == 1
+    assert data["review"] == 0
+    assert data["done"] == 1
+    assert data["overdue"] == 1
+    assert data["by_priority"] == {"low": 1, "medium": 1, "high": 1, "urgent": 0}
 
 
 @pytest.mark.asyncio
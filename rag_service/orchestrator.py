@@ -118,6 +118,80 @@ class RAGOrchestrator:
                 "message": f"Processing failed: {str(e)}"
             }
     
+    def process_texts(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Process several documents at once
+        
+        Chunks of all documents are embedded in one batch and stored with
+        one Milvus insert, instead of a full pipeline run per document
+        
+        Args:
+            documents: Dicts with text, document_id and optional metadata
+            
+        Returns:
+            Processing result per document, in input order
+        """
+        results: List[Optional[Dict]] = [None] * len(documents)
+        chunks_data = []
+        chunk_counts = {}
+        
+        try:
+            # Step 1: Chunk every document
+            for index, document in enumerate(documents):
+                document_chunks = self.chunking_service.chunk_with_metadata(
+                    text=document["text"],
+                    document_id=document["document_id"],
+                    metadata=document.get("metadata")
+                )
+                if not document_chunks:
+                    results[index] = {
+                        "status": "error",
+                        "message": "No chunks generated from text",
+                        "document_id": document["document_id"],
+                        "chunk_count": 0
+                    }
+                    continue
+                chunk_counts[index] = len(document_chunks)
+                chunks_data.extend(document_chunks)
+            
+            if chunks_data:
+                # Step 2: One embedding batch for all chunks
+                texts = [chunk["text"] for chunk in chunks_data]
+                dense_vecs, sparse_vecs = self.embedding_service.encode_batch_hybrid(texts)
+                
+                # Step 3: One Milvus insert
+                milvus_chunks = [
+                    {
+                        "document_id": chunk["document_id"],
+                        "text": chunk["text"],
+                        "dense_vector": dense_vecs[i].tolist(),
+                        "sparse_vector": self.milvus_service.convert_sparse_to_milvus_format(
+                            sparse_vecs[i]
+                        )
+                    }
+                    for i, chunk in enumerate(chunks_data)
+                ]
+                self.milvus_service.insert_documents(milvus_chunks)
+            
+        except Exception as e:
+            return [
+                {
+                    "status": "error",
+                    "document_id": document["document_id"],
+                    "message": f"Processing failed: {str(e)}"
+                }
+                for document in documents
+            ]
+        
+        for index, chunk_count in chunk_counts.items():
+            results[index] = {
+                "status": "success",
+                "document_id": documents[index]["document_id"],
+                "chunk_count": chunk_count,
+                "message": f"Successfully processed {chunk_count} chunks"
+            }
+        return results
+    
     def search(
         self,
         query: str,
@@ -102,6 +102,24 @@ async def index_document(request: DocumentRequest):
         )
 
 
+@router.post("/documents/batch", response_model=List[DocumentResponse])
+async def index_documents(request: List[DocumentRequest]):
+    """
+    Index several documents in one request
+    
+    Chunks of all documents share one embedding batch and one Milvus insert.
+    Results are returned per document, in request order; a failed document
+    doesn't fail the whole request
+    """
+    orchestrator = get_orchestrator()
+    
+    results = orchestrator.process_texts(
+        [document.model_dump() for document in request]
+    )
+    
+    return [DocumentResponse(**result) for result in results]
+
+
 @router.post("/search", response_model=List[SearchResult])
 async def search_documents(request: SearchRequest):
     """